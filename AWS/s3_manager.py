@@ -9,12 +9,51 @@ Description: S3 bucket manager
 import boto3
 import sys
 import os
+import asyncio
+import mmap
+import queue
+import threading
 import zipfile
 import tempfile
 import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from botocore.exceptions import ClientError, NoCredentialsError
+from botocore.config import Config
+from boto3.exceptions import Boto3Error
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
+
+try:
+    import aioboto3
+except ImportError:
+    aioboto3 = None
+
+# Shared client settings: adaptive retries back off on 503 SlowDown/throttling
+S3_CONFIG = Config(retries={'max_attempts': 10, 'mode': 'adaptive'}, max_pool_connections=32)
+
+# Errors a single transfer can raise: service errors, connection/timeout errors,
+# boto3 transfer failures (retries exceeded, upload failed) and local file errors
+TRANSFER_ERRORS = (ClientError, BotoCoreError, Boto3Error, OSError)
+
+# Maximum number of in-flight requests for --async transfers
+ASYNC_CONCURRENCY = 64
+
+# Worker threads and listing queue depth for the threaded dump pipeline
+DUMP_WORKERS = 16
+DUMP_QUEUE_SIZE = 64
+
+# Objects at least this large are fetched with parallel byte-range GETs
+RANGED_MIN_SIZE = 32 * 1024 * 1024
+RANGED_PARTS = 16
+RANGED_CHUNK_SIZE = 1024 * 1024
+
+# Parallel server-side copies for dump --to-bucket; copy_object is limited to 5 GiB
+COPY_WORKERS = 64
+COPY_OBJECT_MAX_SIZE = 5 * 1024 * 1024 * 1024
+
+# HTTP write buffer used with --fast (default is 8 KiB in http.client, 16 KiB in urllib3)
+FAST_BLOCKSIZE = 1024 * 1024
 
 # ANSI color codes
 class Colors:
@@ -25,9 +64,61 @@ class Colors:
     CYAN = '\033[0;36m'
     NC = '\033[0m'  # No Color
 
+def color_line(text, color):
+    """Return text wrapped in color codes as a complete output line"""
+    return color + text + Colors.NC + '\n'
+
 def print_color(text, color):
     """Print colored text"""
-    print(f"{color}{text}{Colors.NC}")
+    sys.stdout.write(color_line(text, color))
+
+def print_color_lines(lines, color):
+    """Print many colored lines with a single write"""
+    sys.stdout.write(''.join([color_line(line, color) for line in lines]))
+
+def enable_fast_transfers():
+    """Raise the HTTP connection write buffer to FAST_BLOCKSIZE
+    
+    Larger buffers mean fewer socket writes per request body, at the cost
+    of 1 MiB of memory per open connection. Affects every HTTP connection
+    created afterwards in this process, so it is only applied when --fast
+    is passed.
+    """
+    from http.client import HTTPConnection
+    HTTPConnection.__init__.__defaults__ = tuple(
+        (FAST_BLOCKSIZE if x == 8192 else x) for x in HTTPConnection.__init__.__defaults__
+    )
+    
+    # botocore connections subclass urllib3's, whose blocksize is a keyword-only
+    # default; patch that default too
+    try:
+        from urllib3.connection import HTTPConnection as Urllib3Connection
+    except ImportError:
+        return
+    kwdefaults = Urllib3Connection.__init__.__kwdefaults__
+    if kwdefaults and 'blocksize' in kwdefaults:
+        kwdefaults['blocksize'] = FAST_BLOCKSIZE
+
+_s3_client = None
+
+def get_s3_client():
+    """Return the shared S3 client, creating it on first use"""
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client('s3', config=S3_CONFIG)
+    return _s3_client
+
+def log_failure(failures, key, error):
+    """Record a failed transfer and report it on stderr"""
+    failures.append((key, str(error)))
+    print(f"{Colors.RED}✗ {key}: {error}{Colors.NC}", file=sys.stderr)
+
+def report_failures(failures):
+    """Print the keys that failed to transfer"""
+    if not failures:
+        return
+    print_color(f"✗ {len(failures)} file(s) failed:", Colors.RED)
+    print_color_lines([f"  {key}: {error}" for key, error in failures], Colors.RED)
 
 def check_aws_credentials():
     """Check if AWS credentials are configured"""
@@ -60,6 +151,11 @@ def show_usage():
     print("  dump <bucket>       Download all files from bucket as zip")
     print("  help                Show this help message")
     print()
+    print("Options:")
+    print("  --async             Use aioboto3 for folder upload and dump (requires aioboto3)")
+    print("  --fast              Use 1 MiB HTTP write buffers (more memory per connection)")
+    print("  --to-bucket <name>  Dump into another bucket with server-side copies")
+    print()
     print("Examples:")
     print("  python s3_manager.py list")
     print("  python s3_manager.py create")
@@ -68,6 +164,9 @@ def show_usage():
     print("  python s3_manager.py upload /path/to/folder")
     print("  python s3_manager.py download my-bucket photo.jpg")
     print("  python s3_manager.py dump my-bucket")
+    print("  python s3_manager.py dump my-bucket --async")
+    print("  python s3_manager.py dump my-bucket --to-bucket evidence-bucket")
+    print("  python s3_manager.py upload /path/to/disk.img my-bucket --fast")
     print()
 
 def list_buckets():
@@ -75,7 +174,7 @@ def list_buckets():
     print_color("Listing S3 buckets...", Colors.YELLOW)
     print()
     
-    s3 = boto3.client('s3')
+    s3 = get_s3_client()
     
     print_color("[AWS CLI] aws s3api list-buckets", Colors.CYAN)
     try:
@@ -91,8 +190,7 @@ def list_buckets():
         print_color(f"{'Bucket Name':<40} {'Created'}", Colors.CYAN)
         print_color(f"{'-----------':<40} {'-------'}", Colors.CYAN)
         
-        for bucket in buckets:
-            print_color(f"{bucket['Name']:<40} {bucket['CreationDate']}", Colors.GREEN)
+        print_color_lines([f"{bucket['Name']:<40} {bucket['CreationDate']}" for bucket in buckets], Colors.GREEN)
         
         print()
         print(f"Total: {len(buckets)} bucket(s)")
@@ -112,7 +210,7 @@ def create_bucket(bucket_name=None):
     
     print_color(f"Creating bucket '{bucket_name}'...", Colors.YELLOW)
     
-    s3 = boto3.client('s3')
+    s3 = get_s3_client()
     
     print_color(f"[AWS CLI] aws s3api create-bucket --bucket {bucket_name}", Colors.CYAN)
     try:
@@ -124,7 +222,7 @@ def create_bucket(bucket_name=None):
 
 def delete_bucket(bucket_name=None):
     """Delete an S3 bucket"""
-    s3 = boto3.client('s3')
+    s3 = get_s3_client()
     
     # If no bucket name provided, list buckets for selection
     if not bucket_name:
@@ -189,19 +287,147 @@ def delete_bucket(bucket_name=None):
         print_color("✗ Failed to delete bucket", Colors.RED)
         print_color(str(e), Colors.RED)
 
-def upload_files(path, bucket_name=None):
+def check_aioboto3():
+    """Check if aioboto3 is available for --async transfers"""
+    if aioboto3 is None:
+        print_color("Error: --async requires aioboto3", Colors.RED)
+        print("Run: pip install aioboto3")
+        return False
+    return True
+
+async def _upload_folder_async(path, bucket_name):
+    """Upload all files under a folder concurrently with aioboto3
+    
+    Returns a (listed, failures) tuple with the number of files found and
+    a list of (key, error) pairs for the uploads that failed.
+    """
+    semaphore = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    failures = []
+    
+    config = S3_CONFIG.merge(Config(max_pool_connections=ASYNC_CONCURRENCY))
+    
+    async with aioboto3.Session().client('s3', config=config) as s3:
+        async def sem_upload(local_path):
+            relative_path = os.path.relpath(local_path, path)
+            async with semaphore:
+                try:
+                    await s3.upload_file(local_path, bucket_name, relative_path)
+                except TRANSFER_ERRORS as e:
+                    log_failure(failures, relative_path, e)
+        
+        local_paths = [os.path.join(root, file) for root, dirs, files in os.walk(path) for file in files]
+        await asyncio.gather(*[sem_upload(p) for p in local_paths])
+    
+    return len(local_paths), failures
+
+async def _download_bucket_async(bucket_name, dest_dir):
+    """Download all objects of a bucket concurrently with aioboto3
+    
+    Returns a (listed, failures) tuple with the number of objects listed
+    and a list of (key, error) pairs for the downloads that failed.
+    """
+    semaphore = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    made_dirs = set()
+    failures = []
+    
+    config = S3_CONFIG.merge(Config(max_pool_connections=ASYNC_CONCURRENCY))
+    
+    async with aioboto3.Session().client('s3', config=config) as s3:
+        keys = []
+        paginator = s3.get_paginator('list_objects_v2')
+        async for page in paginator.paginate(Bucket=bucket_name):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        
+        async def sem_download(key):
+            file_path = os.path.join(dest_dir, key)
+            async with semaphore:
+                try:
+                    parent = os.path.dirname(file_path)
+                    if parent not in made_dirs:
+                        os.makedirs(parent, exist_ok=True)
+                        made_dirs.add(parent)
+                    await s3.download_file(bucket_name, key, file_path)
+                except TRANSFER_ERRORS as e:
+                    log_failure(failures, key, e)
+        
+        await asyncio.gather(*[sem_download(k) for k in keys])
+    
+    return len(keys), failures
+
+def _download_bucket_pipelined(s3, bucket_name, dest_dir):
+    """Download all objects of a bucket while it is still being listed
+    
+    One thread pages through the listing and feeds keys into a bounded
+    queue; worker threads start downloading as soon as the first key
+    arrives instead of waiting for the full listing.
+    
+    Returns a (listed, failures) tuple with the number of objects listed
+    and a list of (key, error) pairs for the downloads that failed.
+    """
+    keys = queue.Queue(maxsize=DUMP_QUEUE_SIZE)
+    counts = {'listed': 0}
+    failures = []
+    made_dirs = set()
+    lock = threading.Lock()
+    
+    def producer():
+        try:
+            paginator = s3.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=bucket_name):
+                for obj in page.get('Contents', []):
+                    keys.put(obj['Key'])
+                    counts['listed'] += 1
+        finally:
+            for _ in range(DUMP_WORKERS):
+                keys.put(None)
+    
+    def worker():
+        while True:
+            key = keys.get()
+            if key is None:
+                break
+            try:
+                file_path = os.path.join(dest_dir, key)
+                parent = os.path.dirname(file_path)
+                if parent not in made_dirs:
+                    os.makedirs(parent, exist_ok=True)
+                    with lock:
+                        made_dirs.add(parent)
+                s3.download_file(bucket_name, key, file_path)
+            except Exception as e:
+                # Continue downloading other files even if one fails; a dead
+                # worker would leave the producer blocked on the full queue
+                log_failure(failures, key, e)
+    
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(DUMP_WORKERS)]
+    for t in workers:
+        t.start()
+    
+    # Listing errors (e.g. access denied) propagate to the caller once
+    # the workers have drained the queue
+    try:
+        producer()
+    finally:
+        for t in workers:
+            t.join()
+    
+    return counts['listed'], failures
+
+def upload_files(path, bucket_name=None, use_async=False):
     """Upload file or folder to S3 bucket"""
     # Check if path was provided
     if not path:
         print_color("Usage: python s3_manager.py upload <path> [bucket]", Colors.YELLOW)
         return
     
-    # Check if path exists
-    if not os.path.exists(path):
-        print_color(f"Error: Path '{path}' not found", Colors.RED)
+    # Check if path exists (one stat serves both the existence and type checks)
+    try:
+        path_stat = os.stat(path)
+    except OSError as e:
+        print_color(f"Error: Path '{path}': {e.strerror}", Colors.RED)
         return
     
-    s3 = boto3.client('s3')
+    s3 = get_s3_client()
     
     # If no bucket name provided, list buckets for selection
     if not bucket_name:
@@ -245,27 +471,33 @@ def upload_files(path, bucket_name=None):
         return
     
     # Check if path is a file or directory
-    if os.path.isdir(path):
+    if stat.S_ISDIR(path_stat.st_mode):
         # It's a directory - upload all files
         print_color(f"Uploading folder '{path}' to bucket '{bucket_name}'...", Colors.YELLOW)
         print_color(f"[AWS CLI] aws s3 sync {path} s3://{bucket_name}/", Colors.CYAN)
         
-        uploaded_count = 0
-        for root, dirs, files in os.walk(path):
-            for file in files:
-                local_path = os.path.join(root, file)
-                relative_path = os.path.relpath(local_path, path)
-                
-                try:
-                    s3.upload_file(local_path, bucket_name, relative_path)
-                    uploaded_count += 1
-                except ClientError:
-                    pass
+        if use_async:
+            file_count, failures = asyncio.run(_upload_folder_async(path, bucket_name))
+        else:
+            file_count = 0
+            failures = []
+            for root, dirs, files in os.walk(path):
+                for file in files:
+                    local_path = os.path.join(root, file)
+                    relative_path = os.path.relpath(local_path, path)
+                    file_count += 1
+                    
+                    try:
+                        s3.upload_file(local_path, bucket_name, relative_path)
+                    except TRANSFER_ERRORS as e:
+                        log_failure(failures, relative_path, e)
         
+        uploaded_count = file_count - len(failures)
         if uploaded_count > 0:
             print_color(f"✓ Folder uploaded successfully ({uploaded_count} file(s))", Colors.GREEN)
         else:
             print_color("✗ Failed to upload folder", Colors.RED)
+        report_failures(failures)
     else:
         # It's a file - upload single file
         file_name = os.path.basename(path)
@@ -279,13 +511,58 @@ def upload_files(path, bucket_name=None):
             print_color("✗ Failed to upload file", Colors.RED)
             print_color(str(e), Colors.RED)
 
+def _download_ranged(s3, bucket_name, key, download_path):
+    """Download a single object using parallel byte-range GETs
+    
+    Each worker writes its disjoint range straight into a memory map of
+    the pre-sized destination file. Small objects are fetched with a single
+    GET. Every GET is pinned to the ETag seen by head_object, so an object
+    overwritten mid-download fails with 412 instead of mixing bytes from
+    two versions.
+    """
+    head = s3.head_object(Bucket=bucket_name, Key=key)
+    size, etag = head['ContentLength'], head['ETag']
+    part_size = -(-size // RANGED_PARTS)
+    ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+    
+    try:
+        if size < RANGED_MIN_SIZE:
+            # download_file does not accept IfMatch, so stream the object directly
+            response = s3.get_object(Bucket=bucket_name, Key=key, IfMatch=etag)
+            with open(download_path, 'wb') as f:
+                for chunk in response['Body'].iter_chunks(RANGED_CHUNK_SIZE):
+                    f.write(chunk)
+            return
+        
+        with open(download_path, 'wb+') as f:
+            f.truncate(size)
+            with mmap.mmap(f.fileno(), size) as mm:
+                def fetch(byte_range):
+                    start, end = byte_range
+                    response = s3.get_object(Bucket=bucket_name, Key=key, Range=f"bytes={start}-{end}",
+                                             IfMatch=etag)
+                    offset = start
+                    for chunk in response['Body'].iter_chunks(RANGED_CHUNK_SIZE):
+                        mm[offset:offset + len(chunk)] = chunk
+                        offset += len(chunk)
+                
+                with ThreadPoolExecutor(max_workers=RANGED_PARTS) as executor:
+                    list(executor.map(fetch, ranges))
+    except BaseException:
+        # A partly written file must not pass for a complete download
+        try:
+            os.remove(download_path)
+        except OSError:
+            pass
+        raise
+
 def download_file(bucket_name, file_name):
     """Download a file from S3 bucket"""
     if not bucket_name or not file_name:
         print_color("Usage: python s3_manager.py download <bucket> <file>", Colors.YELLOW)
         return
     
-    s3 = boto3.client('s3')
+    s3 = get_s3_client()
     
     # Verify bucket exists
     try:
@@ -309,22 +586,59 @@ def download_file(bucket_name, file_name):
         download_path = default_path
     
     # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(download_path), exist_ok=True)
+    download_dir = os.path.dirname(download_path)
+    if download_dir:
+        try:
+            os.stat(download_dir)
+        except FileNotFoundError:
+            os.makedirs(download_dir, exist_ok=True)
     
     print_color(f"Downloading '{file_name}' from '{bucket_name}'...", Colors.YELLOW)
     print_color(f"[AWS CLI] aws s3 cp s3://{bucket_name}/{file_name} {download_path}", Colors.CYAN)
     
     try:
-        s3.download_file(bucket_name, file_name, download_path)
+        _download_ranged(s3, bucket_name, file_name, download_path)
         print_color("✓ Download completed", Colors.GREEN)
         print(f"Destination: {download_path}")
-    except ClientError as e:
+    except TRANSFER_ERRORS as e:
         print_color("✗ Failed to download file", Colors.RED)
         print_color(str(e), Colors.RED)
 
-def dump_bucket(bucket_name=None):
+def _copy_bucket(bucket_name, dest_bucket):
+    """Copy all objects of a bucket into another bucket server-side
+    
+    Objects never leave S3: small objects use copy_object and objects over
+    5 GiB go through the managed multipart copy (UploadPartCopy).
+    
+    Returns a (listed, failures) tuple with the number of objects listed
+    and a list of (key, error) pairs for the copies that failed.
+    """
+    s3 = boto3.client('s3', config=S3_CONFIG.merge(Config(max_pool_connections=COPY_WORKERS)))
+    
+    def copy(obj):
+        copy_source = {'Bucket': bucket_name, 'Key': obj['Key']}
+        try:
+            if obj['Size'] > COPY_OBJECT_MAX_SIZE:
+                s3.copy(copy_source, dest_bucket, obj['Key'])
+            else:
+                s3.copy_object(Bucket=dest_bucket, Key=obj['Key'], CopySource=copy_source)
+        except TRANSFER_ERRORS as e:
+            log_failure(failures, obj['Key'], e)
+    
+    listed_count = 0
+    failures = []
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        paginator = s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket_name):
+            for obj in page.get('Contents', []):
+                executor.submit(copy, obj)
+                listed_count += 1
+    
+    return listed_count, failures
+
+def dump_bucket(bucket_name=None, use_async=False, to_bucket=None):
     """Dump bucket to zip file"""
-    s3 = boto3.client('s3')
+    s3 = get_s3_client()
     
     # If no bucket name provided, list buckets for selection
     if not bucket_name:
@@ -367,6 +681,10 @@ def dump_bucket(bucket_name=None):
         print_color(f"Error: Bucket '{bucket_name}' not found or access denied", Colors.RED)
         return
     
+    if to_bucket:
+        dump_to_bucket(bucket_name, to_bucket)
+        return
+    
     # Zip file name
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     zip_filename = f"{bucket_name}_{timestamp}.zip"
@@ -393,23 +711,17 @@ def dump_bucket(bucket_name=None):
         print_color(f"[AWS CLI] aws s3 sync s3://{bucket_name} <temp_folder>", Colors.CYAN)
         
         # List and download all objects
-        bucket = boto3.resource('s3').Bucket(bucket_name)
-        objects = list(bucket.objects.all())
+        if use_async:
+            listed_count, failures = asyncio.run(_download_bucket_async(bucket_name, temp_dir))
+        else:
+            listed_count, failures = _download_bucket_pipelined(s3, bucket_name, temp_dir)
         
-        if not objects:
+        if not listed_count:
             print_color("Bucket is empty", Colors.YELLOW)
             return
         
-        downloaded_count = 0
-        for obj in objects:
-            try:
-                file_path = os.path.join(temp_dir, obj.key)
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                bucket.download_file(obj.key, file_path)
-                downloaded_count += 1
-            except Exception as e:
-                # Continue downloading other files even if one fails
-                pass
+        downloaded_count = listed_count - len(failures)
+        report_failures(failures)
         
         if downloaded_count > 0:
             print_color(f"✓ Files downloaded ({downloaded_count} file(s))", Colors.GREEN)
@@ -445,44 +757,106 @@ def dump_bucket(bucket_name=None):
     print()
     print_color("Dump completed!", Colors.GREEN)
 
+def dump_to_bucket(bucket_name, dest_bucket):
+    """Dump bucket into another bucket using server-side copies"""
+    s3 = get_s3_client()
+    
+    # Verify destination bucket exists
+    try:
+        s3.head_bucket(Bucket=dest_bucket)
+    except ClientError:
+        print_color(f"Error: Bucket '{dest_bucket}' not found or access denied", Colors.RED)
+        return
+    
+    print()
+    print_color(f"Copying files from '{bucket_name}' to '{dest_bucket}'...", Colors.YELLOW)
+    print_color(f"[AWS CLI] aws s3 sync s3://{bucket_name} s3://{dest_bucket}", Colors.CYAN)
+    
+    try:
+        listed_count, failures = _copy_bucket(bucket_name, dest_bucket)
+    except TRANSFER_ERRORS as e:
+        print_color("✗ Failed to copy files from bucket", Colors.RED)
+        print_color(str(e), Colors.RED)
+        return
+    
+    if not listed_count:
+        print_color("Bucket is empty", Colors.YELLOW)
+        return
+    
+    copied_count = listed_count - len(failures)
+    if copied_count > 0:
+        print_color(f"✓ Files copied ({copied_count} of {listed_count} file(s))", Colors.GREEN)
+    else:
+        print_color("✗ Failed to copy files from bucket", Colors.RED)
+    report_failures(failures)
+    
+    print()
+    print_color("Dump completed!", Colors.GREEN)
+
 def main():
     """Main function"""
     if len(sys.argv) < 2:
         show_usage()
         sys.exit(0)
     
-    command = sys.argv[1].lower()
+    # Separate option flags from positional arguments
+    flags = set()
+    to_bucket = None
+    args = []
+    argv = iter(sys.argv[1:])
+    for arg in argv:
+        if arg in ('--async', '--fast'):
+            flags.add(arg)
+        elif arg == '--to-bucket':
+            to_bucket = next(argv, None)
+        elif arg.startswith('--to-bucket='):
+            to_bucket = arg.split('=', 1)[1]
+        else:
+            args.append(arg)
+    use_async = '--async' in flags
+    
+    if not args:
+        show_usage()
+        sys.exit(0)
+    
+    command = args[0].lower()
     
     if command == 'help':
         show_usage()
         sys.exit(0)
     
+    if use_async and not check_aioboto3():
+        sys.exit(1)
+    
+    if '--fast' in flags:
+        enable_fast_transfers()
+    
     if not check_aws_credentials():
         sys.exit(1)
     
     if command == 'list':
         list_buckets()
     elif command == 'create':
-        bucket_name = sys.argv[2] if len(sys.argv) >= 3 else None
+        bucket_name = args[1] if len(args) >= 2 else None
         create_bucket(bucket_name)
     elif command == 'delete':
-        bucket_name = sys.argv[2] if len(sys.argv) >= 3 else None
+        bucket_name = args[1] if len(args) >= 2 else None
         delete_bucket(bucket_name)
     elif command == 'upload':
-        if len(sys.argv) >= 4:
-            upload_files(sys.argv[2], sys.argv[3])
-        elif len(sys.argv) >= 3:
-            upload_files(sys.argv[2])
+        if len(args) >= 3:
+            upload_files(args[1], args[2], use_async=use_async)
+        elif len(args) >= 2:
+            upload_files(args[1], use_async=use_async)
         else:
             print_color("Usage: python s3_manager.py upload <path> [bucket]", Colors.YELLOW)
     elif command == 'download':
-        if len(sys.argv) >= 4:
-            download_file(sys.argv[2], sys.argv[3])
+        if len(args) >= 3:
+            download_file(args[1], args[2])
         else:
             print_color("Usage: python s3_manager.py download <bucket> <file>", Colors.YELLOW)
     elif command == 'dump':
-        bucket_name = sys.argv[2] if len(sys.argv) >= 3 else None
-        dump_bucket(bucket_name)
+        bucket_name = args[1] if len(args) >= 2 else None
+        dump_bucket(bucket_name, use_async=use_async, to_bucket=to_bucket)
     else:
         show_usage()
         sys.exit(1)
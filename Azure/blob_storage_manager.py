@@ -2,18 +2,68 @@
 import subprocess
 import sys
 import os
-import tempfile
+import io
+import json
+import time
 import shutil
+import stat
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+from azure.core.exceptions import AzureError
+from azure.identity import DefaultAzureCredential, TokenCachePersistenceOptions
+from azure.mgmt.storage import StorageManagementClient
+from azure.storage.blob import BlobServiceClient
+
+# Optional ISA-L (python-isal) deflate engine, several times faster than zlib
+try:
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None
+
+# Colors (left empty when output is redirected, to keep logs free of escape codes)
+_TTY = sys.stdout.isatty()
 
-# Colors
 class Colors:
-    GREEN = '\033[32m'
-    YELLOW = '\033[33m'
-    RED = '\033[31m'
-    BLUE = '\033[34m'
-    NC = '\033[0m'
+    GREEN = '\033[32m' if _TTY else ''
+    YELLOW = '\033[33m' if _TTY else ''
+    RED = '\033[31m' if _TTY else ''
+    BLUE = '\033[34m' if _TTY else ''
+    NC = '\033[0m' if _TTY else ''
+
+# Blobs transferred at once, and parallel chunks within a single blob
+TRANSFER_WORKERS = 8
+UPLOAD_CONCURRENCY = (os.cpu_count() or 1) * 2
+DOWNLOAD_CONCURRENCY = 16
+
+# Upload block sizing: fewer, larger PUT Block requests for multi-GB evidence files
+MAX_BLOCK_SIZE = 64 * 1024 * 1024
+MAX_SINGLE_PUT_SIZE = 64 * 1024 * 1024
+
+# Blobs above the first GET are fetched as parallel ranged GETs of this size
+MAX_SINGLE_GET_SIZE = 32 * 1024 * 1024
+MAX_CHUNK_GET_SIZE = 8 * 1024 * 1024
+
+# Zip entries are fed to deflate, and the archive written to disk, in blocks of this size
+ZIP_BUFFER_SIZE = 1 << 20
+
+# Dumps use zlib level 6 unless --zip-level is given
+DEFAULT_ZIP_LEVEL = 6
+
+# Container listing cache, keyed by subscription id
+CACHE_DIR = os.path.expanduser("~/.cache/nimbusdfir")
+CONTAINER_CACHE_FILE = os.path.join(CACHE_DIR, "containers.json")
+CONTAINER_CACHE_TTL = 300
+
+# Local copies of dumped blobs, reused by later --cache dumps while their ETag matches
+DUMP_CACHE_DIR = os.path.join(CACHE_DIR, "dump")
+DUMP_CACHE_MAX_BYTES = 10 * 1024 ** 3
+
+_credential = None
+_blob_clients = {}
+_storage_clients = {}
 
 def banner():
     print(f"{Colors.BLUE}=============================================={Colors.NC}")
@@ -24,17 +74,130 @@ def run_az(args):
     result = subprocess.run(["az"] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
     return result.stdout.strip(), result.stderr.strip(), result.returncode
 
+# Shared by every client; tokens persist on disk so later runs skip re-authentication
+def get_credential():
+    global _credential
+    if _credential is None:
+        _credential = DefaultAzureCredential(
+            cache_persistence_options=TokenCachePersistenceOptions(name="nimbusdfir", allow_unencrypted_storage=True)
+        )
+    return _credential
+
+# One client per storage account, sharing a single credential
+def get_blob_service_client(account):
+    if account not in _blob_clients:
+        _blob_clients[account] = BlobServiceClient(
+            f"https://{account}.blob.core.windows.net",
+            credential=get_credential(),
+            max_block_size=MAX_BLOCK_SIZE,
+            max_single_put_size=MAX_SINGLE_PUT_SIZE,
+            max_single_get_size=MAX_SINGLE_GET_SIZE,
+            max_chunk_get_size=MAX_CHUNK_GET_SIZE,
+            connection_timeout=60,
+        )
+    return _blob_clients[account]
+
+# One management client per subscription, sharing the same credential
+def get_storage_management_client(subscription):
+    if subscription not in _storage_clients:
+        _storage_clients[subscription] = StorageManagementClient(get_credential(), subscription)
+    return _storage_clients[subscription]
+
+# AZURE_SUBSCRIPTION_ID overrides the az CLI default subscription
+def get_subscription_id():
+    subscription = os.environ.get("AZURE_SUBSCRIPTION_ID")
+    if not subscription:
+        subscription, _, _ = run_az(["account", "show", "--query", "id", "-o", "tsv"])
+    return subscription
+
+def _upload_blob(container_client, file, blob_name, size):
+    with open(file, "rb") as data:
+        container_client.upload_blob(blob_name, data, length=size, overwrite=True, max_concurrency=UPLOAD_CONCURRENCY)
+
+def _download_blob(container_client, blob, save_path):
+    save_dir = os.path.dirname(save_path)
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+    with open(save_path, "wb") as fh:
+        container_client.download_blob(blob, max_concurrency=DOWNLOAD_CONCURRENCY).readinto(fh)
+
+def _download_blobs(container_client, downloads):
+    with ThreadPoolExecutor(max_workers=TRANSFER_WORKERS) as executor:
+        futures = {executor.submit(_download_blob, container_client, b, path): (b, path) for b, path in downloads}
+        for future in as_completed(futures):
+            b, save_path = futures[future]
+            try:
+                future.result()
+                print(f"{Colors.GREEN}Download complete: {save_path}{Colors.NC}")
+            except (AzureError, OSError) as e:
+                print(f"{Colors.RED}Download failed for {b}: {e}{Colors.NC}")
+
+def _read_container_cache():
+    try:
+        with open(CONTAINER_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _load_cached_containers(subscription):
+    entry = _read_container_cache().get(subscription)
+    if not entry or time.time() - entry.get("time", 0) > CONTAINER_CACHE_TTL:
+        return None
+    return [tuple(c) for c in entry["containers"]]
+
+def _save_cached_containers(subscription, containers):
+    cache = _read_container_cache()
+    cache[subscription] = {"time": time.time(), "containers": containers}
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(CONTAINER_CACHE_FILE, "w") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+def clear_container_cache():
+    get_all_blob_containers.cache_clear()
+    get_container_accounts.cache_clear()
+    try:
+        os.remove(CONTAINER_CACHE_FILE)
+    except FileNotFoundError:
+        pass
+
+def _list_containers(account):
+    try:
+        return [c.name for c in get_blob_service_client(account).list_containers()]
+    except AzureError:
+        return []
+
+@lru_cache(maxsize=1)
 def get_all_blob_containers():
-    out, _, _ = run_az(["storage", "account", "list", "--query", "[].name", "-o", "tsv"])
-    accounts = out.splitlines()
+    subscription = get_subscription_id()
+    cached = _load_cached_containers(subscription)
+    if cached is not None:
+        return cached
     containers = []
-    for account in accounts:
-        c_out, _, _ = run_az(["storage", "container", "list", "--account-name", account, "--auth-mode", "login", "--query", "[].name", "-o", "tsv"])
-        for c in c_out.splitlines():
-            if c:
-                containers.append((c, account))
+    if not subscription:
+        return containers
+    try:
+        storage_client = get_storage_management_client(subscription)
+        accounts = [a.name for a in storage_client.storage_accounts.list()]
+    except AzureError:
+        return containers
+    if accounts:
+        with ThreadPoolExecutor(max_workers=min(32, len(accounts))) as executor:
+            for account, names in zip(accounts, executor.map(_list_containers, accounts)):
+                containers.extend((c, account) for c in names)
+    _save_cached_containers(subscription, containers)
     return containers
 
+# Container name -> account; the first account wins when names repeat
+@lru_cache(maxsize=1)
+def get_container_accounts():
+    accounts = {}
+    for c, a in get_all_blob_containers():
+        accounts.setdefault(c, a)
+    return accounts
+
 def list_all_blob_containers():
     containers = get_all_blob_containers()
     if not containers:
@@ -44,40 +207,59 @@ def list_all_blob_containers():
     for idx, (c, a) in enumerate(containers, 1):
         print(f"{idx:<3} {c:<30} {a:<30}")
 
+def _scan_dir(path, prefix):
+    with os.scandir(path) as it:
+        for entry in it:
+            name = f"{prefix}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan_dir(entry.path, f"{name}/")
+            elif entry.is_file():
+                yield entry.path, name, entry.stat().st_size
+
+# Yield (path, blob_name, size) for every file argument and every file under
+# a directory argument; directory contents keep their relative paths
+def _expand_inputs(paths):
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            print(f"{Colors.RED}File not found: {path}{Colors.NC}")
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            yield from _scan_dir(path, "")
+        else:
+            yield path, os.path.basename(path), st.st_size
+
 def upload_to_blob_container(files, container):
-    containers = get_all_blob_containers()
-    account = None
-    for c, a in containers:
-        if c == container:
-            account = a
-            break
+    account = get_container_accounts().get(container)
     if not account:
         print(f"{Colors.RED}Blob Container '{container}' not found.{Colors.NC}")
         return
-    for file in files:
-        if not os.path.isfile(file):
-            print(f"{Colors.RED}File not found: {file}{Colors.NC}")
-            continue
-        blob_name = os.path.basename(file)
-        print(f"Uploading {file} as blob '{blob_name}' to container '{container}' in account '{account}'...")
-        _, err, code = run_az(["storage", "blob", "upload", "--account-name", account, "--container-name", container, "--file", file, "--name", blob_name, "--auth-mode", "login"])
-        if code == 0:
-            print(f"{Colors.GREEN}Upload complete: {blob_name}{Colors.NC}")
-        else:
-            print(f"{Colors.RED}Upload failed for {file}: {err}{Colors.NC}")
+    container_client = get_blob_service_client(account).get_container_client(container)
+    with ThreadPoolExecutor(max_workers=TRANSFER_WORKERS) as executor:
+        futures = {}
+        for file, blob_name, size in _expand_inputs(files):
+            print(f"Uploading {file} as blob '{blob_name}' to container '{container}' in account '{account}'...")
+            futures[executor.submit(_upload_blob, container_client, file, blob_name, size)] = (file, blob_name)
+        for future in as_completed(futures):
+            file, blob_name = futures[future]
+            try:
+                future.result()
+                print(f"{Colors.GREEN}Upload complete: {blob_name}{Colors.NC}")
+            except (AzureError, OSError) as e:
+                print(f"{Colors.RED}Upload failed for {file}: {e}{Colors.NC}")
 
 def download_from_blob_container(container, blob=None):
-    containers = get_all_blob_containers()
-    account = None
-    for c, a in containers:
-        if c == container:
-            account = a
-            break
+    account = get_container_accounts().get(container)
     if not account:
         print(f"{Colors.RED}Blob Container '{container}' not found.{Colors.NC}")
         return
-    out, _, _ = run_az(["storage", "blob", "list", "--account-name", account, "--container-name", container, "--query", "[].name", "-o", "tsv", "--auth-mode", "login"])
-    blobs = out.splitlines()
+    container_client = get_blob_service_client(account).get_container_client(container)
+    try:
+        blobs = [b.name for b in container_client.list_blobs()]
+    except AzureError as e:
+        print(f"{Colors.RED}Error listing blobs: {e}{Colors.NC}")
+        return
     if not blobs:
         print(f"{Colors.RED}No blobs found.{Colors.NC}")
         return
@@ -87,14 +269,12 @@ def download_from_blob_container(container, blob=None):
             print(f"  {idx}) {b}")
         sel = input("Choose blob (ENTER = all): ")
         if not sel:
+            downloads = []
             for b in blobs:
                 default_path = os.path.expanduser(f"~/Downloads/{b}")
                 save_path = input(f"Download '{b}' to {default_path}? (ENTER to confirm, or type path): ") or default_path
-                _, err, code = run_az(["storage", "blob", "download", "--account-name", account, "--container-name", container, "--name", b, "--file", save_path, "--auth-mode", "login"])
-                if code == 0:
-                    print(f"{Colors.GREEN}Download complete: {save_path}{Colors.NC}")
-                else:
-                    print(f"{Colors.RED}Download failed for {b}: {err}{Colors.NC}")
+                downloads.append((b, save_path))
+            _download_blobs(container_client, downloads)
             return
         try:
             idx = int(sel) - 1
@@ -104,98 +284,205 @@ def download_from_blob_container(container, blob=None):
             return
     default_path = os.path.expanduser(f"~/Downloads/{blob}")
     save_path = input(f"Download '{blob}' to {default_path}? (ENTER to confirm, or type path): ") or default_path
-    _, err, code = run_az(["storage", "blob", "download", "--account-name", account, "--container-name", container, "--name", blob, "--file", save_path, "--auth-mode", "login"])
-    if code == 0:
-        print(f"{Colors.GREEN}Download complete: {save_path}{Colors.NC}")
-    else:
-        print(f"{Colors.RED}Download failed for {blob}: {err}{Colors.NC}")
+    _download_blobs(container_client, [(blob, save_path)])
 
-def dump_blob_container(container):
-    containers = get_all_blob_containers()
-    account = None
-    for c, a in containers:
-        if c == container:
-            account = a
+def _load_dump_manifest(cache_root):
+    try:
+        with open(os.path.join(cache_root, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_dump_manifest(cache_root, manifest):
+    with open(os.path.join(cache_root, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+def _dump_cache_path(cache_root, blob_name):
+    blobs_root = os.path.join(cache_root, "blobs")
+    path = os.path.normpath(os.path.join(blobs_root, blob_name))
+    # Never cache blob names that would escape the cache directory
+    if not path.startswith(blobs_root + os.sep):
+        return None
+    return path
+
+def _write_dump_entry(container_client, blob, entry, cache_root, manifest):
+    path = _dump_cache_path(cache_root, blob.name) if cache_root else None
+    state = {"etag": blob.etag, "size": blob.size}
+    if path and manifest.get(blob.name) == state and os.path.isfile(path) and os.path.getsize(path) == blob.size:
+        with open(path, "rb") as src:
+            shutil.copyfileobj(src, entry, ZIP_BUFFER_SIZE)
+        return
+    chunks = container_client.download_blob(blob.name).chunks()
+    if not path:
+        for chunk in chunks:
+            entry.write(chunk)
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    manifest.pop(blob.name, None)
+    with open(path, "wb") as dst:
+        for chunk in chunks:
+            entry.write(chunk)
+            dst.write(chunk)
+    manifest[blob.name] = state
+
+def _cache_dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                pass
+    return total
+
+# Drop least recently dumped containers until the cache fits DUMP_CACHE_MAX_BYTES
+def _evict_dump_cache():
+    entries = []
+    # Only account/container directories are cache entries; skip stray files
+    with os.scandir(DUMP_CACHE_DIR) as accounts:
+        account_dirs = [account.path for account in accounts if account.is_dir()]
+    for account_dir in account_dirs:
+        with os.scandir(account_dir) as containers:
+            container_dirs = [container.path for container in containers if container.is_dir()]
+        for path in container_dirs:
+            manifest = os.path.join(path, "manifest.json")
+            used = os.path.getmtime(manifest) if os.path.exists(manifest) else 0
+            entries.append((used, path, _cache_dir_size(path)))
+    total = sum(size for _, _, size in entries)
+    for _, path, size in sorted(entries):
+        if total <= DUMP_CACHE_MAX_BYTES:
             break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+# Swap zipfile's deflate engine for ISA-L when available; ISA-L only has
+# levels 0-3, so zlib levels 1-9 are mapped onto them. Level 0 (store)
+# always stays on zlib.
+@contextmanager
+def _deflate_backend(zip_level):
+    if isal_zlib is None or zip_level == 0:
+        yield zip_level
+        return
+    saved_zlib = zipfile.zlib
+    zipfile.zlib = isal_zlib
+    try:
+        yield min(3, (zip_level + 2) // 3)
+    finally:
+        zipfile.zlib = saved_zlib
+
+def dump_blob_container(container, zip_level=None, use_cache=False):
+    account = get_container_accounts().get(container)
     if not account:
         print(f"{Colors.RED}Blob Container '{container}' not found.{Colors.NC}")
         return
-    temp_dir = tempfile.mkdtemp()
-    print(f"Downloading all blobs from '{container}'...")
-    _, err, code = run_az(["storage", "blob", "download-batch", "--account-name", account, "--destination", temp_dir, "--source", container, "--auth-mode", "login"])
-    if code != 0:
-        print(f"{Colors.RED}Error downloading blobs: {err}{Colors.NC}")
-        shutil.rmtree(temp_dir)
-        return
+    container_client = get_blob_service_client(account).get_container_client(container)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     zip_name = f"{container}_{timestamp}.zip"
     default_zip = os.path.expanduser(f"~/Downloads/{zip_name}")
     zip_path = input(f"Save zip to {default_zip}? (ENTER to confirm, or type path): ") or default_zip
-    print(f"Zipping files to {zip_path}...")
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, _, files in os.walk(temp_dir):
-            for file in files:
-                abs_path = os.path.join(root, file)
-                rel_path = os.path.relpath(abs_path, temp_dir)
-                zipf.write(abs_path, rel_path)
+    print(f"Downloading all blobs from '{container}' into {zip_path}...")
+    cache_root = os.path.join(DUMP_CACHE_DIR, account, container) if use_cache else None
+    manifest = {}
+    if cache_root:
+        os.makedirs(cache_root, exist_ok=True)
+        manifest = _load_dump_manifest(cache_root)
+    if zip_level is None:
+        zip_level = DEFAULT_ZIP_LEVEL
+    # Blobs are streamed chunk by chunk straight into their zip entries
+    try:
+        with _deflate_backend(zip_level) as level, \
+                open(zip_path, 'wb', buffering=ZIP_BUFFER_SIZE) as zip_file, \
+                zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED, compresslevel=level, allowZip64=True) as zipf:
+            for blob in container_client.list_blobs():
+                with zipf.open(blob.name, 'w', force_zip64=True) as raw, \
+                        io.BufferedWriter(raw, buffer_size=ZIP_BUFFER_SIZE) as entry:
+                    _write_dump_entry(container_client, blob, entry, cache_root, manifest)
+    except (AzureError, OSError) as e:
+        print(f"{Colors.RED}Error downloading blobs: {e}{Colors.NC}")
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        return
+    finally:
+        if cache_root:
+            _save_dump_manifest(cache_root, manifest)
+    if cache_root:
+        _evict_dump_cache()
     print(f"{Colors.GREEN}Dump complete: {zip_path}{Colors.NC}")
-    shutil.rmtree(temp_dir)
 
 def info_blob_container(container):
-    containers = get_all_blob_containers()
-    account = None
-    for c, a in containers:
-        if c == container:
-            account = a
-            break
+    account = get_container_accounts().get(container)
     if not account:
         print(f"{Colors.RED}Blob Container '{container}' not found.{Colors.NC}")
         return
-    out, err, code = run_az(["storage", "container", "show", "--account-name", account, "--name", container, "--auth-mode", "login"])
-    if code == 0:
-        print(out)
-    else:
-        print(f"{Colors.RED}Error: {err}{Colors.NC}")
+    container_client = get_blob_service_client(account).get_container_client(container)
+    try:
+        props = container_client.get_container_properties()
+        print(json.dumps(dict(props), indent=2, default=str))
+    except AzureError as e:
+        print(f"{Colors.RED}Error: {e}{Colors.NC}")
 
 def main():
-    if len(sys.argv) < 2:
+    # --refresh discards cached container listings before running the command
+    # --zip-level N sets the dump deflate level (1 = fastest, 9 = smallest)
+    # --cache keeps dumped blobs locally and only re-downloads changed ones
+    args = []
+    refresh = False
+    use_cache = False
+    zip_level = None
+    argv = iter(sys.argv[1:])
+    for arg in argv:
+        if arg == "--refresh":
+            refresh = True
+        elif arg == "--cache":
+            use_cache = True
+        elif arg == "--zip-level":
+            zip_level = next(argv, "")
+            if not zip_level.isdigit() or int(zip_level) > 9:
+                print(f"{Colors.RED}--zip-level must be between 0 and 9.{Colors.NC}")
+                return
+            zip_level = int(zip_level)
+        else:
+            args.append(arg)
+    if refresh:
+        clear_container_cache()
+    if len(args) < 1:
         banner()
-        print("Usage: blob_storage_manager.py [COMMAND] [ARGS]")
+        print("Usage: blob_storage_manager.py [COMMAND] [ARGS] [--refresh] [--zip-level N] [--cache]")
         print("Commands: list, upload, download, dump, info")
         return
-    cmd = sys.argv[1]
+    cmd = args[0]
     if cmd == "list":
         banner()
         list_all_blob_containers()
     elif cmd == "upload":
         banner()
-        if len(sys.argv) < 4:
-            print("Usage: upload <file1> [file2 ...] <container>")
+        if len(args) < 3:
+            print("Usage: upload <file|folder> [file2 ...] <container>")
             return
-        files = sys.argv[2:-1]
-        container = sys.argv[-1]
+        files = args[1:-1]
+        container = args[-1]
         upload_to_blob_container(files, container)
     elif cmd == "download":
         banner()
-        if len(sys.argv) < 3:
+        if len(args) < 2:
             print("Usage: download <container> [blob]")
             return
-        container = sys.argv[2]
-        blob = sys.argv[3] if len(sys.argv) > 3 else None
+        container = args[1]
+        blob = args[2] if len(args) > 2 else None
         download_from_blob_container(container, blob)
     elif cmd == "dump":
         banner()
-        if len(sys.argv) < 3:
-            print("Usage: dump <container>")
+        if len(args) < 2:
+            print("Usage: dump <container> [--zip-level N] [--cache]")
             return
-        container = sys.argv[2]
-        dump_blob_container(container)
+        container = args[1]
+        dump_blob_container(container, zip_level, use_cache)
     elif cmd == "info":
         banner()
-        if len(sys.argv) < 3:
+        if len(args) < 2:
             print("Usage: info <container>")
             return
-        container = sys.argv[2]
+        container = args[1]
         info_blob_container(container)
     else:
         print("Unknown command.")
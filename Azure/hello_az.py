@@ -6,9 +6,9 @@ Author: NimbusDFIR
 Description: Tests Azure connection and displays account information
 """
 
+import asyncio
 import subprocess
 import sys
-import json
 from typing import Optional
 
 # ANSI color codes
@@ -49,35 +49,65 @@ def check_logged_in() -> bool:
     result = run_az_command(['az', 'account', 'show'])
     return result is not None
 
-def get_account_info() -> dict:
-    """Get Azure account information."""
-    result = run_az_command(['az', 'account', 'show', '--output', 'json'])
+async def run_az_command_async(command: list) -> Optional[str]:
+    """Run an Azure CLI command without blocking the event loop and return output."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        return None
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        return None
+    return stdout.decode().strip()
+
+async def run_az_tsv(command: list) -> list:
+    """Run an Azure CLI command with TSV output and return its rows as field lists."""
+    result = await run_az_command_async(command + ['--output', 'tsv'])
     if result:
-        return json.loads(result)
+        return [line.split('\t') for line in result.splitlines()]
+    return []
+
+async def get_account_info() -> dict:
+    """Get Azure account information."""
+    rows = await run_az_tsv(['az', 'account', 'show', '--query', '[name, id, tenantId, user.name, user.type]'])
+    if rows and len(rows[0]) == 5:
+        name, sub_id, tenant_id, user_name, user_type = rows[0]
+        return {'name': name, 'id': sub_id, 'tenantId': tenant_id, 'user': {'name': user_name, 'type': user_type}}
     return {}
 
-def get_subscriptions() -> list:
+async def get_subscriptions() -> list:
     """Get all Azure subscriptions."""
-    result = run_az_command(['az', 'account', 'list', '--output', 'json'])
-    if result:
-        return json.loads(result)
-    return []
+    rows = await run_az_tsv(['az', 'account', 'list', '--query', '[].[name, state, id, isDefault]'])
+    return [
+        {'name': name, 'state': state, 'id': sub_id, 'isDefault': is_default.lower() == 'true'}
+        for name, state, sub_id, is_default in (row for row in rows if len(row) == 4)
+    ]
 
-def get_locations() -> list:
+async def get_locations() -> list:
     """Get Azure locations."""
-    result = run_az_command(['az', 'account', 'list-locations', '--output', 'json'])
-    if result:
-        return json.loads(result)
-    return []
+    rows = await run_az_tsv(['az', 'account', 'list-locations', '--query', '[].[displayName, name]'])
+    return [{'displayName': display_name, 'name': name} for display_name, name in (row for row in rows if len(row) == 2)]
 
-def get_az_version() -> str:
+async def get_az_version() -> str:
     """Get Azure CLI version."""
-    result = run_az_command(['az', 'version', '--output', 'json'])
-    if result:
-        version_info = json.loads(result)
-        return version_info.get('azure-cli', 'unknown')
+    rows = await run_az_tsv(['az', 'version', '--query', '"azure-cli"'])
+    if rows:
+        return rows[0][0]
     return 'unknown'
 
+async def gather_az_info() -> tuple:
+    """Run the independent Azure CLI queries concurrently."""
+    return await asyncio.gather(
+        get_account_info(),
+        get_subscriptions(),
+        get_locations(),
+        get_az_version()
+    )
+
 def main():
     """Main function."""
     print(f"{Colors.BLUE}==========================================")
@@ -107,8 +137,10 @@ def main():
     print(f"{Colors.GREEN}[SUCCESS]{Colors.NC} Azure connection successful!")
     print()
 
+    # The remaining queries are independent, so run them concurrently
+    account_info, subscriptions, locations, az_version = asyncio.run(gather_az_info())
+
     # Get account information
-    account_info = get_account_info()
     if account_info:
         print(f"{Colors.CYAN}Account Information:{Colors.NC}")
         print("====================")
@@ -120,7 +152,6 @@ def main():
         print()
 
     # List subscriptions
-    subscriptions = get_subscriptions()
     if subscriptions:
         print(f"{Colors.CYAN}Available Subscriptions:{Colors.NC}")
         print("====================")
@@ -131,7 +162,6 @@ def main():
         print()
 
     # List locations
-    locations = get_locations()
     if locations:
         print(f"{Colors.CYAN}Available Locations (Regions):{Colors.NC}")
         print("====================")
@@ -142,7 +172,6 @@ def main():
         print()
 
     # Get Azure CLI version
-    az_version = get_az_version()
     print(f"{Colors.BLUE}[INFO]{Colors.NC} Azure CLI Version: {Colors.GREEN}{az_version}{Colors.NC}")
     print()
 
@@ -10,12 +10,55 @@ import os
 import json
 import subprocess
 import time
-import argparse
-import getpass
+import importlib.util
 import tempfile
 import signal
+import socket
+import threading
 import atexit
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from azure.core.exceptions import AzureError
+
+# Optional incremental JSON parser for large `az ... list` outputs
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Parallel deletions of the jump server's dependent resources
+CLEANUP_WORKERS = 5
+
+# ARM clients used instead of spawning `az` for the hot-path calls; imported on first
+# use since the management SDKs dominate startup time
+MGMT_CLIENTS = {
+    'mysql': ('azure.mgmt.rdbms.mysql_flexibleservers', 'MySQLManagementClient'),
+    'compute': ('azure.mgmt.compute', 'ComputeManagementClient'),
+    'network': ('azure.mgmt.network', 'NetworkManagementClient'),
+}
+
+# TCP probe backoff while waiting for the jump server's sshd
+SSH_PROBE_TIMEOUT = 3
+SSH_PROBE_INITIAL_DELAY = 0.5
+SSH_PROBE_MAX_DELAY = 8
+SSH_READY_TIMEOUT = 120
+
+# ARM template for new jump servers (public IP, NSG, VNet, NIC and VM)
+JUMPSERVER_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mysql_jumpserver.json')
+
+# Shared SSH connection so the readiness probe and the tunnel pay for one handshake
+SSH_CONTROL_PATH = '~/.ssh/nimbus-cm-%r@%h:%p'
+SSH_CONTROL_PERSIST = '60s'
+
+# Polling for the local end of the SSH tunnel
+TUNNEL_POLL_INTERVAL = 0.05
+TUNNEL_READY_TIMEOUT = 10
+
+# Successful prerequisite probes are remembered so warm runs skip the subprocesses
+CACHE_DIR = os.path.expanduser('~/.cache/nimbusdfir')
+PREREQ_CACHE_FILE = os.path.join(CACHE_DIR, 'prereqs.json')
+PREREQ_CACHE_TTL = {'az': 3600, 'mysql': 3600, 'account': 900}
 
 
 class Colors:
@@ -30,8 +73,18 @@ class Colors:
 
 class AzureMySQLConnector:
     def __init__(self):
-        self.jumpserver_info_file = os.path.join(tempfile.gettempdir(), 'azure_mysql_jumpserver_info.txt')
+        self.jumpserver_info_file = os.path.join(tempfile.gettempdir(), 'azure_mysql_jumpserver_info.json')
+        self._jumpserver_state: Optional[Dict] = None
+        self._servers_cache: Optional[List[Dict]] = None
+        self._credential = None
+        self._subscription_id: Optional[str] = None
+        self._clients: Dict = {}
+        self._clients_lock = threading.Lock()
+        self._ssh_tunnel_proc: Optional[subprocess.Popen] = None
+        self._native = False
+        self._ssh_key_path = os.path.expanduser('~/.ssh/id_rsa')
         atexit.register(self.cleanup_jumpserver)
+        atexit.register(self._close_tunnel)
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
     
@@ -41,10 +94,16 @@ class AzureMySQLConnector:
         self.cleanup_jumpserver()
         sys.exit(1)
     
-    def run_command(self, cmd: List[str], capture_output: bool = True, check: bool = True) -> subprocess.CompletedProcess:
+    def _banner(self, title: str, color: str = Colors.BLUE):
+        """Write a framed section header in a single call"""
+        rule = '=' * 42
+        sys.stdout.write(f"{color}{rule}\n{title}\n{rule}{Colors.NC}\n")
+    
+    def run_command(self, cmd: List[str], capture_output: bool = True, check: bool = True,
+                    env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
         """Run a command and return the result"""
         try:
-            return subprocess.run(cmd, capture_output=capture_output, text=True, check=check)
+            return subprocess.run(cmd, capture_output=capture_output, text=True, check=check, env=env)
         except subprocess.CalledProcessError as e:
             if capture_output:
                 print(f"{Colors.RED}Command failed: {' '.join(cmd)}{Colors.NC}")
@@ -52,61 +111,169 @@ class AzureMySQLConnector:
                     print(f"{Colors.RED}Error: {e.stderr.strip()}{Colors.NC}")
             raise
     
+    def run_json_list(self, cmd: List[str], project) -> List[Dict]:
+        """Run an az list command and project each JSON array item, streaming via ijson if available"""
+        if ijson is None:
+            result = self.run_command(cmd)
+            return [project(item) for item in json.loads(result.stdout)]
+        
+        parse_error = None
+        with tempfile.TemporaryFile('w+') as stderr:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+            try:
+                items = [project(item) for item in ijson.items(proc.stdout, 'item')]
+            except ijson.JSONError as e:
+                proc.kill()
+                parse_error = e
+            finally:
+                proc.stdout.close()
+                proc.wait()
+            if proc.returncode != 0:
+                stderr.seek(0)
+                error = stderr.read()
+                print(f"{Colors.RED}Command failed: {' '.join(cmd)}{Colors.NC}")
+                if error:
+                    print(f"{Colors.RED}Error: {error.strip()}{Colors.NC}")
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=error)
+        if parse_error is not None:
+            raise json.JSONDecodeError(str(parse_error), '', 0)
+        return items
+    
+    def _get_subscription_id(self) -> str:
+        """Return the active subscription, preferring AZURE_SUBSCRIPTION_ID over the CLI"""
+        if self._subscription_id is None:
+            self._subscription_id = os.environ.get('AZURE_SUBSCRIPTION_ID') or self.run_command([
+                'az', 'account', 'show', '--query', 'id', '-o', 'tsv'
+            ]).stdout.strip()
+        return self._subscription_id
+    
+    def _client(self, kind: str):
+        """Return a shared management client so ARM calls reuse one connection pool"""
+        with self._clients_lock:
+            if kind not in self._clients:
+                if self._credential is None:
+                    from azure.identity import DefaultAzureCredential
+                    self._credential = DefaultAzureCredential()
+                module_name, class_name = MGMT_CLIENTS[kind]
+                client_class = getattr(importlib.import_module(module_name), class_name)
+                self._clients[kind] = client_class(self._credential, self._get_subscription_id())
+            return self._clients[kind]
+    
+    @staticmethod
+    def _parse_resource_id(resource_id: str) -> Tuple[str, str]:
+        """Split an ARM resource ID into (resource group, name)"""
+        parts = resource_id.split('/')
+        return parts[4], parts[-1]
+    
+    @staticmethod
+    def _enum_value(value):
+        """Return the plain string behind an SDK enum"""
+        return getattr(value, 'value', value)
+    
+    def _load_prereq_cache(self) -> Dict:
+        """Load timestamps of previously successful prerequisite checks"""
+        try:
+            with open(PREREQ_CACHE_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_prereq_cache(self, cache: Dict):
+        """Persist prerequisite check timestamps"""
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(PREREQ_CACHE_FILE, 'w') as f:
+                json.dump(cache, f)
+        except OSError:
+            pass
+    
     def check_prerequisites(self):
         """Check if required tools are installed"""
+        cache = self._load_prereq_cache()
+        now = time.time()
+        
+        def fresh(key):
+            return now - cache.get(key, 0) < PREREQ_CACHE_TTL[key]
+        
         # Check Azure CLI
-        try:
-            self.run_command(['az', '--version'], capture_output=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print(f"{Colors.RED}Error: Azure CLI is not installed{Colors.NC}")
-            print("Please install Azure CLI first")
-            sys.exit(1)
+        if not fresh('az'):
+            try:
+                self.run_command(['az', '--version'], capture_output=True)
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                print(f"{Colors.RED}Error: Azure CLI is not installed{Colors.NC}")
+                print("Please install Azure CLI first")
+                sys.exit(1)
+            cache['az'] = now
         
         # Check MySQL client
-        try:
-            self.run_command(['mysql', '--version'], capture_output=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print(f"{Colors.RED}Error: MySQL client is not installed{Colors.NC}")
-            print("Please install MySQL client first")
-            print("macOS: brew install mysql-client")
-            print("Ubuntu/Debian: sudo apt-get install mysql-client")
-            print("Windows: Download from https://dev.mysql.com/downloads/mysql/")
-            sys.exit(1)
+        if self._native:
+            if importlib.util.find_spec('pymysql') is None:
+                print(f"{Colors.RED}Error: --native requires PyMySQL{Colors.NC}")
+                print("Run: pip install pymysql")
+                sys.exit(1)
+        elif not fresh('mysql'):
+            try:
+                self.run_command(['mysql', '--version'], capture_output=True)
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                print(f"{Colors.RED}Error: MySQL client is not installed{Colors.NC}")
+                print("Please install MySQL client first")
+                print("macOS: brew install mysql-client")
+                print("Ubuntu/Debian: sudo apt-get install mysql-client")
+                print("Windows: Download from https://dev.mysql.com/downloads/mysql/")
+                sys.exit(1)
+            cache['mysql'] = now
         
         # Check Azure login
-        try:
-            self.run_command(['az', 'account', 'show'], capture_output=True)
-        except subprocess.CalledProcessError:
-            print(f"{Colors.RED}Error: Not logged in to Azure{Colors.NC}")
-            print("Please run: az login")
-            sys.exit(1)
+        if not fresh('account'):
+            try:
+                self.run_command(['az', 'account', 'show'], capture_output=True)
+            except subprocess.CalledProcessError:
+                print(f"{Colors.RED}Error: Not logged in to Azure{Colors.NC}")
+                print("Please run: az login")
+                sys.exit(1)
+            cache['account'] = now
+        
+        self._save_prereq_cache(cache)
     
     def show_usage(self):
         """Display usage information"""
-        print(f"{Colors.BLUE}==========================================")
-        print("Azure MySQL Connect - NimbusDFIR")
-        print(f"=========================================={Colors.NC}")
+        self._banner("Azure MySQL Connect - NimbusDFIR")
         print()
-        print("Usage: python mysql_connect.py [SERVER_NAME]")
+        print("Usage: python mysql_connect.py [SERVER_NAME] [-g RESOURCE_GROUP] [--native]")
         print()
         print("Description:")
         print("  Connects to an Azure MySQL Flexible Server")
         print("  - For public servers: connects directly")
         print("  - For private servers: creates Azure VM jump server with SSH tunnel")
+        print("  - With --native: uses the built-in PyMySQL client instead of the mysql CLI")
         print()
         print("Examples:")
         print("  python mysql_connect.py my-mysql-server")
+        print("  python mysql_connect.py my-mysql-server -g my-resource-group")
         print("  python mysql_connect.py")
         print()
     
+    def _server_to_dict(self, server) -> Dict:
+        """Convert an SDK server model to the CLI-shaped fields this script reads"""
+        network = server.network
+        public_access = self._enum_value(network.public_network_access) if network else None
+        return {
+            'name': server.name,
+            'resourceGroup': self._parse_resource_id(server.id)[0],
+            'state': self._enum_value(server.state),
+            'fullyQualifiedDomainName': server.fully_qualified_domain_name,
+            'version': self._enum_value(server.version),
+            'location': server.location,
+            'network': {'publicNetworkAccess': public_access or 'Unknown'},
+        }
+    
     def list_servers(self) -> List[Dict]:
         """List available MySQL servers"""
         print(f"{Colors.BLUE}Available Azure MySQL Flexible Servers:{Colors.NC}")
         print()
         
         try:
-            result = self.run_command(['az', 'mysql', 'flexible-server', 'list', '--output', 'json'])
-            servers = json.loads(result.stdout)
+            servers = [self._server_to_dict(server) for server in self._client('mysql').servers.list()]
             
             if not servers:
                 print(f"{Colors.YELLOW}No MySQL flexible servers found{Colors.NC}")
@@ -117,27 +284,47 @@ class AzureMySQLConnector:
                 print(f"{i}. {server['name']} ({server['resourceGroup']} - {server['state']} - Public: {public_access})")
             print()
             
+            self._servers_cache = servers
             return servers
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+        except (subprocess.CalledProcessError, AzureError) as e:
             print(f"{Colors.RED}Error retrieving MySQL servers: {e}{Colors.NC}")
             sys.exit(1)
     
-    def get_server_info(self, server_name: str) -> Dict:
+    def _show_server(self, server_name: str, resource_group: str) -> Optional[Dict]:
+        """Fetch a single server by name and resource group"""
+        try:
+            return self._server_to_dict(self._client('mysql').servers.get(resource_group, server_name))
+        except AzureError:
+            return None
+    
+    def _count_firewall_rules(self, server_name: str, resource_group: str) -> Optional[int]:
+        """Return the number of firewall rules on a server, or None if it cannot be read"""
+        try:
+            return sum(1 for _ in self._client('mysql').firewall_rules.list_by_server(resource_group, server_name))
+        except AzureError:
+            return None
+    
+    def get_server_info(self, server_name: str, resource_group: Optional[str] = None) -> Dict:
         """Get server information"""
         try:
-            result = self.run_command([
-                'az', 'mysql', 'flexible-server', 'list',
-                '--query', f"[?name=='{server_name}']",
-                '-o', 'json'
-            ])
-            servers = json.loads(result.stdout)
+            fw_future = None
+            # Reuse the listing from list_servers() when the user picked interactively
+            if self._servers_cache:
+                server = next((s for s in self._servers_cache if s['name'] == server_name), None)
+            elif resource_group:
+                # Single-resource GET, with the firewall probe issued alongside it
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    server_future = executor.submit(self._show_server, server_name, resource_group)
+                    fw_future = executor.submit(self._count_firewall_rules, server_name, resource_group)
+                    server = server_future.result()
+            else:
+                server = next((self._server_to_dict(s) for s in self._client('mysql').servers.list()
+                               if s.name == server_name), None)
             
-            if not servers:
+            if server is None:
                 print(f"{Colors.RED}Error: MySQL server '{server_name}' not found{Colors.NC}")
                 sys.exit(1)
             
-            server = servers[0]
-            
             if server['state'] != 'Ready':
                 print(f"{Colors.RED}Error: Server is not ready (Status: {server['state']}){Colors.NC}")
                 sys.exit(1)
@@ -146,19 +333,15 @@ class AzureMySQLConnector:
             public_access = server.get('network', {}).get('publicNetworkAccess', 'Disabled')
             
             if public_access == 'Enabled':
-                try:
-                    fw_result = self.run_command([
-                        'az', 'mysql', 'flexible-server', 'firewall-rule', 'list',
-                        '--resource-group', server['resourceGroup'],
-                        '--name', server_name,
-                        '--query', 'length(@)',
-                        '-o', 'tsv'
-                    ])
-                    if int(fw_result.stdout.strip()) == 0:
-                        print(f"{Colors.YELLOW}Warning: Server has public access enabled but no firewall rules{Colors.NC}")
-                        print(f"{Colors.YELLOW}Treating as private server - will use jump server{Colors.NC}")
-                        public_access = 'Disabled'
-                except subprocess.CalledProcessError:
+                if fw_future is not None:
+                    rule_count = fw_future.result()
+                else:
+                    rule_count = self._count_firewall_rules(server_name, server['resourceGroup'])
+                if rule_count is None:
+                    public_access = 'Disabled'
+                elif rule_count == 0:
+                    print(f"{Colors.YELLOW}Warning: Server has public access enabled but no firewall rules{Colors.NC}")
+                    print(f"{Colors.YELLOW}Treating as private server - will use jump server{Colors.NC}")
                     public_access = 'Disabled'
             
             return {
@@ -170,12 +353,14 @@ class AzureMySQLConnector:
                 'public_access': public_access,
                 'status': server['state']
             }
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+        except (subprocess.CalledProcessError, AzureError) as e:
             print(f"{Colors.RED}Error getting server information: {e}{Colors.NC}")
             sys.exit(1)
     
     def connect_public_mysql(self, server_info: Dict):
         """Connect to public MySQL server"""
+        import getpass
+        
         print(f"{Colors.GREEN}Server has public access enabled{Colors.NC}")
         print("Connecting directly to MySQL server...")
         print()
@@ -200,16 +385,125 @@ class AzureMySQLConnector:
         print("Connecting to MySQL...")
         
         # Build MySQL command
-        mysql_cmd = ['mysql', '-h', server_info['fqdn'], '-u', mysql_user, f'-p{mysql_password}']
+        mysql_cmd = ['mysql', '-h', server_info['fqdn'], '-u', mysql_user]
         if db_name:
             mysql_cmd.append(db_name)
         
+        if self._native:
+            if not self._run_native_client(server_info['fqdn'], 3306, mysql_user, mysql_password, db_name):
+                sys.exit(1)
+            return
+        
         try:
-            self.run_command(mysql_cmd, capture_output=False, check=True)
+            self.run_command(mysql_cmd, capture_output=False, check=True,
+                             env={**os.environ, 'MYSQL_PWD': mysql_password})
         except subprocess.CalledProcessError:
             print(f"{Colors.RED}MySQL connection failed{Colors.NC}")
             sys.exit(1)
     
+    def _run_native_client(self, host: str, port: int, user: str, password: str, database: str) -> bool:
+        """Run a minimal interactive SQL prompt over PyMySQL; return False if the connection fails"""
+        import pymysql
+        
+        try:
+            # TLS without certificate verification, like the mysql CLI's default ssl-mode
+            conn = pymysql.connect(host=host, port=port, user=user, password=password,
+                                   database=database or None, ssl={'check_hostname': False})
+        except pymysql.MySQLError as e:
+            print(f"{Colors.RED}MySQL connection failed: {e}{Colors.NC}")
+            return False
+        
+        print("Type SQL statements terminated by ';' (exit or quit to leave)")
+        buffer: List[str] = []
+        try:
+            while True:
+                try:
+                    line = input('mysql> ' if not buffer else '    -> ')
+                except EOFError:
+                    print()
+                    break
+                if not buffer and line.strip().rstrip(';').lower() in ('exit', 'quit', '\\q'):
+                    break
+                buffer.append(line)
+                if not line.rstrip().endswith(';'):
+                    continue
+                sql = '\n'.join(buffer)
+                buffer = []
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute(sql)
+                        if cursor.description:
+                            rows = cursor.fetchall()
+                            print('\t'.join(col[0] for col in cursor.description))
+                            for row in rows:
+                                print('\t'.join('NULL' if value is None else str(value) for value in row))
+                            print(f"{len(rows)} row(s) in set")
+                        else:
+                            print(f"Query OK, {cursor.rowcount} row(s) affected")
+                    conn.commit()
+                except pymysql.MySQLError as e:
+                    print(f"{Colors.RED}ERROR: {e}{Colors.NC}")
+        finally:
+            conn.close()
+        return True
+    
+    def _save_jumpserver_state(self, name: str, resource_group: str, public_ip: str):
+        """Atomically record the jump server so it can be cleaned up later"""
+        state = {'name': name, 'rg': resource_group, 'ip': public_ip}
+        with tempfile.NamedTemporaryFile('w', delete=False, dir=tempfile.gettempdir(), suffix='.json') as tmp:
+            json.dump(state, tmp)
+        os.replace(tmp.name, self.jumpserver_info_file)
+        self._jumpserver_state = state
+    
+    def _load_jumpserver_state(self) -> Optional[Dict]:
+        """Return the recorded jump server, preferring the in-process copy"""
+        if self._jumpserver_state is not None:
+            return self._jumpserver_state
+        if not os.path.exists(self.jumpserver_info_file):
+            return None
+        with open(self.jumpserver_info_file, 'r') as f:
+            return json.load(f)
+    
+    def _vm_show(self, resource_group: str, name: str) -> Dict:
+        """Fetch a VM's public IP and power state"""
+        network = self._client('network')
+        vm = self._client('compute').virtual_machines.get(resource_group, name, expand='instanceView')
+        statuses = vm.instance_view.statuses if vm.instance_view else []
+        power = next((st.display_status for st in statuses or [] if (st.code or '').startswith('PowerState/')), None)
+        
+        ip = None
+        for nic_ref in vm.network_profile.network_interfaces:
+            nic = network.network_interfaces.get(*self._parse_resource_id(nic_ref.id))
+            for ip_config in nic.ip_configurations:
+                if ip_config.public_ip_address:
+                    ip = network.public_ip_addresses.get(
+                        *self._parse_resource_id(ip_config.public_ip_address.id)).ip_address
+                    break
+            if ip:
+                break
+        return {'ip': ip, 'power': power}
+    
+    def _list_jumpserver_ips(self, resource_group: str) -> Dict[str, str]:
+        """Map jump server public IP resource names to their addresses"""
+        try:
+            return {ip.name: ip.ip_address
+                    for ip in self._client('network').public_ip_addresses.list(resource_group)
+                    if ip.name.startswith('mysql-jumpserver') and ip.ip_address}
+        except AzureError:
+            return {}
+    
+    def _ensure_ssh_public_key(self) -> str:
+        """Return the jump server public key, generating a key pair if none exists"""
+        public_key_path = f'{self._ssh_key_path}.pub'
+        if not os.path.isfile(public_key_path):
+            if os.path.isfile(self._ssh_key_path):
+                # Never let ssh-keygen offer to overwrite an existing private key
+                return self.run_command(['ssh-keygen', '-y', '-f', self._ssh_key_path]).stdout.strip()
+            os.makedirs(os.path.dirname(self._ssh_key_path), mode=0o700, exist_ok=True)
+            self.run_command(['ssh-keygen', '-t', 'rsa', '-b', '4096', '-f', self._ssh_key_path, '-N', '', '-q'])
+        with open(public_key_path, 'r') as f:
+            return f.read().strip()
+    
     def create_jumpserver_vm(self, server_info: Dict) -> Dict:
         """Create or use existing jump server VM"""
         print(f"{Colors.YELLOW}Server is private - checking for existing jump server...{Colors.NC}")
@@ -218,20 +512,30 @@ class AzureMySQLConnector:
         jumpserver_rg = server_info['resource_group']
         jumpserver_location = server_info['location']
 
-        # Check for existing jump server VMs
+        # Check for existing jump server VMs, listing their public IP resources alongside
         try:
-            result = self.run_command([
-                'az', 'vm', 'list',
-                '--resource-group', jumpserver_rg,
-                '--query', "[?starts_with(name, 'mysql-jumpserver')].{name:name, state:powerState, ip:publicIps}",
-                '-o', 'json'
-            ])
-            existing_jumpservers = json.loads(result.stdout)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                vms_future = executor.submit(self.run_json_list, [
+                    'az', 'vm', 'list',
+                    '--resource-group', jumpserver_rg,
+                    '--show-details',
+                    '--query', "[?starts_with(name, 'mysql-jumpserver')].{name:name, state:powerState, ip:publicIps}",
+                    '-o', 'json'
+                ], dict)
+                ips_future = executor.submit(self._list_jumpserver_ips, jumpserver_rg)
+                existing_jumpservers = vms_future.result()
+                jumpserver_ips = ips_future.result()
+            
+            # Deallocated VMs report no publicIps, but their static IP resource keeps its address
+            for jumpserver in existing_jumpservers:
+                jumpserver['state'] = jumpserver.get('state') or 'Unknown'
+                if not jumpserver.get('ip'):
+                    jumpserver['ip'] = jumpserver_ips.get(f"{jumpserver['name']}-ip") or 'No IP'
             
             if existing_jumpservers:
                 print(f"{Colors.GREEN}Found {len(existing_jumpservers)} existing jump server VM(s){Colors.NC}")
                 for i, jumpserver in enumerate(existing_jumpservers, 1):
-                    print(f"{i}. {jumpserver['name']} - {jumpserver['state']} - {jumpserver.get('ip', 'No IP')}")
+                    print(f"{i}. {jumpserver['name']} - {jumpserver['state']} - {jumpserver['ip']}")
                 print()
                 
                 use_existing = input("Use existing jump server? (Y/n): ").lower()
@@ -239,17 +543,6 @@ class AzureMySQLConnector:
                     jumpserver = existing_jumpservers[0]
                     jumpserver_name = jumpserver['name']
                     
-                    # Get public IP
-                    ip_result = self.run_command([
-                        'az', 'vm', 'show',
-                        '--resource-group', jumpserver_rg,
-                        '--name', jumpserver_name,
-                        '--show-details',
-                        '--query', 'publicIps',
-                        '-o', 'tsv'
-                    ])
-                    jumpserver_public_ip = ip_result.stdout.strip()
-                    
                     # Start VM if stopped
                     if 'stopped' in jumpserver['state'].lower() or 'deallocated' in jumpserver['state'].lower():
                         print(f"{Colors.YELLOW}Starting existing jump server VM: {jumpserver_name}{Colors.NC}")
@@ -259,33 +552,28 @@ class AzureMySQLConnector:
                             '--name', jumpserver_name,
                             '--no-wait'
                         ])
-                        time.sleep(10)
-                        
-                        # Get IP after starting
-                        ip_result = self.run_command([
-                            'az', 'vm', 'show',
+                        self.run_command([
+                            'az', 'vm', 'wait',
                             '--resource-group', jumpserver_rg,
                             '--name', jumpserver_name,
-                            '--show-details',
-                            '--query', 'publicIps',
-                            '-o', 'tsv'
+                            '--custom', "instanceView.statuses[?code=='PowerState/running']"
                         ])
-                        jumpserver_public_ip = ip_result.stdout.strip()
+                    
+                    jumpserver_public_ip = self._vm_show(jumpserver_rg, jumpserver_name).get('ip') or ''
                     
                     print(f"{Colors.GREEN}✓ Using existing jump server VM: {jumpserver_name}{Colors.NC}")
                     print(f"Public IP: {jumpserver_public_ip}")
                     print()
                     
                     # Save jump server info
-                    with open(self.jumpserver_info_file, 'w') as f:
-                        f.write(f"{jumpserver_name}|{jumpserver_rg}|{jumpserver_public_ip}")
+                    self._save_jumpserver_state(jumpserver_name, jumpserver_rg, jumpserver_public_ip)
                     
                     return {
                         'name': jumpserver_name,
                         'resource_group': jumpserver_rg,
                         'public_ip': jumpserver_public_ip
                     }
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, AzureError):
             pass  # No existing bastions found
         
         # Create new jump server VM
@@ -301,24 +589,22 @@ class AzureMySQLConnector:
         print("Launching VM (this may take 2-3 minutes)...")
         
         try:
+            # One ARM deployment lets Azure provision the IP, NSG, VNet and NIC in parallel
             result = self.run_command([
-                'az', 'vm', 'create',
+                'az', 'deployment', 'group', 'create',
                 '--resource-group', jumpserver_rg,
                 '--name', jumpserver_name,
-                '--location', jumpserver_location,
-                '--image', 'Ubuntu2204',
-                '--size', 'Standard_B1s',
-                '--admin-username', 'azureuser',
-                '--generate-ssh-keys',
-                '--public-ip-sku', 'Standard',
-                '--public-ip-address', f'{jumpserver_name}-ip',
-                '--nsg', f'{jumpserver_name}-nsg',
-                '--nsg-rule', 'SSH',
-                '--output', 'json'
+                '--template-file', JUMPSERVER_TEMPLATE,
+                '--parameters',
+                f'vmName={jumpserver_name}',
+                f'location={jumpserver_location}',
+                f'sshPublicKey={self._ensure_ssh_public_key()}',
+                '--query', 'properties.outputs.publicIp.value',
+                '--only-show-errors',
+                '-o', 'tsv'
             ])
             
-            vm_info = json.loads(result.stdout)
-            jumpserver_public_ip = vm_info['publicIpAddress']
+            jumpserver_public_ip = result.stdout.strip()
             
             if not jumpserver_public_ip:
                 raise Exception("Failed to get jump server VM public IP")
@@ -328,65 +614,140 @@ class AzureMySQLConnector:
             print()
             
             # Save jump server info for cleanup
-            with open(self.jumpserver_info_file, 'w') as f:
-                f.write(f"{jumpserver_name}|{jumpserver_rg}|{jumpserver_public_ip}")
+            self._save_jumpserver_state(jumpserver_name, jumpserver_rg, jumpserver_public_ip)
             
             return {
                 'name': jumpserver_name,
                 'resource_group': jumpserver_rg,
                 'public_ip': jumpserver_public_ip
             }
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             print(f"{Colors.RED}Error: Failed to create jump server VM{Colors.NC}")
             print(f"Error details: {e}")
             sys.exit(1)
     
+    def _ssh_mux_options(self) -> List[str]:
+        """OpenSSH options that multiplex every ssh call over one master connection"""
+        return [
+            '-o', 'ControlMaster=auto',
+            '-o', f'ControlPath={SSH_CONTROL_PATH}',
+            '-o', f'ControlPersist={SSH_CONTROL_PERSIST}',
+        ]
+    
+    def _wait_for_port(self, host: str, port: int, timeout: float,
+                       proc: Optional[subprocess.Popen] = None) -> bool:
+        """Poll until a TCP port accepts connections, the timeout expires or proc exits"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if proc is not None and proc.poll() is not None:
+                return False
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(0.25)
+            try:
+                if sock.connect_ex((host, port)) == 0:
+                    return True
+            finally:
+                sock.close()
+            time.sleep(TUNNEL_POLL_INTERVAL)
+        return False
+    
+    def _create_firewall_rule(self, server_info: Dict, rule_name: str, ip: str):
+        """Allow a single IP through the MySQL server firewall"""
+        self._client('mysql').firewall_rules.begin_create_or_update(
+            server_info['resource_group'], server_info['name'], rule_name,
+            {'start_ip_address': ip, 'end_ip_address': ip}
+        ).result()
+    
+    def _delete_firewall_rule(self, server_info: Dict, rule_name: str):
+        """Remove a firewall rule, ignoring failures"""
+        try:
+            self._client('mysql').firewall_rules.begin_delete(
+                server_info['resource_group'], server_info['name'], rule_name
+            ).result()
+        except AzureError:
+            pass
+    
     def connect_via_jumpserver(self, server_info: Dict, jumpserver_info: Dict):
         """Connect to MySQL via SSH tunnel through jump server VM"""
+        import getpass
+        
         print()
         print(f"{Colors.BLUE}Setting up SSH tunnel to MySQL through jump server VM...{Colors.NC}")
         print()
         print("Waiting for VM to be fully ready (this may take 30-60 seconds)...")
         
-        # Wait for SSH to be ready
+        # Jump server creation generates the key pair if it was missing
+        if not os.path.isfile(self._ssh_key_path):
+            print(f"{Colors.RED}Error: SSH private key not found: {self._ssh_key_path}{Colors.NC}")
+            print("Generate one with: ssh-keygen -t rsa -f ~/.ssh/id_rsa")
+            sys.exit(1)
+        
+        # The firewall rule only needs the public IP, so create it while we wait for SSH
+        rule_name = f"jumpserver-access-{int(time.time())}"
+        executor = ThreadPoolExecutor(max_workers=1)
+        fw_future = executor.submit(self._create_firewall_rule, server_info, rule_name, jumpserver_info['public_ip'])
+        executor.shutdown(wait=False)
+        
+        # Wait for the VM to exist in ARM before probing it
+        try:
+            self.run_command([
+                'az', 'vm', 'wait',
+                '--resource-group', jumpserver_info['resource_group'],
+                '--name', jumpserver_info['name'],
+                '--created',
+                '--timeout', str(SSH_READY_TIMEOUT)
+            ])
+        except subprocess.CalledProcessError:
+            pass  # Fall through to the SSH probe
+        
+        # Probe port 22 with exponential backoff instead of spawning ssh repeatedly;
+        # only once the port is open do we confirm sshd accepts our key
         ssh_ready = False
-        for i in range(60):
+        delay = SSH_PROBE_INITIAL_DELAY
+        deadline = time.monotonic() + SSH_READY_TIMEOUT
+        while time.monotonic() < deadline:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(SSH_PROBE_TIMEOUT)
             try:
-                self.run_command([
-                    'ssh', '-i', os.path.expanduser('~/.ssh/id_rsa'),
-                    '-o', 'StrictHostKeyChecking=no',
-                    '-o', 'ConnectTimeout=5',
-                    '-o', 'ConnectionAttempts=1',
-                    f'azureuser@{jumpserver_info["public_ip"]}',
-                    'echo SSH ready'
-                ], capture_output=True)
-                print(f"{Colors.GREEN}✓ SSH connection established{Colors.NC}")
-                ssh_ready = True
-                break
-            except subprocess.CalledProcessError:
-                if (i + 1) % 10 == 0:
-                    print(f"Still waiting... ({i + 1}/60 seconds)")
-                time.sleep(1)
+                rc = sock.connect_ex((jumpserver_info['public_ip'], 22))
+            except OSError:
+                rc = -1
+            finally:
+                sock.close()
+            if rc == 0:
+                try:
+                    self.run_command([
+                        'ssh', '-i', self._ssh_key_path,
+                        *self._ssh_mux_options(),
+                        '-o', 'StrictHostKeyChecking=no',
+                        '-o', 'ConnectTimeout=5',
+                        '-o', 'ConnectionAttempts=1',
+                        f'azureuser@{jumpserver_info["public_ip"]}',
+                        'echo SSH ready'
+                    ], capture_output=True)
+                    print(f"{Colors.GREEN}✓ SSH connection established{Colors.NC}")
+                    ssh_ready = True
+                    break
+                except subprocess.CalledProcessError:
+                    pass
+            time.sleep(delay)
+            delay = min(delay * 2, SSH_PROBE_MAX_DELAY)
         
         if not ssh_ready:
             print(f"{Colors.RED}Error: SSH connection timeout{Colors.NC}")
+            try:
+                fw_future.result()
+            except AzureError:
+                pass
+            else:
+                self._delete_firewall_rule(server_info, rule_name)
             sys.exit(1)
         
         print()
         
         # Add firewall rule for jump server VM
         print(f"{Colors.YELLOW}Adding firewall rule for jump server VM...{Colors.NC}")
-        rule_name = f"jumpserver-access-{int(time.time())}"
-        
-        self.run_command([
-            'az', 'mysql', 'flexible-server', 'firewall-rule', 'create',
-            '--resource-group', server_info['resource_group'],
-            '--name', server_info['name'],
-            '--rule-name', rule_name,
-            '--start-ip-address', jumpserver_info['public_ip'],
-            '--end-ip-address', jumpserver_info['public_ip'],
-            '--output', 'none'
-        ])
+        fw_future.result()
         
         print(f"{Colors.GREEN}✓ Firewall rule created{Colors.NC}")
         print()
@@ -407,38 +768,55 @@ class AzureMySQLConnector:
         
         local_port = 3307
         
-        print(f"{Colors.GREEN}==========================================")
-        print("✓ SSH Tunnel Configuration")
-        print(f"=========================================={Colors.NC}")
+        self._banner("✓ SSH Tunnel Configuration", Colors.GREEN)
         print(f"Local Port: {local_port}")
         print(f"Remote MySQL: {server_info['fqdn']}:3306")
         print(f"Jump Server: {jumpserver_info['public_ip']}")
         print()
         print(f"{Colors.YELLOW}Starting SSH tunnel in background...{Colors.NC}")
         
-        # Start SSH tunnel
-        tunnel_process = subprocess.Popen([
-            'ssh', '-i', os.path.expanduser('~/.ssh/id_rsa'),
-            '-f', '-N',
+        # Start SSH tunnel; kept in the foreground of its own session so we own its PID
+        # and a Ctrl-C inside mysql does not tear it down. It bypasses the multiplexing
+        # master so the forward lives and dies with this process
+        self._ssh_tunnel_proc = subprocess.Popen([
+            'ssh', '-i', self._ssh_key_path,
+            '-o', 'ControlMaster=no', '-S', 'none',
+            '-N',
             '-L', f'{local_port}:{server_info["fqdn"]}:3306',
             '-o', 'StrictHostKeyChecking=no',
+            '-o', 'ExitOnForwardFailure=yes',
             f'azureuser@{jumpserver_info["public_ip"]}'
-        ])
+        ], stdin=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, start_new_session=True)
         
-        time.sleep(2)
-        
-        print(f"{Colors.GREEN}✓ SSH tunnel established{Colors.NC}")
-        print()
-        print("Connecting to MySQL through tunnel...")
-        print()
+        tunnel_ready = self._wait_for_port('127.0.0.1', local_port, TUNNEL_READY_TIMEOUT,
+                                           proc=self._ssh_tunnel_proc)
+        if tunnel_ready:
+            print(f"{Colors.GREEN}✓ SSH tunnel established{Colors.NC}")
+            print()
+            print("Connecting to MySQL through tunnel...")
+            print()
+        elif self._ssh_tunnel_proc.poll() is not None:
+            # ssh gave up (bad key, host unreachable, forward refused); show why
+            error = self._ssh_tunnel_proc.stderr.read().strip()
+            print(f"{Colors.RED}Error: SSH tunnel exited with code "
+                  f"{self._ssh_tunnel_proc.returncode}{Colors.NC}")
+            if error:
+                print(error)
+        else:
+            print(f"{Colors.RED}Error: SSH tunnel did not open local port {local_port} "
+                  f"within {TUNNEL_READY_TIMEOUT} seconds{Colors.NC}")
         
         # Connect to MySQL through tunnel
-        mysql_cmd = ['mysql', '-h', '127.0.0.1', '-P', str(local_port), '-u', mysql_user, f'-p{mysql_password}']
+        mysql_cmd = ['mysql', '-h', '127.0.0.1', '-P', str(local_port), '-u', mysql_user]
         if db_name:
             mysql_cmd.append(db_name)
         
         try:
-            self.run_command(mysql_cmd, capture_output=False)
+            if tunnel_ready and self._native:
+                self._run_native_client('127.0.0.1', local_port, mysql_user, mysql_password, db_name)
+            elif tunnel_ready:
+                self.run_command(mysql_cmd, capture_output=False,
+                                 env={**os.environ, 'MYSQL_PWD': mysql_password})
         except subprocess.CalledProcessError:
             print(f"{Colors.RED}MySQL connection failed{Colors.NC}")
         finally:
@@ -448,78 +826,115 @@ class AzureMySQLConnector:
             
             # Remove firewall rule
             print("Removing firewall rule...")
-            try:
-                self.run_command([
-                    'az', 'mysql', 'flexible-server', 'firewall-rule', 'delete',
-                    '--resource-group', server_info['resource_group'],
-                    '--name', server_info['name'],
-                    '--rule-name', rule_name,
-                    '--yes',
-                    '--output', 'none'
-                ], capture_output=True)
-            except subprocess.CalledProcessError:
-                pass
+            self._delete_firewall_rule(server_info, rule_name)
             
-            # Kill SSH tunnel
+            # Kill SSH tunnel and the shared master connection behind it
             print("Closing SSH tunnel...")
-            try:
-                subprocess.run(['pkill', '-f', f'ssh.*{local_port}:{server_info["fqdn"]}:3306'], 
-                             capture_output=True)
-            except subprocess.CalledProcessError:
-                pass
+            self._close_tunnel()
+            subprocess.run([
+                'ssh', '-O', 'exit',
+                '-o', f'ControlPath={SSH_CONTROL_PATH}',
+                f'azureuser@{jumpserver_info["public_ip"]}'
+            ], capture_output=True)
+    
+    def _close_tunnel(self):
+        """Terminate the SSH tunnel process if it is still running"""
+        proc, self._ssh_tunnel_proc = self._ssh_tunnel_proc, None
+        if proc is None or proc.poll() is not None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    
+    @staticmethod
+    def _run_cleanup_command(cmd: List[str]) -> Optional[str]:
+        """Run one az delete; return None on success or the error text"""
+        try:
+            result = subprocess.run(cmd + ['--output', 'none'], capture_output=True, text=True, timeout=120)
+        except subprocess.TimeoutExpired:
+            return 'timed out after 120s'
+        if result.returncode != 0:
+            return result.stderr.strip() or f'exit code {result.returncode}'
+        return None
     
     def cleanup_jumpserver(self):
         """Cleanup jump server resources"""
-        if os.path.exists(self.jumpserver_info_file):
+        if self._jumpserver_state is not None or os.path.exists(self.jumpserver_info_file):
             print()
             print(f"{Colors.YELLOW}Cleaning up jump server resources...{Colors.NC}")
             
             try:
-                with open(self.jumpserver_info_file, 'r') as f:
-                    jumpserver_data = f.read().strip()
-                
-                jumpserver_name, jumpserver_rg, jumpserver_ip = jumpserver_data.split('|')
+                state = self._load_jumpserver_state() or {}
+                jumpserver_name = state.get('name')
+                jumpserver_rg = state.get('rg')
                 
                 if jumpserver_name and jumpserver_rg:
                     print(f"Deleting jump server VM and all associated resources: {jumpserver_name}")
                     
-                    # Delete VM and associated resources
-                    resources_to_delete = [
-                        ('VM', ['az', 'vm', 'delete', '--resource-group', jumpserver_rg, 
-                               '--name', jumpserver_name, '--yes', '--force-deletion', 'yes']),
-                        ('Network Interface', ['az', 'network', 'nic', 'delete', 
-                                             '--resource-group', jumpserver_rg, '--name', f'{jumpserver_name}VMNic']),
-                        ('Public IP', ['az', 'network', 'public-ip', 'delete', 
-                                     '--resource-group', jumpserver_rg, '--name', f'{jumpserver_name}-ip']),
-                        ('Network Security Group', ['az', 'network', 'nsg', 'delete', 
-                                                   '--resource-group', jumpserver_rg, '--name', f'{jumpserver_name}-nsg']),
-                        ('Disk', ['az', 'disk', 'delete', '--resource-group', jumpserver_rg, 
-                                 '--name', f'{jumpserver_name}_disk1_*', '--yes'])
+                    # The VM must be gone before its NIC can be released, and the NIC before
+                    # the IP, NSG and VNet it references; the OS disk goes with the VM
+                    # (deleteOption: Delete in the template)
+                    def rg_delete(group, name, *extra):
+                        return ['az', 'network', group, 'delete', '--resource-group', jumpserver_rg,
+                                '--name', name, *extra]
+                    
+                    waves = [
+                        [('VM', ['az', 'vm', 'delete', '--resource-group', jumpserver_rg,
+                                 '--name', jumpserver_name, '--yes', '--force-deletion', 'yes'])],
+                        [('Network Interface', rg_delete('nic', f'{jumpserver_name}VMNic'))],
+                        [('Public IP', rg_delete('public-ip', f'{jumpserver_name}-ip')),
+                         ('Network Security Group', rg_delete('nsg', f'{jumpserver_name}-nsg')),
+                         ('Virtual Network', rg_delete('vnet', f'{jumpserver_name}VNET'))],
                     ]
                     
-                    for resource_type, cmd in resources_to_delete:
-                        try:
-                            print(f"  - Deleting {resource_type.lower()}...")
-                            subprocess.run(cmd + ['--output', 'none'], 
-                                         capture_output=True, timeout=120)
-                        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                            pass  # Continue with other resources
-                        time.sleep(2)  # Brief delay between deletions
+                    failures = []
+                    with ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as executor:
+                        for wave in waves:
+                            futures = {}
+                            for resource_type, cmd in wave:
+                                print(f"  - Deleting {resource_type.lower()}...")
+                                futures[executor.submit(self._run_cleanup_command, cmd)] = resource_type
+                            for future in as_completed(futures):
+                                error = future.result()
+                                if error is not None:
+                                    failures.append((futures[future], error))
+                            if failures:
+                                # Later waves would only fail on the resources still in use
+                                break
+                    
+                    if failures:
+                        for resource_type, error in failures:
+                            print(f"{Colors.RED}✗ Failed to delete {resource_type.lower()}: {error}{Colors.NC}")
+                        print(f"{Colors.YELLOW}Jump server state kept in {self.jumpserver_info_file}; "
+                              f"remaining resources are in resource group {jumpserver_rg}{Colors.NC}")
+                        return
                     
                     print(f"{Colors.GREEN}✓ All jump server resources deleted{Colors.NC}")
                 
-                os.remove(self.jumpserver_info_file)
+                self._jumpserver_state = None
+                if os.path.exists(self.jumpserver_info_file):
+                    os.remove(self.jumpserver_info_file)
             except Exception as e:
                 print(f"{Colors.RED}Error during cleanup: {e}{Colors.NC}")
     
     def main(self):
         """Main execution function"""
+        import argparse
+        
         parser = argparse.ArgumentParser(description='Connect to Azure MySQL Flexible Server')
         parser.add_argument('server_name', nargs='?', help='MySQL server name')
+        parser.add_argument('-g', '--resource-group',
+                          help='Resource group of the server (enables a direct lookup)')
+        parser.add_argument('--native', action='store_true',
+                          help='Use the built-in PyMySQL client instead of the mysql CLI (requires pymysql)')
         parser.add_argument('--help-detailed', action='store_true', 
                           help='Show detailed help information')
         
         args = parser.parse_args()
+        self._native = args.native
         
         if args.help_detailed:
             self.show_usage()
@@ -552,11 +967,9 @@ class AzureMySQLConnector:
         
         # Get server information
         print(f"{Colors.BLUE}Gathering MySQL server information...{Colors.NC}")
-        server_info = self.get_server_info(server_name)
+        server_info = self.get_server_info(server_name, args.resource_group)
         
-        print(f"{Colors.BLUE}==========================================")
-        print("MySQL Server Information")
-        print(f"=========================================={Colors.NC}")
+        self._banner("MySQL Server Information")
         print(f"Name: {server_info['name']}")
         print(f"FQDN: {server_info['fqdn']}")
         print(f"Version: {server_info['version']}")
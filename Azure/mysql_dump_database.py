@@ -8,14 +8,44 @@ Description: Dump database from Azure MySQL Flexible Server
 
 import subprocess
 import sys
-import json
 import os
-import getpass
-import psutil
+import shutil
+import atexit
+import select
 import socket
+import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
+# Bytes copied per read while streaming mysqldump output to disk
+DUMP_BUFFER_SIZE = 1024 * 1024
+
+# The "-- Host:" header sits in the first few lines of a mysqldump
+DUMP_HEADER_SIZE = 8192
+
+# Loopback connects answer at once; anything slower is not a usable tunnel
+TUNNEL_PROBE_TIMEOUT = 0.05
+
+# One `az mysql flexible-server list` per run, reused from disk for a few minutes
+CACHE_DIR = os.path.expanduser('~/.cache/nimbusdfir')
+SERVER_CACHE_FILE = os.path.join(CACHE_DIR, 'az_servers.json')
+SERVER_CACHE_TTL = 300
+
+_AZ_SERVERS_CACHE = None
+_AZ_SUBSCRIPTION = None
+
+# mysqldump tuning for tunneled connections; protocol compression is opt-in via
+# NIMBUS_MYSQL_COMPRESS=1 since it costs server CPU
+MYSQLDUMP_TUNING = ['--quick', '--net-buffer-length=1048576', '--max-allowed-packet=1G']
+
+# External compressors tried in order: (binary, command, file suffix)
+COMPRESSORS = [
+    ('zstd', ['zstd', '-T0', '-3', '-q', '-c'], '.zst'),
+    ('pigz', ['pigz', '-c'], '.gz'),
+]
+
 # Colors for output
 class Colors:
     RED = '\033[0;31m'
@@ -25,67 +55,89 @@ class Colors:
     CYAN = '\033[0;36m'
     NC = '\033[0m'  # No Color
 
+def _banner(title, color):
+    """Render a boxed title as one string"""
+    rule = f"{color}{'=' * 42}{Colors.NC}\n"
+    return f"{rule}{color}{title}{Colors.NC}\n{rule}\n"
+
+# Banners are built once and written in a single call
+USAGE_BANNER = _banner("Azure MySQL Dump Database - NimbusDFIR", Colors.BLUE)
+BANNER = _banner("Azure MySQL Dump Database", Colors.BLUE)
+SUCCESS_BANNER = _banner("✓ Database dump completed successfully!", Colors.GREEN)
+
 def print_colored(message, color):
     """Print message with color"""
     print(f"{color}{message}{Colors.NC}")
 
 def check_azure_cli():
     """Check if Azure CLI is installed"""
-    try:
-        subprocess.run(['az', '--version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print_colored("Error: Azure CLI is not installed", Colors.RED)
-        print("Please install Azure CLI first")
-        sys.exit(1)
+    if shutil.which('az') is None:
+        raise RuntimeError("Error: Azure CLI is not installed\n"
+                           "Please install Azure CLI first")
 
 def check_mysql_client():
     """Check if MySQL client is installed"""
-    try:
-        subprocess.run(['mysqldump', '--version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print_colored("Error: MySQL client (mysqldump) is not installed", Colors.RED)
-        print("Please install MySQL client first")
-        print("macOS: brew install mysql-client")
-        print("Ubuntu/Debian: sudo apt-get install mysql-client")
-        print("Windows: Download from https://dev.mysql.com/downloads/mysql/")
-        sys.exit(1)
+    if shutil.which('mysqldump') is None:
+        raise RuntimeError("Error: MySQL client (mysqldump) is not installed\n"
+                           "Please install MySQL client first\n"
+                           "macOS: brew install mysql-client\n"
+                           "Ubuntu/Debian: sudo apt-get install mysql-client\n"
+                           "Windows: Download from https://dev.mysql.com/downloads/mysql/")
+
+def find_compressor():
+    """Return the first available (command, suffix) from COMPRESSORS, or None"""
+    for binary, cmd, suffix in COMPRESSORS:
+        if shutil.which(binary):
+            return cmd, suffix
+    return None
 
 def check_azure_login():
-    """Check if logged in to Azure"""
+    """Check if logged in to Azure and remember the active subscription"""
+    global _AZ_SUBSCRIPTION
     try:
-        subprocess.run(['az', 'account', 'show'], capture_output=True, check=True)
+        result = subprocess.run(['az', 'account', 'show', '--query', 'id', '-o', 'tsv'],
+                                capture_output=True, text=True, check=True)
+        _AZ_SUBSCRIPTION = result.stdout.strip()
     except subprocess.CalledProcessError:
-        print_colored("Error: Not logged in to Azure", Colors.RED)
-        print("Please run: az login")
-        sys.exit(1)
+        raise RuntimeError("Error: Not logged in to Azure\n"
+                           "Please run: az login")
+
+def check_prerequisites():
+    """Run the independent prerequisite checks concurrently, exiting on the first failure"""
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(check) for check in (check_azure_cli, check_mysql_client, check_azure_login)]
+    
+    # Report in check order, so a missing az wins over the login failure it causes
+    for future in futures:
+        try:
+            future.result()
+        except RuntimeError as e:
+            message, _, hint = str(e).partition('\n')
+            print_colored(message, Colors.RED)
+            if hint:
+                print(hint)
+            sys.exit(1)
 
 def check_ssh_tunnel():
     """Check for active SSH tunnel"""
     print_colored("Checking for active SSH tunnel...", Colors.BLUE)
     
-    tunnel_active = False
     local_port = 3307
     
-    # Check if there's an SSH process running with MySQL tunnel
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            if proc.info['name'] == 'ssh' and proc.info['cmdline']:
-                cmdline = ' '.join(proc.info['cmdline'])
-                if '3307' in cmdline and '3306' in cmdline:
-                    # Check if port 3307 is listening
-                    try:
-                        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                        sock.settimeout(1)
-                        result = sock.connect_ex(('127.0.0.1', local_port))
-                        sock.close()
-                        if result == 0:
-                            tunnel_active = True
-                            print_colored(f"✓ Active SSH tunnel detected on port {local_port}", Colors.GREEN)
-                            break
-                    except:
-                        pass
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
+    # Anything accepting connections on the tunnel port is treated as the tunnel;
+    # a non-blocking connect bounded by select keeps the probe within a few ms
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    try:
+        sock.connect_ex(('127.0.0.1', local_port))
+        _, writable, _ = select.select([], [sock], [], TUNNEL_PROBE_TIMEOUT)
+        tunnel_active = bool(writable) and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+    except OSError:
+        tunnel_active = False
+    finally:
+        sock.close()
     
     if not tunnel_active:
         print_colored("✗ No active SSH tunnel found", Colors.YELLOW)
@@ -93,17 +145,56 @@ def check_ssh_tunnel():
         print_colored("Or use this script independently (will prompt for server selection)", Colors.CYAN)
         print()
     else:
+        print_colored(f"✓ Active SSH tunnel detected on port {local_port}", Colors.GREEN)
         print_colored("Using existing SSH tunnel for database operations", Colors.GREEN)
         print()
     
     return tunnel_active, local_port
 
+def _load_az_servers():
+    """Return the MySQL flexible server list, fetched at most once per run"""
+    global _AZ_SERVERS_CACHE
+    if _AZ_SERVERS_CACHE is not None:
+        return _AZ_SERVERS_CACHE
+    
+    # Only the CLI path parses JSON; tunneled runs never get here
+    import json
+    
+    # The disk copy is only valid for the subscription it was fetched from
+    try:
+        if time.time() - os.path.getmtime(SERVER_CACHE_FILE) < SERVER_CACHE_TTL:
+            with open(SERVER_CACHE_FILE, 'r') as f:
+                cached = json.load(f)
+            if cached.get('subscription') == _AZ_SUBSCRIPTION:
+                _AZ_SERVERS_CACHE = cached['servers']
+                return _AZ_SERVERS_CACHE
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    
+    result = subprocess.run(['az', 'mysql', 'flexible-server', 'list', '--output', 'json'], 
+                          capture_output=True, text=True, check=True)
+    _AZ_SERVERS_CACHE = json.loads(result.stdout)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(SERVER_CACHE_FILE, 'w') as f:
+            json.dump({'subscription': _AZ_SUBSCRIPTION, 'servers': _AZ_SERVERS_CACHE}, f)
+    except OSError:
+        pass
+    return _AZ_SERVERS_CACHE
+
+def clear_server_cache():
+    """Forget cached server lists in memory and on disk"""
+    global _AZ_SERVERS_CACHE
+    _AZ_SERVERS_CACHE = None
+    try:
+        os.remove(SERVER_CACHE_FILE)
+    except FileNotFoundError:
+        pass
+
 def get_mysql_servers():
     """Get list of MySQL servers"""
     try:
-        result = subprocess.run(['az', 'mysql', 'flexible-server', 'list', '--output', 'json'], 
-                              capture_output=True, text=True, check=True)
-        servers = json.loads(result.stdout)
+        servers = _load_az_servers()
         
         if not servers:
             print_colored("No MySQL flexible servers found", Colors.YELLOW)
@@ -124,16 +215,12 @@ def get_mysql_servers():
 def get_server_info(server_name):
     """Get server information"""
     try:
-        result = subprocess.run(['az', 'mysql', 'flexible-server', 'list', 
-                               '--query', f"[?name=='{server_name}']", '-o', 'json'], 
-                              capture_output=True, text=True, check=True)
-        server_info = json.loads(result.stdout)
+        server = next((s for s in _load_az_servers() if s['name'] == server_name), None)
         
-        if not server_info:
+        if server is None:
             print_colored(f"Error: MySQL server '{server_name}' not found", Colors.RED)
             sys.exit(1)
         
-        server = server_info[0]
         print_colored(f"✓ Server found in resource group: {server['resourceGroup']}", Colors.GREEN)
         
         return {
@@ -145,56 +232,38 @@ def get_server_info(server_name):
         print_colored(f"Error getting server information: {e}", Colors.RED)
         sys.exit(1)
 
-def get_azure_server_name():
-    """Get Azure MySQL server name automatically"""
-    try:
-        result = subprocess.run(['az', 'mysql', 'flexible-server', 'list', '--query', '[].name', '-o', 'tsv'], 
-                              capture_output=True, text=True, check=True)
-        
-        if result.stdout.strip():
-            servers = [s.strip() for s in result.stdout.strip().split('\n') if s.strip()]
-            if servers:
-                return servers[0]  # Return the first server
-    except:
-        pass
-    
-    return "azure-mysql-server"
+def make_defaults_file(username, password):
+    """Write MySQL client credentials to a private option file removed at exit"""
+    fd, path = tempfile.mkstemp(prefix='nimbus-mysql-', suffix='.cnf')
+    atexit.register(os.remove, path)
+    def quote(value):
+        escaped = value.replace('\\', '\\\\').replace('"', '\\"')
+        return f'"{escaped}"'
+    with os.fdopen(fd, 'w') as f:
+        f.write(f'[client]\nuser={quote(username)}\npassword={quote(password)}\n')
+    return path
 
-def list_databases_via_tunnel(username, password, local_port):
-    """List databases via SSH tunnel"""
-    print_colored("Listing databases via SSH tunnel...", Colors.BLUE)
-    
-    env = os.environ.copy()
-    env['MYSQL_PWD'] = password
+def preflight_via_tunnel(defaults_file, local_port):
+    """Fetch the server hostname and database list via SSH tunnel in one session"""
+    print_colored("Querying server via SSH tunnel...", Colors.BLUE)
     
     try:
-        result = subprocess.run(['mysql', '-h', '127.0.0.1', '-P', str(local_port), 
-                               '-u', username, '-e', 'SHOW DATABASES;'], 
-                              env=env, capture_output=True, text=True, check=True)
-        
-        # Parse the result to get database names (skip header, borders and system databases)
-        databases = []
-        system_dbs = {'Database', 'information_schema', 'performance_schema', 'mysql', 'sys'}
-        
-        for line in result.stdout.split('\n'):
-            line = line.strip()
-            # Skip empty lines, headers, borders, and system databases
-            if (line and 
-                not line.startswith('+') and 
-                not line.startswith('-') and 
-                not line.startswith('|') and
-                line not in system_dbs):
-                
-                # Clean up pipe characters if present
-                clean_line = line.replace('|', '').strip()
-                
-                if clean_line and clean_line not in system_dbs:
-                    databases.append(clean_line)
+        # Batch mode returns bare values, one per line: the hostname, then each database;
+        # system schemas are filtered server-side
+        result = subprocess.run(['mysql', f'--defaults-file={defaults_file}', '--batch', '--skip-column-names',
+                               '-h', '127.0.0.1', '-P', str(local_port),
+                               '-e', "SELECT @@hostname; "
+                                     "SELECT SCHEMA_NAME FROM information_schema.SCHEMATA WHERE SCHEMA_NAME NOT IN "
+                                     "('information_schema', 'performance_schema', 'mysql', 'sys')"], 
+                              capture_output=True, text=True, check=True)
         
-        return databases
+        lines = [line for line in result.stdout.splitlines() if line]
+        if not lines:
+            return None, None
+        return lines[0], lines[1:]
     except subprocess.CalledProcessError as e:
         print_colored("Error: Failed to connect to MySQL via tunnel", Colors.RED)
-        return None
+        return None, None
 
 def list_databases_via_cli(server_name, resource_group):
     """List databases via Azure CLI"""
@@ -213,71 +282,220 @@ def list_databases_via_cli(server_name, resource_group):
         print_colored(f"Error retrieving databases: {e}", Colors.RED)
         return None
 
-def dump_via_tunnel(username, password, database_name, local_port, output_file, server_name):
-    """Perform database dump via SSH tunnel"""
+def read_up_to(stream, size):
+    """Read from an unbuffered pipe until size bytes or EOF"""
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+def copy_pipe(src, dst):
+    """Copy a pipe to dst, moving the bytes in-kernel with splice where available; returns bytes copied"""
+    total = 0
+    if hasattr(os, 'splice'):
+        dst.flush()
+        try:
+            while True:
+                n = os.splice(src.fileno(), dst.fileno(), DUMP_BUFFER_SIZE)
+                if not n:
+                    return total
+                total += n
+        except OSError:
+            # Unsupported destination (e.g. some network filesystems); finish in userspace
+            pass
+    while True:
+        buf = src.read(DUMP_BUFFER_SIZE)
+        if not buf:
+            return total
+        dst.write(buf)
+        total += len(buf)
+
+@contextmanager
+def open_dump_sink(output_file, compressor=None):
+    """Open a binary writer for the dump, piping through an external compressor if given"""
+    if not compressor:
+        with open(output_file, 'wb', buffering=DUMP_BUFFER_SIZE) as f:
+            yield f
+        return
+    
+    with open(output_file, 'wb') as f:
+        proc = subprocess.Popen(compressor, stdin=subprocess.PIPE, stdout=f)
+        try:
+            yield proc.stdin
+        finally:
+            proc.stdin.close()
+            proc.wait()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, compressor)
+
+def stream_dump(cmd, output_file, server_name=None, compressor=None):
+    """Stream a mysqldump command to a file, optionally rewriting its Host header; returns bytes dumped"""
+    # stderr goes to a spool file so a chatty mysqldump cannot stall on a full pipe
+    with open_dump_sink(output_file, compressor) as f, tempfile.TemporaryFile() as errors:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors, bufsize=0)
+        
+        written = 0
+        if server_name:
+            # Rewrite the dump header to show Azure server name; only the head is scanned,
+            # widened once in case the line straddles the first chunk
+            head = read_up_to(proc.stdout, DUMP_HEADER_SIZE)
+            if b'-- Host: 127.0.0.1' not in head and len(head) == DUMP_HEADER_SIZE:
+                head += read_up_to(proc.stdout, DUMP_HEADER_SIZE)
+            head = head.replace(
+                b'-- Host: 127.0.0.1',
+                f'-- Host: {server_name} (via SSH tunnel from 127.0.0.1)'.encode('utf-8'),
+                1
+            )
+            f.write(head)
+            written = len(head)
+        written += copy_pipe(proc.stdout, f)
+        proc.stdout.close()
+        proc.wait()
+        errors.seek(0)
+        stderr = errors.read()
+    
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    return written
+
+def mysqldump_command(defaults_file, local_port):
+    """Base mysqldump argv for the tunnel, including transfer tuning"""
+    # --hex-blob keeps binary columns as plain ASCII in the dump
+    cmd = ['mysqldump', f'--defaults-file={defaults_file}', '-h', '127.0.0.1', '-P', str(local_port),
+           '--hex-blob'] + MYSQLDUMP_TUNING
+    if os.environ.get('NIMBUS_MYSQL_COMPRESS') == '1':
+        cmd.append('--compress')
+    return cmd
+
+def dump_via_tunnel(defaults_file, database_name, local_port, output_file, server_name,
+                    compressor=None):
+    """Perform database dump via SSH tunnel; returns the dump size in bytes, or None on failure"""
     print_colored("Creating database dump via SSH tunnel...", Colors.GREEN)
     
-    env = os.environ.copy()
-    env['MYSQL_PWD'] = password
+    try:
+        # Stream mysqldump straight to disk instead of buffering the whole dump
+        return stream_dump(mysqldump_command(defaults_file, local_port) +
+                    ['--single-transaction', '--routines', '--triggers', database_name],
+                    output_file, server_name, compressor)
+    except subprocess.CalledProcessError as e:
+        print_colored("Error: mysqldump failed", Colors.RED)
+        return None
+
+def list_tables_via_tunnel(defaults_file, database_name, local_port):
+    """List base tables of a database via SSH tunnel"""
+    result = subprocess.run(['mysql', f'--defaults-file={defaults_file}', '-h', '127.0.0.1', '-P', str(local_port),
+                             '-N', '-B', '-e', "SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'",
+                             database_name],
+                            capture_output=True, text=True, check=True)
+    return [line.split('\t')[0] for line in result.stdout.splitlines() if line]
+
+def dump_via_tunnel_parallel(defaults_file, database_name, local_port, output_file, server_name,
+                             threads=None, compressor=None):
+    """Perform database dump via SSH tunnel with one mysqldump per table; returns bytes, or None on failure"""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    threads = threads or os.cpu_count() or 4
+    print_colored(f"Creating database dump via SSH tunnel ({threads} parallel workers)...", Colors.GREEN)
+    print_colored("Note: each table is dumped in its own transaction snapshot", Colors.YELLOW)
+    
+    base_cmd = mysqldump_command(defaults_file, local_port)
     
     try:
-        # Execute mysqldump and capture output
-        result = subprocess.run(['mysqldump', '-h', '127.0.0.1', '-P', str(local_port),
-                               '-u', username, '--single-transaction', '--routines', 
-                               '--triggers', database_name], 
-                              env=env, capture_output=True, text=True, check=True)
-        
-        # Modify the dump header to show Azure server name
-        dump_content = result.stdout
-        dump_content = dump_content.replace(
-            '-- Host: 127.0.0.1',
-            f'-- Host: {server_name} (via SSH tunnel from 127.0.0.1)'
-        )
+        tables = list_tables_via_tunnel(defaults_file, database_name, local_port)
         
-        # Write modified dump to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(dump_content)
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_file))) as work_dir:
+            # Schema, routines and events first, then the data of every table, then the
+            # triggers, so restoring the rows does not fire them
+            snapshot = ['--single-transaction', '--skip-lock-tables']
+            parts = [(os.path.join(work_dir, 'schema.sql'),
+                      base_cmd + snapshot + ['--no-data', '--routines', '--skip-triggers', '--events',
+                                             database_name],
+                      server_name)]
+            for i, table in enumerate(tables):
+                parts.append((os.path.join(work_dir, f'{i:05d}.sql'),
+                              base_cmd + snapshot + ['--no-create-info', '--skip-triggers',
+                                                     '--set-gtid-purged=OFF', database_name, table],
+                              None))
+            parts.append((os.path.join(work_dir, 'triggers.sql'),
+                          base_cmd + snapshot + ['--no-create-info', '--no-data', '--triggers',
+                                                 '--skip-routines', '--set-gtid-purged=OFF', database_name],
+                          None))
+            
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                futures = [executor.submit(stream_dump, cmd, path, header)
+                           for path, cmd, header in parts]
+                written = sum(future.result() for future in as_completed(futures))
+            
+            with open_dump_sink(output_file, compressor) as out:
+                for path, _, _ in parts:
+                    with open(path, 'rb') as part:
+                        shutil.copyfileobj(part, out, DUMP_BUFFER_SIZE)
         
-        return True
+        return written
     except subprocess.CalledProcessError as e:
         print_colored("Error: mysqldump failed", Colors.RED)
-        return False
+        return None
 
 def show_usage():
     """Display usage information"""
-    print_colored("==========================================", Colors.BLUE)
-    print_colored("Azure MySQL Dump Database - NimbusDFIR", Colors.BLUE)
-    print_colored("==========================================", Colors.BLUE)
-    print()
-    print("Usage: python mysql_dump_database.py [SERVER_NAME] [DATABASE_NAME] [OUTPUT_PATH]")
+    sys.stdout.write(USAGE_BANNER)
+    print("Usage: python mysql_dump_database.py [SERVER_NAME] [DATABASE_NAME] [OUTPUT_PATH] [--parallel [N]] [--refresh] [--no-compress]")
     print()
     print("Examples:")
     print("  python mysql_dump_database.py                              # Interactive mode")
     print("  python mysql_dump_database.py my-server testdb             # Direct mode")
     print("  python mysql_dump_database.py my-server testdb ~/backups   # With custom path")
+    print("  python mysql_dump_database.py my-server testdb --parallel 8 # One mysqldump per table, 8 at a time")
     print()
     print("Features:")
     print("  - Auto-detects existing SSH tunnels")
     print("  - Lists available databases for selection")
     print("  - Saves to Downloads folder by default")
     print("  - Generates timestamped dump files")
+    print("  - Caches the server list for 5 minutes (--refresh to bypass)")
+    print("  - Compresses with zstd or pigz when installed (--no-compress to disable)")
     print()
 
+def parse_args(argv):
+    """Split argv into positional arguments and option flags"""
+    positional = []
+    options = {'parallel': 0, 'refresh': False, 'compress': True}
+    i = 0
+    while i < len(argv):
+        if argv[i] == '--refresh':
+            options['refresh'] = True
+        elif argv[i] == '--no-compress':
+            options['compress'] = False
+        elif argv[i] == '--parallel':
+            # Optional worker count; defaults to one per CPU
+            if i + 1 < len(argv) and argv[i + 1].isdigit():
+                options['parallel'] = int(argv[i + 1])
+                i += 1
+            else:
+                options['parallel'] = os.cpu_count() or 4
+        else:
+            positional.append(argv[i])
+        i += 1
+    return positional, options
+
 def main():
     """Main function"""
     if len(sys.argv) > 1 and sys.argv[1] in ['help', '--help', '-h']:
         show_usage()
         sys.exit(0)
     
+    args, options = parse_args(sys.argv[1:])
+    if options['refresh']:
+        clear_server_cache()
+    
     # Check prerequisites
-    check_azure_cli()
-    check_mysql_client()
-    check_azure_login()
+    check_prerequisites()
+    compressor, suffix = (find_compressor() if options['compress'] else None) or (None, '')
     
-    print_colored("==========================================", Colors.BLUE)
-    print_colored("Azure MySQL Dump Database", Colors.BLUE)
-    print_colored("==========================================", Colors.BLUE)
-    print()
+    sys.stdout.write(BANNER)
     
     # Check for active SSH tunnel
     tunnel_active, local_port = check_ssh_tunnel()
@@ -289,26 +507,32 @@ def main():
         db_username = "mysqladmin"
     
     print()
+    import getpass
     db_password = getpass.getpass("Enter MySQL admin password: ")
     
     if not db_password:
         print_colored("Error: Password is required", Colors.RED)
         sys.exit(1)
     
+    # Credentials are handed to mysql/mysqldump through a private option file
+    defaults_file = make_defaults_file(db_username, db_password)
+    
     # Get server and database information
     server_info = None
     server_name = None
     databases = None
     
+    # A database named on the command line needs no listing round-trip
+    database_name = args[1] if len(args) > 1 else None
+    
     if tunnel_active:
-        # Get Azure server name
-        azure_server_name = get_azure_server_name()
-        
-        # List databases via tunnel
-        databases = list_databases_via_tunnel(db_username, db_password, local_port)
+        # Server name and database list come from the same MySQL session
+        azure_server_name, databases = preflight_via_tunnel(defaults_file, local_port)
+        if not azure_server_name:
+            sys.exit(1)
     else:
         # Get server name if not provided
-        server_name = sys.argv[1] if len(sys.argv) > 1 else None
+        server_name = args[0] if len(args) > 0 else None
         if not server_name:
             servers = get_mysql_servers()
             server_input = input("Select server number or enter name: ").strip()
@@ -334,21 +558,21 @@ def main():
         server_info = get_server_info(server_name)
         
         # List databases via Azure CLI
-        databases = list_databases_via_cli(server_name, server_info['resourceGroup'])
+        if not database_name:
+            databases = list_databases_via_cli(server_name, server_info['resourceGroup'])
     
-    if not databases:
-        print_colored("Error: No databases available for dump", Colors.RED)
-        sys.exit(1)
-    
-    # Show databases and get selection
-    print()
-    print_colored("Available Databases:", Colors.CYAN)
-    for i, db in enumerate(databases, 1):
-        print(f"{i}. {db}")
-    print()
-    
-    database_name = sys.argv[2] if len(sys.argv) > 2 else None
     if not database_name:
+        if not databases:
+            print_colored("Error: No databases available for dump", Colors.RED)
+            sys.exit(1)
+        
+        # Show databases and get selection
+        print()
+        print_colored("Available Databases:", Colors.CYAN)
+        for i, db in enumerate(databases, 1):
+            print(f"{i}. {db}")
+        print()
+        
         db_input = input("Select database number or enter name: ").strip()
         
         if not db_input:
@@ -367,7 +591,7 @@ def main():
             database_name = db_input
     
     # Get output path
-    output_path = sys.argv[3] if len(sys.argv) > 3 else None
+    output_path = args[2] if len(args) > 2 else None
     if not output_path:
         default_path = str(Path.home() / "Downloads")
         print()
@@ -380,7 +604,7 @@ def main():
     
     # Generate output filename with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = Path(output_path) / f"{database_name}_dump_{timestamp}.sql"
+    output_file = Path(output_path) / f"{database_name}_dump_{timestamp}.sql{suffix}"
     
     print()
     print_colored("Database dump configuration:", Colors.BLUE)
@@ -403,23 +627,26 @@ def main():
     print()
     print_colored("Starting database dump...", Colors.YELLOW)
     
-    success = False
     if tunnel_active:
-        success = dump_via_tunnel(db_username, db_password, database_name, local_port, str(output_file), azure_server_name)
+        if options['parallel']:
+            written = dump_via_tunnel_parallel(defaults_file, database_name, local_port,
+                                               str(output_file), azure_server_name, options['parallel'],
+                                               compressor)
+        else:
+            written = dump_via_tunnel(defaults_file, database_name, local_port, str(output_file),
+                                      azure_server_name, compressor)
     else:
         print_colored("Note: Direct Azure CLI dump not supported", Colors.YELLOW)
         print_colored("Please use SSH tunnel method for full dump functionality", Colors.YELLOW)
         sys.exit(1)
     
-    if success:
-        file_size = output_file.stat().st_size
+    if written is not None:
+        # The byte count is the uncompressed size; a compressed file has to be measured
+        file_size = output_file.stat().st_size if compressor else written
         file_size_mb = round(file_size / (1024 * 1024), 2)
         
         print()
-        print_colored("==========================================", Colors.GREEN)
-        print_colored("✓ Database dump completed successfully!", Colors.GREEN)
-        print_colored("==========================================", Colors.GREEN)
-        print()
+        sys.stdout.write(SUCCESS_BANNER)
         print(f"Database: {database_name}")
         print(f"Output File: {output_file}")
         print(f"File Size: {file_size_mb} MB")
@@ -12,118 +12,39 @@ import json
 import os
 import tempfile
 import getpass
-import psutil
 import socket
+import time
+import functools
+import importlib.util
 from pathlib import Path
 
-# Colors for output
-class Colors:
-    RED = '\033[0;31m'
-    GREEN = '\033[0;32m'
-    YELLOW = '\033[1;33m'
-    BLUE = '\033[0;34m'
-    CYAN = '\033[0;36m'
-    NC = '\033[0m'  # No Color
+# Passed prerequisite checks are remembered for a few minutes across runs
+CACHE_DIR = os.path.expanduser('~/.cache/nimbusdfir')
+CHECK_CACHE_FILE = os.path.join(CACHE_DIR, 'az_checks.json')
+CHECK_CACHE_TTL = 300
 
-def print_colored(message, color):
-    """Print message with color"""
-    print(f"{color}{message}{Colors.NC}")
+# Server name -> resource group/state rarely changes; reuse lookups for an hour
+SERVER_CACHE_FILE = os.path.join(CACHE_DIR, 'servers.json')
+SERVER_CACHE_TTL = 3600
 
-def check_azure_cli():
-    """Check if Azure CLI is installed"""
-    try:
-        subprocess.run(['az', '--version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print_colored("Error: Azure CLI is not installed", Colors.RED)
-        print("Please install Azure CLI first")
-        sys.exit(1)
+# The az CLI profile records the active subscription; read directly so the
+# cached login check does not need an extra `az account show`
+AZURE_PROFILE_FILE = os.path.join(os.environ.get('AZURE_CONFIG_DIR', os.path.expanduser('~/.azure')),
+                                  'azureProfile.json')
 
-def check_azure_login():
-    """Check if logged in to Azure"""
-    try:
-        subprocess.run(['az', 'account', 'show'], capture_output=True, check=True)
-    except subprocess.CalledProcessError:
-        print_colored("Error: Not logged in to Azure", Colors.RED)
-        print("Please run: az login")
-        sys.exit(1)
+# `az mysql flexible-server list` started early so it runs while the user is prompted
+_SERVER_LIST_PROC = None
+_SERVER_LIST = None
 
-def check_ssh_tunnel():
-    """Check for active SSH tunnel"""
-    tunnel_active = False
-    local_port = 3307
-    
-    # Check if there's an SSH process running with MySQL tunnel
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            if proc.info['name'] == 'ssh' and proc.info['cmdline']:
-                cmdline = ' '.join(proc.info['cmdline'])
-                if '3307' in cmdline and '3306' in cmdline:
-                    # Check if port 3307 is listening
-                    try:
-                        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                        sock.settimeout(1)
-                        result = sock.connect_ex(('127.0.0.1', local_port))
-                        sock.close()
-                        if result == 0:
-                            tunnel_active = True
-                            break
-                    except:
-                        pass
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
-    
-    return tunnel_active, local_port
+# Environment variable read by --password-env
+PASSWORD_ENV = 'MYSQL_ADMIN_PASSWORD'
 
-def get_mysql_servers():
-    """Get list of MySQL servers"""
-    try:
-        result = subprocess.run(['az', 'mysql', 'flexible-server', 'list', '--output', 'json'], 
-                              capture_output=True, text=True, check=True)
-        servers = json.loads(result.stdout)
-        
-        if not servers:
-            print_colored("No MySQL flexible servers found", Colors.YELLOW)
-            sys.exit(0)
-        
-        print_colored("Available MySQL Servers:", Colors.CYAN)
-        print()
-        
-        for i, server in enumerate(servers, 1):
-            print(f"{i}. {server['name']} ({server['resourceGroup']} - {server['state']})")
-        
-        print()
-        return servers
-    except subprocess.CalledProcessError as e:
-        print_colored(f"Error retrieving MySQL servers: {e}", Colors.RED)
-        sys.exit(1)
+# Sentinel row separating result sets when several queries share one round-trip
+SUMMARY_SEPARATOR = "SELECT '---' AS sep;"
+SUMMARY_MARKER = "sep\n---\n"
 
-def get_server_info(server_name):
-    """Get server information"""
-    try:
-        result = subprocess.run(['az', 'mysql', 'flexible-server', 'list', 
-                               '--query', f"[?name=='{server_name}']", '-o', 'json'], 
-                              capture_output=True, text=True, check=True)
-        server_info = json.loads(result.stdout)
-        
-        if not server_info:
-            print_colored(f"Error: MySQL server '{server_name}' not found", Colors.RED)
-            sys.exit(1)
-        
-        server = server_info[0]
-        print_colored(f"✓ Server found in resource group: {server['resourceGroup']}", Colors.GREEN)
-        
-        return {
-            'name': server['name'],
-            'resourceGroup': server['resourceGroup'],
-            'status': server['state']
-        }
-    except subprocess.CalledProcessError as e:
-        print_colored(f"Error getting server information: {e}", Colors.RED)
-        sys.exit(1)
-
-def get_mock_data_sql():
-    """Get mock data SQL content"""
-    return """
+# Schema and rows inserted by this script
+MOCK_DATA_SQL = """
 -- Drop tables if they exist (for re-running the script)
 DROP TABLE IF EXISTS sale_items;
 DROP TABLE IF EXISTS sales;
@@ -198,83 +119,373 @@ INSERT INTO products (product_name, description, price, stock_quantity, category
 ('External SSD 1TB', 'Portable SSD with 1TB storage capacity', 129.99, 80, 'Storage'),
 ('Headphones', 'Noise-cancelling wireless headphones', 199.99, 60, 'Electronics');
 
--- Insert 5 sales with multiple items each
+-- Insert 5 sales; the tables were just recreated, so sale_id runs 1..5 in this order
+-- Sale 1: Alice Johnson, Sale 2: David Brown, Sale 3: Emma Davis, Sale 4: Grace Wilson, Sale 5: Jack Anderson
+INSERT INTO sales (customer_id, total_amount) VALUES (1, 0), (4, 0), (5, 0), (7, 0), (10, 0);
 
--- Sale 1: Alice Johnson buys 3 items
-INSERT INTO sales (customer_id, total_amount) VALUES (1, 0);
-SET @sale1_id = LAST_INSERT_ID();
+-- Items for all sales in one statement
 INSERT INTO sale_items (sale_id, product_id, quantity, unit_price) VALUES
-(@sale1_id, 1, 1, 1299.99),
-(@sale1_id, 2, 2, 29.99),
-(@sale1_id, 3, 1, 89.99);
-UPDATE sales SET total_amount = (SELECT SUM(quantity * unit_price) FROM sale_items WHERE sale_id = @sale1_id) WHERE sale_id = @sale1_id;
-
--- Sale 2: David Brown buys 4 items
-INSERT INTO sales (customer_id, total_amount) VALUES (4, 0);
-SET @sale2_id = LAST_INSERT_ID();
-INSERT INTO sale_items (sale_id, product_id, quantity, unit_price) VALUES
-(@sale2_id, 5, 1, 399.99),
-(@sale2_id, 4, 1, 49.99),
-(@sale2_id, 6, 1, 79.99),
-(@sale2_id, 8, 1, 39.99);
-UPDATE sales SET total_amount = (SELECT SUM(quantity * unit_price) FROM sale_items WHERE sale_id = @sale2_id) WHERE sale_id = @sale2_id;
-
--- Sale 3: Emma Davis buys 2 items
-INSERT INTO sales (customer_id, total_amount) VALUES (5, 0);
-SET @sale3_id = LAST_INSERT_ID();
-INSERT INTO sale_items (sale_id, product_id, quantity, unit_price) VALUES
-(@sale3_id, 10, 1, 199.99),
-(@sale3_id, 9, 1, 129.99);
-UPDATE sales SET total_amount = (SELECT SUM(quantity * unit_price) FROM sale_items WHERE sale_id = @sale3_id) WHERE sale_id = @sale3_id;
+(1, 1, 1, 1299.99),
+(1, 2, 2, 29.99),
+(1, 3, 1, 89.99),
+(2, 5, 1, 399.99),
+(2, 4, 1, 49.99),
+(2, 6, 1, 79.99),
+(2, 8, 1, 39.99),
+(3, 10, 1, 199.99),
+(3, 9, 1, 129.99),
+(4, 1, 1, 1299.99),
+(4, 2, 1, 29.99),
+(4, 3, 1, 89.99),
+(4, 4, 1, 49.99),
+(4, 8, 1, 39.99),
+(5, 5, 1, 399.99),
+(5, 7, 2, 34.99),
+(5, 9, 1, 129.99);
 
--- Sale 4: Grace Wilson buys 5 items
-INSERT INTO sales (customer_id, total_amount) VALUES (7, 0);
-SET @sale4_id = LAST_INSERT_ID();
-INSERT INTO sale_items (sale_id, product_id, quantity, unit_price) VALUES
-(@sale4_id, 1, 1, 1299.99),
-(@sale4_id, 2, 1, 29.99),
-(@sale4_id, 3, 1, 89.99),
-(@sale4_id, 4, 1, 49.99),
-(@sale4_id, 8, 1, 39.99);
-UPDATE sales SET total_amount = (SELECT SUM(quantity * unit_price) FROM sale_items WHERE sale_id = @sale4_id) WHERE sale_id = @sale4_id;
-
--- Sale 5: Jack Anderson buys 3 items
-INSERT INTO sales (customer_id, total_amount) VALUES (10, 0);
-SET @sale5_id = LAST_INSERT_ID();
-INSERT INTO sale_items (sale_id, product_id, quantity, unit_price) VALUES
-(@sale5_id, 5, 1, 399.99),
-(@sale5_id, 7, 2, 34.99),
-(@sale5_id, 9, 1, 129.99);
-UPDATE sales SET total_amount = (SELECT SUM(quantity * unit_price) FROM sale_items WHERE sale_id = @sale5_id) WHERE sale_id = @sale5_id;
+-- Set every sale total from its items in one pass
+UPDATE sales s
+JOIN (SELECT sale_id, SUM(quantity * unit_price) AS total FROM sale_items GROUP BY sale_id) t
+    ON s.sale_id = t.sale_id
+SET s.total_amount = t.total;
 """
 
-def execute_mysql_via_tunnel(db_username, db_password, db_name, local_port, query=None, sql_file=None):
-    """Execute MySQL command via SSH tunnel"""
-    env = os.environ.copy()
-    env['MYSQL_PWD'] = db_password
+# Colors for output
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    CYAN = '\033[0;36m'
+    NC = '\033[0m'  # No Color
+
+def print_colored(message, color):
+    """Print message with color"""
+    print(f"{color}{message}{Colors.NC}")
+
+def cached_check(func):
+    """Skip a check that passed within CHECK_CACHE_TTL seconds"""
+    @functools.wraps(func)
+    def wrapper():
+        try:
+            with open(CHECK_CACHE_FILE, 'r') as f:
+                cache = json.load(f)
+            if not isinstance(cache, dict):
+                cache = {}
+        except (OSError, ValueError):
+            cache = {}
+        
+        entry = cache.get(func.__name__)
+        if isinstance(entry, dict) and time.time() - entry.get('ts', 0) < CHECK_CACHE_TTL:
+            return
+        
+        func()
+        
+        cache[func.__name__] = {'ts': time.time()}
+        try:
+            Path(CACHE_DIR).mkdir(parents=True, exist_ok=True)
+            with open(CHECK_CACHE_FILE, 'w') as f:
+                json.dump(cache, f)
+        except OSError:
+            pass
+    return wrapper
+
+@cached_check
+def check_azure_cli():
+    """Check if Azure CLI is installed"""
+    try:
+        subprocess.run(['az', '--version'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        print_colored("Error: Azure CLI is not installed", Colors.RED)
+        print("Please install Azure CLI first")
+        sys.exit(1)
+
+@cached_check
+def check_azure_login():
+    """Check if logged in to Azure"""
+    try:
+        subprocess.run(['az', 'account', 'show'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    except subprocess.CalledProcessError:
+        print_colored("Error: Not logged in to Azure", Colors.RED)
+        print("Please run: az login")
+        sys.exit(1)
+
+def _port_listening(port):
+    """Look for a TCP listener on port in the kernel socket tables; None if they are unavailable"""
+    suffix = f':{port:04X}'
+    found_table = False
+    for table in ('/proc/net/tcp', '/proc/net/tcp6'):
+        try:
+            with open(table, 'r') as f:
+                lines = f.read().splitlines()[1:]
+        except OSError:
+            continue
+        found_table = True
+        for line in lines:
+            fields = line.split()
+            # fields[1] is local address:port, fields[3] the state; 0A is LISTEN
+            if fields[1].endswith(suffix) and fields[3] == '0A':
+                return True
+    return False if found_table else None
+
+def check_ssh_tunnel():
+    """Check for active SSH tunnel"""
+    local_port = 3307
     
-    cmd = ['mysql', '-h', '127.0.0.1', '-P', str(local_port), '-u', db_username]
+    # On Linux the socket tables answer without opening a forwarded channel through the tunnel
+    if sys.platform.startswith('linux'):
+        listening = _port_listening(local_port)
+        if listening is not None:
+            return listening, local_port
     
-    if db_name:
-        cmd.append(db_name)
+    # Anything accepting connections on the tunnel port is treated as the tunnel
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(0.2)
+    try:
+        tunnel_active = sock.connect_ex(('127.0.0.1', local_port)) == 0
+    except OSError:
+        tunnel_active = False
+    finally:
+        sock.close()
     
-    if query:
-        cmd.extend(['-e', query])
+    return tunnel_active, local_port
+
+def prefetch_mysql_servers():
+    """Start listing MySQL servers in the background"""
+    global _SERVER_LIST_PROC
+    if _SERVER_LIST_PROC is None and _SERVER_LIST is None:
+        _SERVER_LIST_PROC = subprocess.Popen(['az', 'mysql', 'flexible-server', 'list', '--output', 'json'],
+                                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+def cancel_server_prefetch():
+    """Stop a background server listing that is no longer needed"""
+    global _SERVER_LIST_PROC
+    if _SERVER_LIST_PROC is not None:
+        _SERVER_LIST_PROC.terminate()
+        _SERVER_LIST_PROC.communicate()
+        _SERVER_LIST_PROC = None
+
+def load_mysql_servers():
+    """Return the MySQL server list, collecting the background listing if one is running"""
+    global _SERVER_LIST_PROC, _SERVER_LIST
+    if _SERVER_LIST is None:
+        prefetch_mysql_servers()
+        proc, _SERVER_LIST_PROC = _SERVER_LIST_PROC, None
+        stdout, stderr = proc.communicate()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args, stdout, stderr)
+        _SERVER_LIST = json.loads(stdout)
+    return _SERVER_LIST
+
+def get_mysql_servers():
+    """Get list of MySQL servers"""
+    try:
+        servers = load_mysql_servers()
+        
+        if not servers:
+            print_colored("No MySQL flexible servers found", Colors.YELLOW)
+            sys.exit(0)
+        
+        print_colored("Available MySQL Servers:", Colors.CYAN)
+        print()
+        
+        for i, server in enumerate(servers, 1):
+            print(f"{i}. {server['name']} ({server['resourceGroup']} - {server['state']})")
+        
+        print()
+        return servers
+    except subprocess.CalledProcessError as e:
+        print_colored(f"Error retrieving MySQL servers: {e}", Colors.RED)
+        sys.exit(1)
+
+def _active_subscription():
+    """Return the id of the az CLI default subscription, or None if it cannot be read"""
+    try:
+        # az writes the profile with a UTF-8 BOM
+        with open(AZURE_PROFILE_FILE, 'r', encoding='utf-8-sig') as f:
+            profile = json.load(f)
+        return next((sub['id'] for sub in profile.get('subscriptions', []) if sub.get('isDefault')), None)
+    except (OSError, ValueError, KeyError, AttributeError, TypeError):
+        return None
+
+def _load_server_cache(subscription):
+    """Return {name: {'resourceGroup', 'state', 'fqdn', 'ts'}} cached for subscription, or an empty dict"""
+    if subscription is None:
+        return {}
     
+    # The disk copy is only valid for the subscription it was fetched from
     try:
-        if sql_file:
-            with open(sql_file, 'r') as f:
-                result = subprocess.run(cmd, input=f.read(), text=True, env=env, 
-                                      capture_output=True, check=True)
+        with open(SERVER_CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+        if cache.get('subscription') == subscription and isinstance(cache.get('servers'), dict):
+            return cache['servers']
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+def _save_server_cache(subscription, servers):
+    """Record the resource group and state of every listed server"""
+    if subscription is None:
+        return
+    
+    cache = _load_server_cache(subscription)
+    now = time.time()
+    for server in servers:
+        cache[server['name']] = {'resourceGroup': server['resourceGroup'], 'state': server['state'],
+                                 'fqdn': server.get('fullyQualifiedDomainName'), 'ts': now}
+    try:
+        Path(CACHE_DIR).mkdir(parents=True, exist_ok=True)
+        with open(SERVER_CACHE_FILE, 'w') as f:
+            json.dump({'subscription': subscription, 'servers': cache}, f)
+    except OSError:
+        pass
+
+def get_server_info(server_name):
+    """Get server information"""
+    try:
+        subscription = _active_subscription()
+        entry = _load_server_cache(subscription).get(server_name)
+        if isinstance(entry, dict) and time.time() - entry.get('ts', 0) < SERVER_CACHE_TTL:
+            cancel_server_prefetch()
+            server = {'name': server_name, 'resourceGroup': entry['resourceGroup'], 'state': entry['state'],
+                      'fullyQualifiedDomainName': entry.get('fqdn')}
         else:
-            result = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
+            servers = load_mysql_servers()
+            _save_server_cache(subscription, servers)
+            server = next((s for s in servers if s['name'] == server_name), None)
         
-        return True, result.stdout
+        if server is None:
+            print_colored(f"Error: MySQL server '{server_name}' not found", Colors.RED)
+            sys.exit(1)
+        
+        print_colored(f"✓ Server found in resource group: {server['resourceGroup']}", Colors.GREEN)
+        
+        return {
+            'name': server['name'],
+            'resourceGroup': server['resourceGroup'],
+            'status': server['state'],
+            'fqdn': server.get('fullyQualifiedDomainName')
+        }
     except subprocess.CalledProcessError as e:
-        return False, e.stderr
+        print_colored(f"Error getting server information: {e}", Colors.RED)
+        sys.exit(1)
+
+def get_mock_data_sql():
+    """Get mock data SQL content"""
+    return MOCK_DATA_SQL
+
+class MysqlSession:
+    """One mysql client over the SSH tunnel, reused for every batch of statements"""
+    MARKER = '__nimbus_done__'
+    
+    def __init__(self, db_username, db_password, local_port):
+        env = os.environ.copy()
+        env['MYSQL_PWD'] = db_password
+        
+        # stderr is spooled so warnings can never fill a pipe nobody is reading
+        self.errors = tempfile.TemporaryFile(mode='w+')
+        self.proc = subprocess.Popen(['mysql', '--unbuffered', '-h', '127.0.0.1', '-P', str(local_port),
+                                      '-u', db_username],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self.errors,
+                                     env=env, text=True)
+    
+    def execute(self, sql):
+        """Run statements and return (success, output) once the marker row comes back"""
+        try:
+            self.proc.stdin.write(f"{sql}\nSELECT '{self.MARKER}' AS {self.MARKER};\n")
+            self.proc.stdin.flush()
+        except BrokenPipeError:
+            return False, self._error_output()
+        
+        lines = []
+        for line in self.proc.stdout:
+            if line.rstrip('\n') == self.MARKER:
+                self.proc.stdout.readline()  # the marker's value row
+                return True, ''.join(lines)
+            lines.append(line)
+        
+        # In batch mode mysql exits at the first failing statement
+        return False, self._error_output()
+    
+    def _error_output(self):
+        self.proc.wait()
+        self.errors.seek(0)
+        return self.errors.read()
+    
+    def close(self):
+        """End the client session"""
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            self.proc.wait()
+        self.errors.close()
 
-def execute_mysql_via_azure_cli(server_name, db_username, db_password, db_name, query=None, sql_file=None):
+class NativeMysqlSession:
+    """PyMySQL connection with the same interface as MysqlSession"""
+    
+    def __init__(self, db_username, db_password, local_port, host='127.0.0.1'):
+        import pymysql
+        from pymysql.constants import CLIENT
+        
+        self.error = None
+        self.conn = None
+        try:
+            # TLS without certificate verification, like the mysql CLI's default ssl-mode
+            self.conn = pymysql.connect(host=host, port=local_port, user=db_username,
+                                        password=db_password, autocommit=True,
+                                        client_flag=CLIENT.MULTI_STATEMENTS,
+                                        ssl={'check_hostname': False})
+        except pymysql.MySQLError as e:
+            self.error = str(e)
+    
+    def execute(self, sql):
+        """Run statements and return (success, output) formatted like mysql batch mode"""
+        import pymysql
+        
+        if self.conn is None:
+            return False, self.error
+        
+        lines = []
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(sql)
+                while True:
+                    if cursor.description:
+                        lines.append('\t'.join(col[0] for col in cursor.description))
+                        for row in cursor.fetchall():
+                            lines.append('\t'.join('NULL' if value is None else str(value) for value in row))
+                    if not cursor.nextset():
+                        break
+        except pymysql.MySQLError as e:
+            return False, str(e)
+        return True, ''.join(f"{line}\n" for line in lines)
+    
+    def close(self):
+        """End the client session"""
+        if self.conn is not None:
+            self.conn.close()
+
+def open_mysql_session(db_username, db_password, local_port):
+    """Prefer an in-process PyMySQL connection, falling back to the mysql client"""
+    if importlib.util.find_spec('pymysql') is not None:
+        return NativeMysqlSession(db_username, db_password, local_port)
+    return MysqlSession(db_username, db_password, local_port)
+
+def execute_mysql_via_azure_cli(server_name, db_username, db_password, db_name, query=None, sql_file=None,
+                                sql_text=None):
     """Execute MySQL command via Azure CLI"""
+    if sql_text is not None:
+        # `az mysql flexible-server execute` only reads scripts from a file
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.sql', delete=False) as temp_sql:
+            temp_sql.write(sql_text)
+        try:
+            return execute_mysql_via_azure_cli(server_name, db_username, db_password, db_name,
+                                               sql_file=temp_sql.name)
+        finally:
+            os.unlink(temp_sql.name)
+    
     try:
         if sql_file:
             cmd = ['az', 'mysql', 'flexible-server', 'execute',
@@ -302,11 +513,19 @@ def show_usage():
     print_colored("Azure MySQL Insert Mock Data - NimbusDFIR", Colors.BLUE)
     print_colored("==========================================", Colors.BLUE)
     print()
-    print("Usage: python mysql_insert_mock_data.py [SERVER_NAME] [DATABASE_NAME]")
+    print("Usage: python mysql_insert_mock_data.py [SERVER_NAME] [DATABASE_NAME] [OPTIONS]")
+    print()
+    print("Options:")
+    print("  --server NAME        MySQL server to use when no tunnel is active")
+    print("  --database NAME      Database to create (default: testdb)")
+    print("  --username NAME      MySQL admin username (default: mysqladmin)")
+    print(f"  --password-env       Read the admin password from ${PASSWORD_ENV}")
+    print("  -y, --yes            Accept defaults instead of prompting")
     print()
     print("Examples:")
     print("  python mysql_insert_mock_data.py                      # Interactive mode")
     print("  python mysql_insert_mock_data.py my-server testdb     # Direct mode")
+    print(f"  {PASSWORD_ENV}=... python mysql_insert_mock_data.py --server my-server --password-env --yes")
     print()
     print("Mock data includes:")
     print("  - 10 customers")
@@ -315,15 +534,43 @@ def show_usage():
     print("  - Purchase details linking customers, sales, and products")
     print()
 
+def parse_args(argv):
+    """Parse positional SERVER_NAME/DATABASE_NAME and the non-interactive options"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('server_arg', nargs='?')
+    parser.add_argument('database_arg', nargs='?')
+    parser.add_argument('--server')
+    parser.add_argument('--database')
+    parser.add_argument('--username')
+    parser.add_argument('--password-env', action='store_true')
+    parser.add_argument('-y', '--yes', action='store_true')
+    args = parser.parse_args(argv)
+    args.server = args.server or args.server_arg
+    args.database = args.database or args.database_arg
+    return args
+
+def ask(prompt, default=None, cli_value=None, assume_default=False):
+    """Return the command-line value, the default under --yes, or the user's answer"""
+    if cli_value:
+        return cli_value
+    if assume_default and default is not None:
+        return default
+    return input(prompt).strip() or default
+
 def main():
     """Main function"""
     if len(sys.argv) > 1 and sys.argv[1] in ['help', '--help', '-h']:
         show_usage()
         sys.exit(0)
     
+    args = parse_args(sys.argv[1:])
+    
     # Check prerequisites
     check_azure_cli()
     check_azure_login()
+    prefetch_mysql_servers()
     
     print_colored("==========================================", Colors.BLUE)
     print_colored("Azure MySQL Insert Mock Data", Colors.BLUE)
@@ -344,7 +591,10 @@ def main():
         print()
         
         # Fallback to server selection mode
-        server_name = sys.argv[1] if len(sys.argv) > 1 else None
+        server_name = args.server
+        if not server_name and args.yes:
+            print_colored("Error: --server is required without an SSH tunnel in non-interactive mode", Colors.RED)
+            sys.exit(1)
         if not server_name:
             servers = get_mysql_servers()
             print()
@@ -365,47 +615,51 @@ def main():
             else:
                 server_name = server_input
     else:
+        cancel_server_prefetch()
         print_colored(f"✓ Active SSH tunnel detected on port {local_port}", Colors.GREEN)
         print_colored("Using existing SSH tunnel for data insertion", Colors.GREEN)
         print()
     
-    # Get server information only if not using tunnel
-    if not tunnel_active and server_name:
-        print()
-        print_colored("Finding server details...", Colors.BLUE)
-        server_info = get_server_info(server_name)
-    
     # Get database name
-    db_name = sys.argv[2] if len(sys.argv) > 2 else None
-    if not db_name:
-        print()
-        db_name = input("Enter database name to create (default: testdb): ").strip()
-        if not db_name:
-            db_name = "testdb"
+    print()
+    db_name = ask("Enter database name to create (default: testdb): ", "testdb", args.database, args.yes)
     
     # Get admin credentials
     print()
-    db_username = input("Enter MySQL admin username (default: mysqladmin): ").strip()
-    if not db_username:
-        db_username = "mysqladmin"
+    db_username = ask("Enter MySQL admin username (default: mysqladmin): ", "mysqladmin",
+                      args.username, args.yes)
     
     print()
-    db_password = getpass.getpass("Enter MySQL admin password: ")
+    if args.password_env:
+        db_password = os.environ.get(PASSWORD_ENV, '')
+    elif args.yes:
+        db_password = ''
+    else:
+        db_password = getpass.getpass("Enter MySQL admin password: ")
     
     if not db_password:
         print_colored("Error: Password is required", Colors.RED)
+        if args.yes or args.password_env:
+            print(f"Set {PASSWORD_ENV} and pass --password-env")
         sys.exit(1)
     
+    # Get server information only if not using tunnel; looked up after the prompts so the
+    # background server listing has had time to finish
+    if not tunnel_active and server_name:
+        print()
+        print_colored("Finding server details...", Colors.BLUE)
+        server_info = get_server_info(server_name)
+    
     # Create database
     print()
     print_colored(f"Creating database '{db_name}'...", Colors.BLUE)
     
+    # Through the tunnel every step shares one mysql client and its login
+    session = None
     if tunnel_active:
         print_colored("Using SSH tunnel connection...", Colors.GREEN)
-        success, output = execute_mysql_via_tunnel(
-            db_username, db_password, None, local_port, 
-            query=f"CREATE DATABASE IF NOT EXISTS `{db_name}`;"
-        )
+        session = open_mysql_session(db_username, db_password, local_port)
+        success, output = session.execute(f"CREATE DATABASE IF NOT EXISTS `{db_name}`; USE `{db_name}`;")
     else:
         # Create database via Azure CLI
         try:
@@ -413,7 +667,7 @@ def main():
                            '--resource-group', server_info['resourceGroup'],
                            '--server-name', server_name,
                            '--database-name', db_name], 
-                          capture_output=True, check=True)
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
             success = True
         except subprocess.CalledProcessError:
             success = True  # Database might already exist
@@ -421,24 +675,26 @@ def main():
     if success:
         print_colored("✓ Database ready", Colors.GREEN)
     
-    # Create temporary SQL file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.sql', delete=False) as temp_sql:
-        temp_sql.write(get_mock_data_sql())
-        temp_sql_path = temp_sql.name
+    # Without a tunnel, talk to the server directly when PyMySQL is available; this is what
+    # `az mysql flexible-server execute` does internally, minus a CLI start per statement batch
+    if not session and server_info.get('fqdn') and importlib.util.find_spec('pymysql') is not None:
+        direct = NativeMysqlSession(db_username, db_password, 3306, host=server_info['fqdn'])
+        if direct.execute(f"USE `{db_name}`;")[0]:
+            session = direct
+        else:
+            direct.close()
     
     try:
         print()
         print_colored("Inserting mock data... (this may take a few moments)", Colors.YELLOW)
         print()
         
-        # Execute SQL file
-        if tunnel_active:
-            success, output = execute_mysql_via_tunnel(
-                db_username, db_password, db_name, local_port, sql_file=temp_sql_path
-            )
+        # The script goes straight to the client; only the Azure CLI needs it on disk
+        if session:
+            success, output = session.execute(get_mock_data_sql())
         else:
             success, output = execute_mysql_via_azure_cli(
-                server_name, db_username, db_password, db_name, sql_file=temp_sql_path
+                server_name, db_username, db_password, db_name, sql_text=get_mock_data_sql()
             )
         
         if success:
@@ -466,43 +722,38 @@ def main():
             print_colored("Fetching data summary...", Colors.BLUE)
             print()
             
-            # Count records in each table
-            print_colored("Table Record Counts:", Colors.CYAN)
             count_query = ("SELECT 'Customers' as Table_Name, COUNT(*) as Total FROM customers "
                           "UNION ALL SELECT 'Products', COUNT(*) FROM products "
                           "UNION ALL SELECT 'Sales', COUNT(*) FROM sales "
                           "UNION ALL SELECT 'Sale Items', COUNT(*) FROM sale_items;")
-            
-            if tunnel_active:
-                success, output = execute_mysql_via_tunnel(
-                    db_username, db_password, db_name, local_port, query=count_query
-                )
-            else:
-                success, output = execute_mysql_via_azure_cli(
-                    server_name, db_username, db_password, db_name, query=count_query
-                )
-            
-            if success:
-                print(output)
-            
-            print()
-            print_colored("Sales Summary:", Colors.CYAN)
             sales_query = ("SELECT c.customer_name AS Customer, c.city AS City, "
                           "CONCAT('$', FORMAT(s.total_amount, 2)) AS Total "
                           "FROM sales s JOIN customers c ON s.customer_id = c.customer_id "
                           "ORDER BY s.sale_id;")
             
-            if tunnel_active:
-                success, output = execute_mysql_via_tunnel(
-                    db_username, db_password, db_name, local_port, query=sales_query
-                )
+            if session:
+                # Record counts and sales summary in one round-trip, split on a sentinel row
+                summary_sql = f"{count_query}\n{SUMMARY_SEPARATOR}\n{sales_query}\n"
+                success, output = session.execute(summary_sql)
+                counts, _, sales = output.partition(SUMMARY_MARKER) if success else ('', '', '')
+                sales_success = success and SUMMARY_MARKER in output
             else:
-                success, output = execute_mysql_via_azure_cli(
+                # --querytext returns result rows (--file-path does not), one statement per call
+                success, counts = execute_mysql_via_azure_cli(
+                    server_name, db_username, db_password, db_name, query=count_query
+                )
+                sales_success, sales = execute_mysql_via_azure_cli(
                     server_name, db_username, db_password, db_name, query=sales_query
                 )
             
+            print_colored("Table Record Counts:", Colors.CYAN)
             if success:
-                print(output)
+                print(counts)
+            
+            print()
+            print_colored("Sales Summary:", Colors.CYAN)
+            if sales_success:
+                print(sales)
             
             print()
             print_colored("All operations completed successfully!", Colors.GREEN)
@@ -512,11 +763,8 @@ def main():
             sys.exit(1)
             
     finally:
-        # Cleanup temporary file
-        try:
-            os.unlink(temp_sql_path)
-        except:
-            pass
+        if session:
+            session.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
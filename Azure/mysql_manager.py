@@ -6,27 +6,79 @@ Description: Manage MySQL databases (list, create, delete) via Azure tunnel or d
 """
 import subprocess
 import getpass
-import sys
+import os
+import importlib.util
+
+# Environment variable read by --password-env
+PASSWORD_ENV = 'MYSQL_ADMIN_PASSWORD'
+
+# Values supplied on the command line; None means prompt
+OPTIONS = {'username': None, 'password': None, 'yes': False}
+
+# Credentials and connection are set up once and reused by every command
+_CREDENTIALS = None
+_CONNECTION = None
+
+def ask(prompt, default=None, cli_value=None):
+    if cli_value:
+        return cli_value
+    if OPTIONS['yes'] and default is not None:
+        return default
+    return input(prompt).strip() or default
 
 def get_mysql_credentials():
-    user = input("Enter MySQL admin username (default: mysqladmin): ").strip() or "mysqladmin"
-    passwd = getpass.getpass("Enter MySQL admin password: ")
-    return user, passwd
+    global _CREDENTIALS
+    if _CREDENTIALS is None:
+        user = ask("Enter MySQL admin username (default: mysqladmin): ", "mysqladmin", OPTIONS['username'])
+        passwd = OPTIONS['password']
+        if passwd is None:
+            passwd = getpass.getpass("Enter MySQL admin password: ")
+        _CREDENTIALS = (user, passwd)
+    return _CREDENTIALS
 
-def list_databases():
+def _connect():
+    # One PyMySQL connection per run, shared by every command
+    global _CONNECTION
+    if _CONNECTION is None:
+        import pymysql
+        user, passwd = get_mysql_credentials()
+        # TLS without certificate verification, like the mysql CLI's default ssl-mode
+        _CONNECTION = pymysql.connect(host='127.0.0.1', port=3307, user=user, password=passwd,
+                                      autocommit=True, ssl={'check_hostname': False})
+    return _CONNECTION
+
+def run_sql(sql):
+    # Returns (success, rows); uses PyMySQL when installed, else the mysql client
+    if importlib.util.find_spec('pymysql') is not None:
+        import pymysql
+        try:
+            with _connect().cursor() as cursor:
+                cursor.execute(sql)
+                return True, list(cursor.fetchall())
+        except pymysql.MySQLError as e:
+            print(f"Error: {e}")
+            return False, []
+    
     user, passwd = get_mysql_credentials()
-    env = {**dict(**os.environ), 'MYSQL_PWD': passwd}
-    try:
-        result = subprocess.run([
-            'mysql', '-h', '127.0.0.1', '-P', '3307', '-u', user, '-e', 'SHOW DATABASES;'
-        ], capture_output=True, text=True, env=env, check=True)
-        lines = [l.strip() for l in result.stdout.splitlines() if l.strip()]
-        system = {"Database", "information_schema", "performance_schema", "mysql", "sys"}
-        print("Available Databases:")
-        for i, db in enumerate([d for d in lines if d not in system], 1):
-            print(f"  {i}. {db}")
-    except subprocess.CalledProcessError:
+    env = os.environ.copy()
+    env['MYSQL_PWD'] = passwd
+    result = subprocess.run([
+        'mysql', '--batch', '--skip-column-names', '-h', '127.0.0.1', '-P', '3307', '-u', user, '-e', sql
+    ], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        print(result.stderr.strip())
+        return False, []
+    return True, [tuple(line.split('\t')) for line in result.stdout.splitlines()]
+
+def list_databases():
+    ok, rows = run_sql('SHOW DATABASES;')
+    if not ok:
         print("Error: Could not connect to MySQL")
+        return
+    system = {"information_schema", "performance_schema", "mysql", "sys"}
+    print("Available Databases:")
+    for i, db in enumerate([row[0] for row in rows if row[0] not in system], 1):
+        print(f"  {i}. {db}")
 
 def create_database(name):
     if not name:
@@ -34,14 +86,11 @@ def create_database(name):
         if not name:
             print("Database name required")
             return
-    user, passwd = get_mysql_credentials()
-    env = {**dict(**os.environ), 'MYSQL_PWD': passwd}
-    try:
-        subprocess.run([
-            'mysql', '-h', '127.0.0.1', '-P', '3307', '-u', user, '-e', f'CREATE DATABASE IF NOT EXISTS `{name}`;'
-        ], env=env, check=True)
+    get_mysql_credentials()
+    ok, _ = run_sql(f'CREATE DATABASE IF NOT EXISTS `{name}`;')
+    if ok:
         print(f"✓ Database '{name}' created or already exists.")
-    except subprocess.CalledProcessError:
+    else:
         print(f"✗ Failed to create database '{name}'")
 
 def delete_database(name):
@@ -50,18 +99,16 @@ def delete_database(name):
         if not name:
             print("Database name required")
             return
-    user, passwd = get_mysql_credentials()
-    env = {**dict(**os.environ), 'MYSQL_PWD': passwd}
-    confirm = input(f"Are you sure you want to delete database '{name}'? (y/N): ").strip().lower()
-    if confirm != 'y':
-        print("Deletion cancelled")
-        return
-    try:
-        subprocess.run([
-            'mysql', '-h', '127.0.0.1', '-P', '3307', '-u', user, '-e', f'DROP DATABASE IF EXISTS `{name}`;'
-        ], env=env, check=True)
+    get_mysql_credentials()
+    if not OPTIONS['yes']:
+        confirm = input(f"Are you sure you want to delete database '{name}'? (y/N): ").strip().lower()
+        if confirm != 'y':
+            print("Deletion cancelled")
+            return
+    ok, _ = run_sql(f'DROP DATABASE IF EXISTS `{name}`;')
+    if ok:
         print(f"✓ Database '{name}' deleted (if it existed).")
-    except subprocess.CalledProcessError:
+    else:
         print(f"✗ Failed to delete database '{name}'")
 
 def show_usage():
@@ -69,7 +116,7 @@ def show_usage():
     print("Azure MySQL Manager - NimbusDFIR")
     print("==========================================")
     print()
-    print("Usage: python mysql_manager.py [COMMAND] [DATABASE_NAME]")
+    print("Usage: python mysql_manager.py [COMMAND] [DATABASE_NAME] [OPTIONS]")
     print()
     print("Commands:")
     print("  list                List all databases")
@@ -77,6 +124,11 @@ def show_usage():
     print("  delete [NAME]        Delete a database")
     print("  help                 Show this help message")
     print()
+    print("Options:")
+    print("  --username NAME      MySQL admin username (default: mysqladmin)")
+    print(f"  --password-env       Read the admin password from ${PASSWORD_ENV}")
+    print("  -y, --yes            Accept defaults and skip the delete confirmation")
+    print()
     print("Examples:")
     print("  python mysql_manager.py list")
     print("  python mysql_manager.py create testdb")
@@ -84,13 +136,26 @@ def show_usage():
     print()
 
 def main():
-    import os
-    args = sys.argv[1:]
-    if not args or args[0] == 'help':
+    import argparse
+    
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('command', nargs='?')
+    parser.add_argument('name', nargs='?')
+    parser.add_argument('--username')
+    parser.add_argument('--password-env', action='store_true')
+    parser.add_argument('-y', '--yes', action='store_true')
+    args = parser.parse_args()
+    if not args.command or args.command == 'help':
         show_usage()
         return
-    cmd = args[0]
-    name = args[1] if len(args) > 1 else None
+    
+    OPTIONS['username'] = args.username
+    OPTIONS['yes'] = args.yes
+    if args.password_env:
+        OPTIONS['password'] = os.environ.get(PASSWORD_ENV, '')
+    
+    cmd = args.command
+    name = args.name
     if cmd == 'list':
         list_databases()
     elif cmd == 'create':
@@ -1,6 +1,29 @@
 #!/usr/bin/env python3
-import subprocess
+import functools
+import importlib
 import sys
+import os
+import re
+import subprocess
+import uuid
+from azure.core.exceptions import AzureError
+
+# Management SDKs are imported on first use, so `help` skips their load time
+MGMT_CLIENTS = {
+    "storage": ("azure.mgmt.storage", "StorageManagementClient"),
+    "resource": ("azure.mgmt.resource", "ResourceManagementClient"),
+    "authorization": ("azure.mgmt.authorization", "AuthorizationManagementClient"),
+}
+
+# Built-in role definition id of "Storage Blob Data Owner"
+BLOB_DATA_OWNER_ROLE_ID = "b7e6dc6d-f1e8-4753-8033-0f276bb0955b"
+
+# Signed-in user and subscription ids, fetched once per run
+_USER_ID = None
+_SUB_ID = None
+
+_credential = None
+_clients = {}
 
 # Colors for terminal output
 class Colors:
@@ -19,55 +42,125 @@ def pause():
     input("Press ENTER to continue...")
 
 def select_from_list(options, default):
-    for idx, val in enumerate(options, 1):
-        if val == default:
-            print(f"  {Colors.BLUE}{idx}) {val} (default){Colors.NC}")
-        else:
-            print(f"  {Colors.BLUE}{idx}) {val}{Colors.NC}")
+    # Render the whole menu, then write it once
+    prefix, suffix = f"  {Colors.BLUE}", Colors.NC
+    default_idx = options.index(default) + 1 if default in options else 0
+    lines = [f"{prefix}{idx}) {val}{' (default)' if idx == default_idx else ''}{suffix}"
+             for idx, val in enumerate(options, 1)]
+    sys.stdout.write('\n'.join(lines) + '\n')
     choice = input(f"Choose an option (ENTER for default: {default}): ")
     if not choice:
         return default
     if choice.isdigit() and 1 <= int(choice) <= len(options):
         return options[int(choice)-1]
-    for val in options:
-        if val == choice:
-            return val
+    if choice in set(options):
+        return choice
     return default
 
+# az always emits UTF-8; decode the raw bytes once instead of going through a text wrapper
 def run_az(args):
-    result = subprocess.run(["az"] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    return result.stdout.strip(), result.stderr.strip(), result.returncode
+    result = subprocess.run(["az"] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return (result.stdout.decode("utf-8", "replace").strip(),
+            result.stderr.decode("utf-8", "replace").strip(),
+            result.returncode)
+
+# AZURE_SUBSCRIPTION_ID overrides the az CLI default subscription
+def get_subscription_id():
+    global _SUB_ID
+    if _SUB_ID is None:
+        _SUB_ID = os.environ.get("AZURE_SUBSCRIPTION_ID") or run_az(["account", "show", "--query", "id", "-o", "tsv"])[0]
+    return _SUB_ID
+
+# One management client per kind, sharing a single credential; ARM calls stay in-process
+def get_client(kind):
+    global _credential
+    if kind not in _clients:
+        if _credential is None:
+            from azure.identity import DefaultAzureCredential
+            _credential = DefaultAzureCredential()
+        module_name, class_name = MGMT_CLIENTS[kind]
+        client_class = getattr(importlib.import_module(module_name), class_name)
+        _clients[kind] = client_class(_credential, get_subscription_id())
+    return _clients[kind]
+
+def _get_identity():
+    global _USER_ID
+    if _USER_ID is None:
+        from concurrent.futures import ThreadPoolExecutor
+        # The signed-in user's object id only comes from Microsoft Graph, so that one stays on az;
+        # the subscription lookup runs alongside it
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            user = executor.submit(run_az, ["ad", "signed-in-user", "show", "--query", "id", "-o", "tsv"])
+            sub = executor.submit(get_subscription_id)
+            _USER_ID = user.result()[0]
+            sub.result()
+    return _USER_ID, get_subscription_id()
+
+# Yields one list of (name, resource group) per SDK page, so callers can act on
+# the first page before the rest arrives
+def iter_storage_account_pages():
+    for page in get_client("storage").storage_accounts.list().by_page():
+        # Resource group is the fifth segment of the ARM id
+        yield [(account.name, account.id.split('/')[4]) for account in page]
+
+def iter_storage_accounts():
+    for page in iter_storage_account_pages():
+        yield from page
+
+TABLE_HEADER = (f"{Colors.GREEN}Storage Accounts found:{Colors.NC}\n"
+                "ID    Storage Account                          Resource Group\n"
+                "---------------------------------------------------------------\n")
 
 def list_storage_accounts():
     print(f"{Colors.YELLOW}Fetching Storage Accounts from all Resource Groups...{Colors.NC}")
-    out, err, code = run_az(["storage", "account", "list", "--query", "[].{name:name, rg:resourceGroup}", "-o", "tsv"])
-    if not out:
+    accounts = []
+    try:
+        # Each page is rendered in memory and written once, header included on the first
+        for page in iter_storage_account_pages():
+            rows = [f"{idx}    {name:<36} {rg}\n" for idx, (name, rg) in enumerate(page, len(accounts) + 1)]
+            if rows:
+                sys.stdout.write(('' if accounts else TABLE_HEADER) + ''.join(rows))
+                sys.stdout.flush()
+            accounts.extend(page)
+    except AzureError as e:
+        print(f"{Colors.RED}Failed to list Storage Accounts: {e}{Colors.NC}")
+        return []
+    if not accounts:
         print(f"{Colors.RED}No Storage Accounts found.{Colors.NC}")
-        return
-    print(f"{Colors.GREEN}Storage Accounts found:{Colors.NC}")
-    print("ID    Storage Account                          Resource Group")
-    print("---------------------------------------------------------------")
-    lines = out.splitlines()
-    for idx, line in enumerate(lines, 1):
-        parts = line.split('\t')
-        if len(parts) == 2:
-            print(f"{idx}    {parts[0]:<36} {parts[1]}")
+        return []
     print()
+    return accounts
+
+# Resource groups are fetched once per process; refresh=True drops the cached list
+@functools.lru_cache(maxsize=1)
+def _cached_resource_groups():
+    return tuple(group.name for group in get_client("resource").resource_groups.list())
+
+def list_resource_groups(refresh=False):
+    if refresh:
+        _cached_resource_groups.cache_clear()
+    return _cached_resource_groups()
 
 def create_storage_account():
     print(f"{Colors.GREEN}Create new Storage Account{Colors.NC}")
     print(f"{Colors.YELLOW}Fetching Resource Groups...{Colors.NC}")
-    out, _, _ = run_az(["group", "list", "--query", "[].name", "-o", "tsv"])
-    rgs = out.splitlines()
-    for idx, rg in enumerate(rgs, 1):
-        print(f"  {idx}) {rg}")
-    print("  0) Create NEW Resource Group")
+    try:
+        rgs = list_resource_groups()
+    except AzureError as e:
+        print(f"{Colors.RED}Failed to list Resource Groups: {e}{Colors.NC}")
+        return
+    sys.stdout.write(''.join(f"  {idx}) {rg}\n" for idx, rg in enumerate(rgs, 1)) + "  0) Create NEW Resource Group\n")
     rg_choice = input("Choose a Resource Group option: ")
     if rg_choice == "0":
         RG = input("Enter new Resource Group name: ")
         RG_LOCATION = input("Location for new Resource Group (ENTER for eastus): ") or "eastus"
         print(f"{Colors.YELLOW}Creating Resource Group...{Colors.NC}")
-        run_az(["group", "create", "--name", RG, "--location", RG_LOCATION])
+        try:
+            get_client("resource").resource_groups.create_or_update(RG, {"location": RG_LOCATION})
+            _cached_resource_groups.cache_clear()
+        except AzureError as e:
+            print(f"{Colors.RED}Failed to create Resource Group: {e}{Colors.NC}")
+            return
     else:
         idx = int(rg_choice) - 1
         RG = rgs[idx] if 0 <= idx < len(rgs) else None
@@ -78,6 +171,18 @@ def create_storage_account():
     if not SA_NAME:
         print(f"{Colors.RED}Name is required.{Colors.NC}")
         return
+    # Reject bad or taken names up front instead of after the create LRO fails remotely
+    if not re.fullmatch(r"[a-z0-9]{3,24}", SA_NAME):
+        print(f"{Colors.RED}Name must be 3-24 lowercase letters and digits.{Colors.NC}")
+        return
+    try:
+        availability = get_client("storage").storage_accounts.check_name_availability({"name": SA_NAME, "type": "Microsoft.Storage/storageAccounts"})
+    except AzureError as e:
+        print(f"{Colors.RED}Failed to check name availability: {e}{Colors.NC}")
+        return
+    if not availability.name_available:
+        print(f"{Colors.RED}Name '{SA_NAME}' is not available: {availability.message}{Colors.NC}")
+        return
     LOCATIONS = ["eastus", "centralus", "westus", "eastus2", "southcentralus"]
     SKUS = ["Standard_LRS", "Standard_GRS", "Standard_RAGRS", "Standard_ZRS", "Premium_LRS"]
     KINDS = ["StorageV2", "Storage", "BlobStorage", "FileStorage", "BlockBlobStorage"]
@@ -85,67 +190,107 @@ def create_storage_account():
     SKU = select_from_list(SKUS, "Standard_LRS")
     KIND = select_from_list(KINDS, "StorageV2")
     print(f"{Colors.YELLOW}Creating Storage Account with Azure AD authentication enabled...{Colors.NC}")
-    _, err, code = run_az([
-        "storage", "account", "create",
-        "--name", SA_NAME,
-        "--resource-group", RG,
-        "--location", LOCATION,
-        "--sku", SKU,
-        "--kind", KIND,
-        "--allow-shared-key-access", "false",
-        "--min-tls-version", "TLS1_2"
-    ])
-    if code != 0:
-        print(f"{Colors.RED}Failed to create Storage Account: {err}{Colors.NC}")
+    from azure.mgmt.storage.models import Sku, StorageAccountCreateParameters
+    try:
+        get_client("storage").storage_accounts.begin_create(RG, SA_NAME, StorageAccountCreateParameters(
+            location=LOCATION,
+            sku=Sku(name=SKU),
+            kind=KIND,
+            allow_shared_key_access=False,
+            minimum_tls_version="TLS1_2",
+        )).result()
+    except AzureError as e:
+        print(f"{Colors.RED}Failed to create Storage Account: {e}{Colors.NC}")
         return
     print(f"{Colors.GREEN}Storage Account created successfully!{Colors.NC}")
     print(f"{Colors.YELLOW}Assigning 'Storage Blob Data Owner' role to the signed-in user...{Colors.NC}")
-    user_id, _, _ = run_az(["ad", "signed-in-user", "show", "--query", "id", "-o", "tsv"])
-    sub_id, _, _ = run_az(["account", "show", "--query", "id", "-o", "tsv"])
-    _, _, _ = run_az([
-        "role", "assignment", "create",
-        "--assignee", user_id,
-        "--role", "Storage Blob Data Owner",
-        "--scope", f"/subscriptions/{sub_id}/resourceGroups/{RG}/providers/Microsoft.Storage/storageAccounts/{SA_NAME}"
-    ])
+    user_id, sub_id = _get_identity()
+    from azure.mgmt.authorization.models import RoleAssignmentCreateParameters
+    try:
+        get_client("authorization").role_assignments.create(
+            f"/subscriptions/{sub_id}/resourceGroups/{RG}/providers/Microsoft.Storage/storageAccounts/{SA_NAME}",
+            str(uuid.uuid4()),
+            RoleAssignmentCreateParameters(
+                role_definition_id=f"/subscriptions/{sub_id}/providers/Microsoft.Authorization/roleDefinitions/{BLOB_DATA_OWNER_ROLE_ID}",
+                principal_id=user_id,
+                principal_type="User",
+            ),
+        )
+    except AzureError as e:
+        print(f"{Colors.RED}Failed to assign role: {e}{Colors.NC}")
+        return
     print(f"{Colors.GREEN}Role assignment completed! You now have permission to upload using --auth-mode login.{Colors.NC}")
 
+# Parallel deletes when several accounts are selected at once
+DELETE_WORKERS = 8
+
+# Expands a selection like "1,3,5-7" into zero-based indices; None if any part is malformed
+def _expand_ranges(selection, count):
+    indices = []
+    for part in selection.replace(" ", "").split(","):
+        lo, _, hi = part.partition("-")
+        if not lo.isdigit() or (hi and not hi.isdigit()):
+            return None
+        first, last = int(lo), int(hi or lo)
+        if not 1 <= first <= last <= count:
+            return None
+        indices.extend(i - 1 for i in range(first, last + 1) if i - 1 not in indices)
+    return indices
+
+def _delete_one(target):
+    SA_NAME, RG = target
+    try:
+        get_client("storage").storage_accounts.delete(RG, SA_NAME)
+        return SA_NAME, None
+    except AzureError as e:
+        return SA_NAME, e
+
 def delete_storage_account(name=None):
     if not name:
-        list_storage_accounts()
-        choice = input("Enter the ID of the Storage Account to delete: ")
-        out, _, _ = run_az(["storage", "account", "list", "--query", "[].{name:name, rg:resourceGroup}", "-o", "tsv"])
-        lines = out.splitlines()
-        idx = int(choice) - 1
-        if idx < 0 or idx >= len(lines):
+        accounts = list_storage_accounts()
+        choice = input("Enter the ID(s) of the Storage Account(s) to delete (e.g. 1,3,5-7): ")
+        indices = _expand_ranges(choice, len(accounts))
+        if not indices:
             print(f"{Colors.RED}Invalid selection.{Colors.NC}")
             return
-        parts = lines[idx].split('\t')
-        SA_NAME, RG = parts[0], parts[1]
+        targets = [accounts[idx] for idx in indices]
     else:
-        SA_NAME = name
-        out, _, _ = run_az(["storage", "account", "show", "--name", SA_NAME, "--query", "resourceGroup", "-o", "tsv"])
-        RG = out.strip()
+        try:
+            RG = next((rg for account, rg in iter_storage_accounts() if account == name), "")
+        except AzureError as e:
+            print(f"{Colors.RED}Failed to look up Storage Account: {e}{Colors.NC}")
+            return
+        if not RG:
+            print(f"{Colors.RED}Storage Account '{name}' not found.{Colors.NC}")
+            return
+        targets = [(name, RG)]
     print(f"{Colors.RED}Are you sure you want to delete:{Colors.NC}")
-    print(f"  Storage Account: {Colors.YELLOW}{SA_NAME}{Colors.NC}")
-    print(f"  Resource Group:  {Colors.YELLOW}{RG}{Colors.NC}")
+    for SA_NAME, RG in targets:
+        print(f"  Storage Account: {Colors.YELLOW}{SA_NAME}{Colors.NC}")
+        print(f"  Resource Group:  {Colors.YELLOW}{RG}{Colors.NC}")
     confirm = input("Confirm deletion? (y/N): ")
     if confirm.lower() != "y":
         print(f"{Colors.YELLOW}Operation cancelled.{Colors.NC}")
         return
-    print(f"{Colors.YELLOW}Deleting Storage Account...{Colors.NC}")
-    _, _, code = run_az(["storage", "account", "delete", "--name", SA_NAME, "--resource-group", RG, "--yes"])
-    if code == 0:
-        print(f"{Colors.GREEN}Storage Account deleted successfully!{Colors.NC}")
+    print(f"{Colors.YELLOW}Deleting {len(targets)} Storage Account(s)...{Colors.NC}")
+    if len(targets) == 1:
+        results = [_delete_one(targets[0])]
     else:
-        print(f"{Colors.RED}Error deleting Storage Account.{Colors.NC}")
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(DELETE_WORKERS, len(targets))) as executor:
+            results = list(executor.map(_delete_one, targets))
+    for SA_NAME, error in results:
+        if error is None:
+            print(f"{Colors.GREEN}Storage Account '{SA_NAME}' deleted successfully!{Colors.NC}")
+        else:
+            print(f"{Colors.RED}Error deleting Storage Account '{SA_NAME}': {error}{Colors.NC}")
 
 def print_help():
     print("Usage: storage_account_manager.py [COMMAND] [OPTIONS]\n")
     print("Commands:")
     print("  list              List all Storage Accounts")
     print("  create            Create a new Storage Account")
-    print("  delete [NAME]     Delete a Storage Account (select if NAME omitted)")
+    print("  delete [NAME]     Delete a Storage Account (select one or more, e.g. 1,3,5-7, if NAME omitted)")
     print("  help              Show this help message\n")
     print("Examples:")
     print("  python storage_account_manager.py list")
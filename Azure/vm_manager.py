@@ -6,12 +6,67 @@ Author: NimbusDFIR
 Description: Manage Azure VMs - list, create, start, stop, and delete VMs
 """
 
+import os
+import re
 import sys
+import time
 import subprocess
 import json
+import shutil
+import hashlib
 import argparse
 from datetime import datetime
 import getpass
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from azure.core.exceptions import AzureError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# az always answers in uncolored JSON, whatever the user's `az config` says
+AZ_ENV = dict(os.environ, AZURE_CORE_OUTPUT="json", AZURE_CORE_NO_COLOR="1")
+
+# A successful prerequisite check is remembered for a while so warm runs skip both az calls
+CACHE_DIR = os.path.expanduser("~/.cache/nimbusdfir")
+PREREQ_TOKEN_FILE = os.path.join(CACHE_DIR, "az_ok")
+PREREQ_TOKEN_TTL = 600
+
+# Read-only az results are reused for a short while across runs; --no-cache turns this off
+AZ_CACHE_DIR = os.path.join(CACHE_DIR, "az")
+AZ_CACHE_TTL = 30
+AZ_READ_ONLY = {"list", "show", "get-instance-view"}
+_az_cache_enabled = True
+
+# Resources left behind by a VM delete, as (label, client kind, operations group, list method).
+# Public IPs, NSGs and VNets stay referenced until the NICs are gone, so they go in a second wave
+CLEANUP_WAVES = [
+    [("NIC", 'network', 'network_interfaces', 'list'),
+     ("Disk", 'compute', 'disks', 'list_by_resource_group')],
+    [("Public IP", 'network', 'public_ip_addresses', 'list'),
+     ("NSG", 'network', 'network_security_groups', 'list'),
+     ("VNET", 'network', 'virtual_networks', 'list')],
+]
+
+# ARM clients for list/start/stop/delete and cleanup, imported on first use; `create` stays on az
+MGMT_CLIENTS = {
+    'compute': ('azure.mgmt.compute', 'ComputeManagementClient'),
+    'network': ('azure.mgmt.network', 'NetworkManagementClient'),
+}
+
+ARM_SCOPE = "https://management.azure.com/.default"
+
+# Values given on the command line; any of them skips the matching prompt
+OPTIONS = {'name': None, 'resource_group': None, 'location': None, 'size': None,
+           'image': None, 'yes': False, 'cleanup': False}
+
+_credential = None
+_credential_lock = threading.Lock()
+_subscription_id = None
+_clients = {}
 
 # Colors for terminal output
 class Colors:
@@ -24,40 +79,73 @@ class Colors:
     RESET = '\033[0m'
     BOLD = '\033[1m'
 
+# Power states grouped as running or stopped, and the color each group is shown in
+_STATE_RE = re.compile(r"(running)|(stopped|deallocated)", re.I)
+STATE_COLORS = {'running': Colors.GREEN, 'stopped': Colors.YELLOW}
+
+def _state_kind(power_state):
+    """Classify a power state as 'running', 'stopped' or None"""
+    match = _STATE_RE.search(power_state)
+    if not match:
+        return None
+    return 'running' if match.group(1) else 'stopped'
+
 def print_colored(message, color=Colors.WHITE):
     """Print colored message to terminal"""
     print(f"{color}{message}{Colors.RESET}")
 
+def _decode(data):
+    """Decode az output for display"""
+    return data.decode('utf-8', 'replace').strip() if data else ""
+
 def run_az_command(command, capture_output=True, check=True):
-    """Run Azure CLI command and return result"""
+    """Run an Azure CLI command given as an argument list; stdout comes back as raw bytes"""
     try:
-        if isinstance(command, str):
-            # Print command before execution
-            print_colored(f"[Azure CLI] {command}", Colors.CYAN)
-            command = command.split()
-        else:
-            # Command is already a list - mask password if present
-            display_cmd = command.copy()
-            for i, arg in enumerate(display_cmd):
-                if arg in ['--admin-password', '--password', '-p'] and i + 1 < len(display_cmd):
-                    display_cmd[i + 1] = '********'
-            print_colored(f"[Azure CLI] {' '.join(display_cmd)}", Colors.CYAN)
+        # Mask password if present
+        display_cmd = command.copy()
+        for i, arg in enumerate(display_cmd):
+            if arg in ['--admin-password', '--password', '-p'] and i + 1 < len(display_cmd):
+                display_cmd[i + 1] = '********'
+        print_colored(f"[Azure CLI] {' '.join(display_cmd)}", Colors.CYAN)
+        
+        cache_file = None
+        if capture_output and _az_cache_enabled and AZ_READ_ONLY.intersection(command):
+            key = hashlib.blake2b(repr(command).encode(), digest_size=16).hexdigest()
+            cache_file = os.path.join(AZ_CACHE_DIR, f"{key}.out")
+            try:
+                if time.time() - os.path.getmtime(cache_file) < AZ_CACHE_TTL:
+                    with open(cache_file, 'rb') as f:
+                        return f.read(), "", 0
+            except OSError:
+                pass
         
         result = subprocess.run(
             command,
             capture_output=capture_output,
-            text=True,
-            check=check
+            check=check,
+            env=AZ_ENV
         )
         
+        # Anything that may have changed resources invalidates the cached reads
+        if not AZ_READ_ONLY.intersection(command) and result.returncode == 0:
+            shutil.rmtree(AZ_CACHE_DIR, ignore_errors=True)
+        
         if capture_output:
-            return result.stdout.strip(), result.stderr.strip(), result.returncode
+            stdout = result.stdout.strip()
+            if cache_file and result.returncode == 0:
+                try:
+                    os.makedirs(AZ_CACHE_DIR, exist_ok=True)
+                    with open(cache_file, 'wb') as f:
+                        f.write(stdout)
+                except OSError:
+                    pass
+            return stdout, _decode(result.stderr), result.returncode
         else:
             return None, None, result.returncode
             
     except subprocess.CalledProcessError as e:
         if capture_output:
-            return e.stdout, e.stderr, e.returncode
+            return e.stdout, _decode(e.stderr), e.returncode
         else:
             return None, None, e.returncode
     except FileNotFoundError:
@@ -66,20 +154,96 @@ def run_az_command(command, capture_output=True, check=True):
         print_colored("Visit: https://docs.microsoft.com/en-us/cli/azure/install-azure-cli", Colors.GREEN)
         sys.exit(1)
 
-def check_prerequisites():
+def ask(prompt, default=None, cli_value=None):
+    """Return cli_value if given, the default under --yes, otherwise prompt for it"""
+    if cli_value:
+        return cli_value
+    if OPTIONS['yes'] and default is not None:
+        return default
+    return input(prompt).strip() or default
+
+def _will_prompt(cli_value=None):
+    """True when a value will be asked for interactively"""
+    return not cli_value and not OPTIONS['yes']
+
+def _loads(data):
+    """Parse az JSON output, with orjson when it is installed"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def check_prerequisites(use_cache=True):
     """Check if Azure CLI is installed and user is logged in"""
+    try:
+        if use_cache and time.time() - os.path.getmtime(PREREQ_TOKEN_FILE) < PREREQ_TOKEN_TTL:
+            return
+    except OSError:
+        pass
+    
     # Check Azure CLI installation
-    stdout, stderr, returncode = run_az_command("az --version")
+    stdout, stderr, returncode = run_az_command(["az", "--version"])
     if returncode != 0:
         print_colored("ERROR: Azure CLI is not installed", Colors.RED)
         sys.exit(1)
     
     # Check if logged in
-    stdout, stderr, returncode = run_az_command("az account show")
+    stdout, stderr, returncode = run_az_command(["az", "account", "show"])
     if returncode != 0:
         print_colored("ERROR: Not logged in to Azure", Colors.RED)
         print_colored("Please run: az login", Colors.YELLOW)
         sys.exit(1)
+    
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(PREREQ_TOKEN_FILE, 'a'):
+            os.utime(PREREQ_TOKEN_FILE)
+    except OSError:
+        pass
+
+def get_subscription_id():
+    """Return the active subscription, preferring AZURE_SUBSCRIPTION_ID over the CLI"""
+    global _subscription_id
+    if _subscription_id is None:
+        _subscription_id = os.environ.get("AZURE_SUBSCRIPTION_ID")
+        if not _subscription_id:
+            stdout, _, returncode = run_az_command(["az", "account", "show", "--query", "id", "-o", "json"])
+            _subscription_id = _loads(stdout) if returncode == 0 and stdout else ""
+    return _subscription_id
+
+def get_credential():
+    """Return the one credential shared by every management client"""
+    global _credential
+    with _credential_lock:
+        if _credential is None:
+            from azure.identity import DefaultAzureCredential
+            _credential = DefaultAzureCredential(exclude_interactive_browser_credential=True)
+        return _credential
+
+def prewarm_credential():
+    """Resolve the credential chain and fetch an ARM token in the background"""
+    def warm():
+        try:
+            get_credential().get_token(ARM_SCOPE)
+        except Exception:
+            # The first real SDK call reports auth problems
+            pass
+    threading.Thread(target=warm, daemon=True).start()
+
+def get_client(kind):
+    """Return a shared management client so all ARM calls reuse one credential"""
+    if kind not in _clients:
+        module_name, class_name = MGMT_CLIENTS[kind]
+        client_class = getattr(importlib.import_module(module_name), class_name)
+        _clients[kind] = client_class(get_credential(), get_subscription_id())
+    return _clients[kind]
+
+def _resource_group(resource_id):
+    """Return the resource group segment of an ARM resource ID"""
+    return resource_id.split('/')[4]
+
+def _power_state(instance_view):
+    """Return the PowerState display status from an instance view"""
+    statuses = instance_view.statuses if instance_view and instance_view.statuses else []
+    return next((status.display_status for status in statuses
+                 if status.code and status.code.startswith('PowerState/')), "Unknown")
 
 def show_usage():
     """Display usage information"""
@@ -97,28 +261,67 @@ def show_usage():
     print("  stop              Stop a running VM (deallocate)")
     print("  help              Show this help message")
     print()
+    print("Options:")
+    print("  --no-cache        Re-run the prerequisite checks and ignore cached az results")
+    print("  --name, --rg, --location, --size, --image")
+    print("                    Answer the matching create prompts up front")
+    print("  -y, --yes         Skip confirmations and take defaults for anything not given")
+    print("  --cleanup         With delete, also remove the VM's associated resources")
+    print()
     print("Examples:")
     print("  python vm_manager.py list")
     print("  python vm_manager.py create")
     print("  python vm_manager.py delete myVM")
     print("  python vm_manager.py start myVM")
     print("  python vm_manager.py stop myVM")
+    print("  python vm_manager.py create --name myVM --rg rg-forensics --yes")
+    print("  python vm_manager.py delete myVM --yes --cleanup")
     print()
 
+def _list_vms_with_power():
+    """Return all VMs with their power state, or None on error"""
+    try:
+        compute = get_client('compute')
+        # The plain listing carries size and location, the status-only one carries power state;
+        # fetch both at once and join them on the VM id
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            vms_future = executor.submit(lambda: list(compute.virtual_machines.list_all()))
+            status_future = executor.submit(lambda: list(compute.virtual_machines.list_all(status_only="true")))
+            vms, statuses = vms_future.result(), status_future.result()
+    except AzureError as e:
+        print_colored(f"Error listing VMs: {e}", Colors.RED)
+        return None
+    
+    power_states = {vm.id.lower(): _power_state(vm.instance_view) for vm in statuses}
+    return [{
+        'name': vm.name,
+        'resourceGroup': _resource_group(vm.id),
+        'location': vm.location,
+        'size': vm.hardware_profile.vm_size if vm.hardware_profile else "",
+        'powerState': power_states.get(vm.id.lower(), "Unknown"),
+    } for vm in vms]
+
+def _find_vm_resource_group(vm_name):
+    """Return the resource group of the named VM, exiting if it cannot be found"""
+    try:
+        vm = next((vm for vm in get_client('compute').virtual_machines.list_all() if vm.name == vm_name), None)
+    except AzureError as e:
+        print_colored(f"Error finding VM: {e}", Colors.RED)
+        sys.exit(1)
+    
+    if vm is None:
+        print_colored(f"Error: VM '{vm_name}' not found", Colors.RED)
+        sys.exit(1)
+    
+    return _resource_group(vm.id)
+
 def list_vms():
     """List all VMs in the current subscription"""
     print_colored("Listing Azure VMs...", Colors.BLUE)
     print()
     
-    stdout, stderr, returncode = run_az_command("az vm list --output json")
-    if returncode != 0:
-        print_colored(f"Error listing VMs: {stderr}", Colors.RED)
-        return
-    
-    try:
-        vms = json.loads(stdout) if stdout else []
-    except json.JSONDecodeError:
-        print_colored("Error parsing VM list", Colors.RED)
+    vms = _list_vms_with_power()
+    if vms is None:
         return
     
     if not vms:
@@ -128,21 +331,13 @@ def list_vms():
     print_colored("VM Name\t\t\tResource Group\t\tLocation\tSize\t\tState", Colors.CYAN)
     print("----------------------------------------------------------------------------------------")
     
+    # Build the whole table, then write it once
+    rows = []
     for vm in vms:
-        # Get power state
-        power_cmd = f"az vm get-instance-view --name {vm['name']} --resource-group {vm['resourceGroup']} --query \"instanceView.statuses[?starts_with(code, 'PowerState/')].displayStatus\" -o tsv"
-        power_stdout, _, power_returncode = run_az_command(power_cmd)
-        power_state = power_stdout if power_returncode == 0 else "Unknown"
-        
-        # Choose color based on state
-        color = Colors.WHITE
-        if "running" in power_state.lower():
-            color = Colors.GREEN
-        elif "stopped" in power_state.lower() or "deallocated" in power_state.lower():
-            color = Colors.YELLOW
-        
-        vm_info = f"{vm['name']}\t\t{vm['resourceGroup']}\t\t{vm['location']}\t{vm['hardwareProfile']['vmSize']}\t{power_state}"
-        print_colored(vm_info, color)
+        power_state = vm['powerState']
+        color = STATE_COLORS.get(_state_kind(power_state), Colors.WHITE)
+        rows.append(color + f"{vm['name']}\t\t{vm['resourceGroup']}\t\t{vm['location']}\t{vm['size']}\t{power_state}" + Colors.RESET)
+    sys.stdout.write('\n'.join(rows) + '\n')
 
 def create_vm():
     """Create a new Azure VM"""
@@ -151,29 +346,28 @@ def create_vm():
     
     # Get VM name
     default_name = f"azure-vm-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-    vm_name = input(f"Enter VM name (default: {default_name}): ").strip()
-    if not vm_name:
-        vm_name = default_name
+    vm_name = ask(f"Enter VM name (default: {default_name}): ", default_name, OPTIONS['name'])
     
     # Get or create resource group
-    print()
-    print_colored("Available Resource Groups:", Colors.CYAN)
-    stdout, stderr, returncode = run_az_command('az group list --query "[].{Name:name, Location:location}" -o json')
-    
     resource_groups = []
-    if returncode == 0 and stdout:
-        try:
-            resource_groups = json.loads(stdout)
-            for i, rg in enumerate(resource_groups, 1):
-                print(f"  {i}. {rg['Name']} ({rg['Location']})")
-        except json.JSONDecodeError:
-            pass
-    
-    if not resource_groups:
-        print("  No resource groups found")
-    
-    print()
-    rg_input = input("Enter resource group name or number (default: rg-forensics): ").strip()
+    if _will_prompt(OPTIONS['resource_group']):
+        print()
+        print_colored("Available Resource Groups:", Colors.CYAN)
+        stdout, stderr, returncode = run_az_command(["az", "group", "list", "--query", "[].{Name:name, Location:location}", "-o", "json"])
+        
+        if returncode == 0 and stdout:
+            try:
+                resource_groups = _loads(stdout)
+                for i, rg in enumerate(resource_groups, 1):
+                    print(f"  {i}. {rg['Name']} ({rg['Location']})")
+            except ValueError:
+                pass
+        
+        if not resource_groups:
+            print("  No resource groups found")
+        
+        print()
+    rg_input = ask("Enter resource group name or number (default: rg-forensics): ", "", OPTIONS['resource_group'])
     if not rg_input:
         rg_name = "rg-forensics"
     elif rg_input.isdigit() and resource_groups:
@@ -187,36 +381,35 @@ def create_vm():
         rg_name = rg_input
     
     # Check if resource group exists
-    stdout, stderr, returncode = run_az_command(f"az group show --name {rg_name}")
+    stdout, stderr, returncode = run_az_command(["az", "group", "show", "--name", rg_name, "-o", "json"])
     if returncode != 0:
         print_colored("Resource group does not exist. Creating...", Colors.YELLOW)
-        location = input("Enter location (default: northcentralus): ").strip()
-        if not location:
-            location = "northcentralus"
+        location = ask("Enter location (default: northcentralus): ", "northcentralus", OPTIONS['location'])
         
-        _, _, returncode = run_az_command(f"az group create --name {rg_name} --location {location} --output table", capture_output=False)
+        _, _, returncode = run_az_command(["az", "group", "create", "--name", rg_name, "--location", location, "-o", "json"])
         if returncode == 0:
             print_colored("✓ Resource group created", Colors.GREEN)
         else:
             print_colored("✗ Failed to create resource group", Colors.RED)
             return
     else:
-        # Get location from existing resource group
-        location_stdout, _, _ = run_az_command(f"az group show --name {rg_name} --query location -o tsv")
-        location = location_stdout if location_stdout else "northcentralus"
+        # Reuse the location from the existence check
+        try:
+            location = OPTIONS['location'] or _loads(stdout).get('location') or "northcentralus"
+        except ValueError:
+            location = "northcentralus"
     
     # Get VM size
-    print()
-    print_colored("Select VM Size:", Colors.CYAN)
-    print("  1. Standard_B1s   - 1 vCPU, 1 GB RAM  (Lowest cost)")
-    print("  2. Standard_B1ms  - 1 vCPU, 2 GB RAM")
-    print("  3. Standard_B2s   - 2 vCPU, 4 GB RAM")
-    print("  4. Standard_D2s_v3 - 2 vCPU, 8 GB RAM")
-    print()
+    if _will_prompt(OPTIONS['size']):
+        print()
+        print_colored("Select VM Size:", Colors.CYAN)
+        print("  1. Standard_B1s   - 1 vCPU, 1 GB RAM  (Lowest cost)")
+        print("  2. Standard_B1ms  - 1 vCPU, 2 GB RAM")
+        print("  3. Standard_B2s   - 2 vCPU, 4 GB RAM")
+        print("  4. Standard_D2s_v3 - 2 vCPU, 8 GB RAM")
+        print()
     
-    vm_size_choice = input("Choose VM size [1-4] (default: 1): ").strip()
-    if not vm_size_choice:
-        vm_size_choice = "1"
+    vm_size_choice = ask("Choose VM size [1-4] (default: 1): ", "1", OPTIONS['size'])
     
     vm_sizes = {
         "1": "Standard_B1s",
@@ -224,21 +417,20 @@ def create_vm():
         "3": "Standard_B2s",
         "4": "Standard_D2s_v3"
     }
-    vm_size = vm_sizes.get(vm_size_choice, "Standard_B1s")
+    vm_size = vm_sizes.get(vm_size_choice, OPTIONS['size'] or "Standard_B1s")
     
     # Get image
-    print()
-    print_colored("Select Image:", Colors.CYAN)
-    print("  1. Ubuntu2204     - Ubuntu 22.04 LTS")
-    print("  2. Ubuntu2404     - Ubuntu 24.04 LTS")
-    print("  3. Debian11       - Debian 11")
-    print("  4. Win2022Datacenter - Windows Server 2022")
-    print("  5. Win2019Datacenter - Windows Server 2019")
-    print()
+    if _will_prompt(OPTIONS['image']):
+        print()
+        print_colored("Select Image:", Colors.CYAN)
+        print("  1. Ubuntu2204     - Ubuntu 22.04 LTS")
+        print("  2. Ubuntu2404     - Ubuntu 24.04 LTS")
+        print("  3. Debian11       - Debian 11")
+        print("  4. Win2022Datacenter - Windows Server 2022")
+        print("  5. Win2019Datacenter - Windows Server 2019")
+        print()
     
-    image_choice = input("Choose image [1-5] (default: 1): ").strip()
-    if not image_choice:
-        image_choice = "1"
+    image_choice = ask("Choose image [1-5] (default: 1): ", "1", OPTIONS['image'])
     
     images = {
         "1": "Ubuntu2204",
@@ -247,23 +439,21 @@ def create_vm():
         "4": "Win2022Datacenter",
         "5": "Win2019Datacenter"
     }
-    image = images.get(image_choice, "Ubuntu2204")
+    image = images.get(image_choice, OPTIONS['image'] or "Ubuntu2204")
     
     # Get authentication
-    print()
-    admin_user = input("Enter admin username (default: azureuser): ").strip()
-    if not admin_user:
-        admin_user = "azureuser"
+    if _will_prompt():
+        print()
+    admin_user = ask("Enter admin username (default: azureuser): ", "azureuser")
     
-    print()
-    print_colored("Authentication Method:", Colors.CYAN)
-    print("  1. SSH key (Linux VMs)")
-    print("  2. Password")
-    print()
+    if _will_prompt():
+        print()
+        print_colored("Authentication Method:", Colors.CYAN)
+        print("  1. SSH key (Linux VMs)")
+        print("  2. Password")
+        print()
     
-    auth_method = input("Choose authentication method [1-2] (default: 1): ").strip()
-    if not auth_method:
-        auth_method = "1"
+    auth_method = ask("Choose authentication method [1-2] (default: 1): ", "1")
     
     # Build command
     cmd = [
@@ -283,8 +473,9 @@ def create_vm():
         cmd.extend(["--admin-password", admin_password])
     
     # Ask about public IP
-    print()
-    public_ip = input("Assign public IP? (y/N): ").strip().lower()
+    if _will_prompt():
+        print()
+    public_ip = ask("Assign public IP? (y/N): ", "n").lower()
     if public_ip not in ["y", "yes"]:
         cmd.extend(["--public-ip-address", ""])
     
@@ -303,28 +494,53 @@ def create_vm():
         
         # Get VM details
         print_colored("VM Details:", Colors.CYAN)
-        details_cmd = f"az vm show --name {vm_name} --resource-group {rg_name} --show-details --query \"{{Name:name, ResourceGroup:resourceGroup, Location:location, Size:hardwareProfile.vmSize, PublicIP:publicIps, PrivateIP:privateIps}}\" -o table"
-        run_az_command(details_cmd, capture_output=False)
+        details_cmd = [
+            "az", "vm", "show",
+            "--name", vm_name,
+            "--resource-group", rg_name,
+            "--show-details",
+            "--query", "{Name:name, ResourceGroup:resourceGroup, Location:location, Size:hardwareProfile.vmSize, PublicIP:publicIps, PrivateIP:privateIps}",
+            "-o", "json"
+        ]
+        details_stdout, _, details_returncode = run_az_command(details_cmd)
+        try:
+            details = _loads(details_stdout) if details_returncode == 0 and details_stdout else {}
+        except ValueError:
+            details = {}
+        sys.stdout.write(''.join(f"  {key:<14} {value or '-'}\n" for key, value in details.items()))
     else:
         print_colored("✗ Failed to create VM", Colors.RED)
         sys.exit(1)
 
-def delete_vm(vm_name):
+def _begin_cleanup(resource, rg_name, vm_name):
+    """Start deleting every resource of one type whose name contains the VM name"""
+    label, kind, operations_name, list_method = resource
+    operations = getattr(get_client(kind), operations_name)
+    try:
+        names = [item.name for item in getattr(operations, list_method)(rg_name) if vm_name in item.name]
+    except AzureError as e:
+        print_colored(f"  ✗ Failed to list {label}s: {e}", Colors.RED)
+        return []
+    
+    started = []
+    for name in names:
+        print_colored(f"  Deleting {label}: {name}", Colors.YELLOW)
+        try:
+            started.append((label, name, operations.begin_delete(rg_name, name)))
+        except AzureError as e:
+            print_colored(f"    ✗ Failed to delete {label}: {name} {e}", Colors.RED)
+    return started
+
+def delete_vm(vm_name, vms=None):
     """Delete a VM and optionally its associated resources"""
     if not vm_name:
         # List VMs and let user choose
         print_colored("Available VMs to delete:", Colors.CYAN)
         print()
         
-        stdout, stderr, returncode = run_az_command("az vm list --output json")
-        if returncode != 0:
-            print_colored(f"Error listing VMs: {stderr}", Colors.RED)
-            return
-        
-        try:
-            vms = json.loads(stdout) if stdout else []
-        except json.JSONDecodeError:
-            print_colored("Error parsing VM list", Colors.RED)
+        if vms is None:
+            vms = _list_vms_with_power()
+        if vms is None:
             return
         
         if not vms:
@@ -332,20 +548,12 @@ def delete_vm(vm_name):
             sys.exit(0)
         
         # Display numbered list of all VMs with their status
+        rows = []
         for i, vm in enumerate(vms, 1):
-            power_cmd = f"az vm get-instance-view --name {vm['name']} --resource-group {vm['resourceGroup']} --query \"instanceView.statuses[?starts_with(code, 'PowerState/')].displayStatus\" -o tsv"
-            power_stdout, _, power_returncode = run_az_command(power_cmd)
-            power_state = power_stdout if power_returncode == 0 else "Unknown"
-            
-            # Choose color based on state
-            color = Colors.WHITE
-            if "running" in power_state.lower():
-                color = Colors.GREEN
-            elif "stopped" in power_state.lower() or "deallocated" in power_state.lower():
-                color = Colors.YELLOW
-            
-            vm_info_text = f"  {i}. {vm['name']} ({vm['resourceGroup']}) - {vm['location']} [{power_state}]"
-            print_colored(vm_info_text, color)
+            power_state = vm['powerState']
+            color = STATE_COLORS.get(_state_kind(power_state), Colors.WHITE)
+            rows.append(color + f"  {i}. {vm['name']} ({vm['resourceGroup']}) - {vm['location']} [{power_state}]" + Colors.RESET)
+        sys.stdout.write('\n'.join(rows) + '\n')
         
         print()
         selection = input(f"Select VM to delete [1-{len(vms)}] or 0 to cancel: ").strip()
@@ -368,133 +576,65 @@ def delete_vm(vm_name):
     else:
         # Find VM and get resource group
         print_colored(f"Finding VM: {vm_name}", Colors.BLUE)
-        stdout, stderr, returncode = run_az_command(f"az vm list --query \"[?name=='{vm_name}']\" -o json")
-        
-        if returncode != 0:
-            print_colored(f"Error finding VM: {stderr}", Colors.RED)
-            sys.exit(1)
-        
-        try:
-            vm_info = json.loads(stdout) if stdout else []
-        except json.JSONDecodeError:
-            print_colored("Error parsing VM information", Colors.RED)
-            sys.exit(1)
-        
-        if not vm_info:
-            print_colored(f"Error: VM '{vm_name}' not found", Colors.RED)
-            sys.exit(1)
-        
-        rg_name = vm_info[0]['resourceGroup']
+        rg_name = _find_vm_resource_group(vm_name)
     
     print_colored(f"VM found in resource group: {rg_name}", Colors.YELLOW)
     print()
-    confirm = input(f"Are you sure you want to delete VM '{vm_name}'? (y/N): ").strip().lower()
-    if confirm != "y":
-        print("Deletion cancelled")
-        sys.exit(0)
+    if not OPTIONS['yes']:
+        confirm = input(f"Are you sure you want to delete VM '{vm_name}'? (y/N): ").strip().lower()
+        if confirm != "y":
+            print("Deletion cancelled")
+            sys.exit(0)
     
     print()
     print_colored("Deleting VM and associated resources...", Colors.YELLOW)
     
     # Delete VM
-    _, _, returncode = run_az_command(f"az vm delete --name {vm_name} --resource-group {rg_name} --yes", capture_output=False)
+    try:
+        get_client('compute').virtual_machines.begin_delete(rg_name, vm_name).result()
+    except AzureError as e:
+        print_colored(f"✗ Failed to delete VM: {e}", Colors.RED)
+        sys.exit(1)
     
-    if returncode == 0:
-        print_colored("✓ VM deleted successfully", Colors.GREEN)
-        
-        # Ask to delete associated resources
+    print_colored("✓ VM deleted successfully", Colors.GREEN)
+    
+    # Ask to delete associated resources
+    if OPTIONS['cleanup']:
+        delete_resources = "y"
+    elif OPTIONS['yes']:
+        delete_resources = "n"
+    else:
         delete_resources = input("Delete associated NICs and disks? (y/n): ").strip().lower()
-        if delete_resources == "y":
-            print_colored("Cleaning up all associated resources...", Colors.YELLOW)
-            print()
-            
-            # Delete NICs
-            print_colored("[INFO] Deleting Network Interfaces...", Colors.BLUE)
-            nic_stdout, _, _ = run_az_command(f"az network nic list --resource-group {rg_name} --query \"[?contains(name, '{vm_name}')].[name]\" -o tsv")
-            if nic_stdout:
-                for nic in nic_stdout.split('\n'):
-                    if nic.strip():
-                        print_colored(f"  Deleting NIC: {nic}", Colors.YELLOW)
-                        _, _, returncode = run_az_command(f"az network nic delete --resource-group {rg_name} --name {nic}", capture_output=False)
-                        if returncode == 0:
-                            print_colored(f"    ✓ NIC deleted: {nic}", Colors.GREEN)
-                        else:
-                            print_colored(f"    ✗ Failed to delete NIC: {nic}", Colors.RED)
-            
-            # Delete Public IPs
-            print_colored("[INFO] Deleting Public IP addresses...", Colors.BLUE)
-            pip_stdout, _, _ = run_az_command(f"az network public-ip list --resource-group {rg_name} --query \"[?contains(name, '{vm_name}')].[name]\" -o tsv")
-            if pip_stdout:
-                for public_ip in pip_stdout.split('\n'):
-                    if public_ip.strip():
-                        print_colored(f"  Deleting Public IP: {public_ip}", Colors.YELLOW)
-                        _, _, returncode = run_az_command(f"az network public-ip delete --resource-group {rg_name} --name {public_ip}", capture_output=False)
-                        if returncode == 0:
-                            print_colored(f"    ✓ Public IP deleted: {public_ip}", Colors.GREEN)
-                        else:
-                            print_colored(f"    ✗ Failed to delete Public IP: {public_ip}", Colors.RED)
-            
-            # Delete Network Security Groups
-            print_colored("[INFO] Deleting Network Security Groups...", Colors.BLUE)
-            nsg_stdout, _, _ = run_az_command(f"az network nsg list --resource-group {rg_name} --query \"[?contains(name, '{vm_name}')].[name]\" -o tsv")
-            if nsg_stdout:
-                for nsg in nsg_stdout.split('\n'):
-                    if nsg.strip():
-                        print_colored(f"  Deleting NSG: {nsg}", Colors.YELLOW)
-                        _, _, returncode = run_az_command(f"az network nsg delete --resource-group {rg_name} --name {nsg}", capture_output=False)
-                        if returncode == 0:
-                            print_colored(f"    ✓ NSG deleted: {nsg}", Colors.GREEN)
-                        else:
-                            print_colored(f"    ✗ Failed to delete NSG: {nsg}", Colors.RED)
-            
-            # Delete Disks
-            print_colored("[INFO] Deleting Disks...", Colors.BLUE)
-            disk_stdout, _, _ = run_az_command(f"az disk list --resource-group {rg_name} --query \"[?contains(name, '{vm_name}')].[name]\" -o tsv")
-            if disk_stdout:
-                for disk in disk_stdout.split('\n'):
-                    if disk.strip():
-                        print_colored(f"  Deleting disk: {disk}", Colors.YELLOW)
-                        _, _, returncode = run_az_command(f"az disk delete --resource-group {rg_name} --name {disk} --yes", capture_output=False)
-                        if returncode == 0:
-                            print_colored(f"    ✓ Disk deleted: {disk}", Colors.GREEN)
-                        else:
-                            print_colored(f"    ✗ Failed to delete disk: {disk}", Colors.RED)
-            
-            # Delete Virtual Networks (only if they are VM-specific)
-            print_colored("[INFO] Checking Virtual Networks...", Colors.BLUE)
-            vnet_stdout, _, _ = run_az_command(f"az network vnet list --resource-group {rg_name} --query \"[?contains(name, '{vm_name}')].[name]\" -o tsv")
-            if vnet_stdout:
-                for vnet in vnet_stdout.split('\n'):
-                    if vnet.strip():
-                        print_colored(f"  Deleting VNET: {vnet}", Colors.YELLOW)
-                        _, _, returncode = run_az_command(f"az network vnet delete --resource-group {rg_name} --name {vnet}", capture_output=False)
-                        if returncode == 0:
-                            print_colored(f"    ✓ VNET deleted: {vnet}", Colors.GREEN)
-                        else:
-                            print_colored(f"    ✗ Failed to delete VNET: {vnet}", Colors.RED)
+    if delete_resources == "y":
+        print_colored("Cleaning up all associated resources...", Colors.YELLOW)
+        print()
+        
+        for wave in CLEANUP_WAVES:
+            with ThreadPoolExecutor(max_workers=len(wave)) as executor:
+                started = [op for ops in executor.map(lambda resource: _begin_cleanup(resource, rg_name, vm_name), wave)
+                           for op in ops]
             
-            print()
-            print_colored("✓ All resources cleanup completed", Colors.GREEN)
-    else:
-        print_colored("✗ Failed to delete VM", Colors.RED)
-        sys.exit(1)
+            # Every delete in the wave is already running server-side; wait on them together
+            for label, name, poller in started:
+                try:
+                    poller.result()
+                    print_colored(f"    ✓ {label} deleted: {name}", Colors.GREEN)
+                except AzureError as e:
+                    print_colored(f"    ✗ Failed to delete {label}: {name} {e}", Colors.RED)
+        
+        print()
+        print_colored("✓ All resources cleanup completed", Colors.GREEN)
 
-def start_vm(vm_name):
+def start_vm(vm_name, vms=None):
     """Start a stopped VM"""
     if not vm_name:
         # List VMs and let user choose
         print_colored("Available VMs to start:", Colors.CYAN)
         print()
         
-        stdout, stderr, returncode = run_az_command("az vm list --output json")
-        if returncode != 0:
-            print_colored(f"Error listing VMs: {stderr}", Colors.RED)
-            return
-        
-        try:
-            vms = json.loads(stdout) if stdout else []
-        except json.JSONDecodeError:
-            print_colored("Error parsing VM list", Colors.RED)
+        if vms is None:
+            vms = _list_vms_with_power()
+        if vms is None:
             return
         
         if not vms:
@@ -504,11 +644,7 @@ def start_vm(vm_name):
         # Filter only stopped VMs
         stopped_vms = []
         for vm in vms:
-            power_cmd = f"az vm get-instance-view --name {vm['name']} --resource-group {vm['resourceGroup']} --query \"instanceView.statuses[?starts_with(code, 'PowerState/')].displayStatus\" -o tsv"
-            power_stdout, _, power_returncode = run_az_command(power_cmd)
-            power_state = power_stdout if power_returncode == 0 else "Unknown"
-            
-            if "stopped" in power_state.lower() or "deallocated" in power_state.lower():
+            if _state_kind(vm['powerState']) == 'stopped':
                 stopped_vms.append(vm)
         
         if not stopped_vms:
@@ -516,8 +652,8 @@ def start_vm(vm_name):
             sys.exit(0)
         
         # Display numbered list of stopped VMs
-        for i, vm in enumerate(stopped_vms, 1):
-            print(f"  {i}. {vm['name']} ({vm['resourceGroup']}) - {vm['location']}")
+        sys.stdout.write(''.join(f"  {i}. {vm['name']} ({vm['resourceGroup']}) - {vm['location']}\n"
+                                 for i, vm in enumerate(stopped_vms, 1)))
         
         print()
         selection = input(f"Select VM to start [1-{len(stopped_vms)}] or 0 to cancel: ").strip()
@@ -539,49 +675,26 @@ def start_vm(vm_name):
             sys.exit(1)
     else:
         # Find VM and get resource group
-        stdout, stderr, returncode = run_az_command(f"az vm list --query \"[?name=='{vm_name}']\" -o json")
-        
-        if returncode != 0:
-            print_colored(f"Error finding VM: {stderr}", Colors.RED)
-            sys.exit(1)
-        
-        try:
-            vm_info = json.loads(stdout) if stdout else []
-        except json.JSONDecodeError:
-            print_colored("Error parsing VM information", Colors.RED)
-            sys.exit(1)
-        
-        if not vm_info:
-            print_colored(f"Error: VM '{vm_name}' not found", Colors.RED)
-            sys.exit(1)
-        
-        rg_name = vm_info[0]['resourceGroup']
+        rg_name = _find_vm_resource_group(vm_name)
     
     print_colored(f"Starting VM: {vm_name}", Colors.YELLOW)
-    _, _, returncode = run_az_command(f"az vm start --name {vm_name} --resource-group {rg_name}", capture_output=False)
-    
-    if returncode == 0:
+    try:
+        get_client('compute').virtual_machines.begin_start(rg_name, vm_name).result()
         print_colored("✓ VM started successfully", Colors.GREEN)
-    else:
-        print_colored("✗ Failed to start VM", Colors.RED)
+    except AzureError as e:
+        print_colored(f"✗ Failed to start VM: {e}", Colors.RED)
         sys.exit(1)
 
-def stop_vm(vm_name):
+def stop_vm(vm_name, vms=None):
     """Stop and deallocate a VM"""
     if not vm_name:
         # List VMs and let user choose
         print_colored("Available VMs to stop:", Colors.CYAN)
         print()
         
-        stdout, stderr, returncode = run_az_command("az vm list --output json")
-        if returncode != 0:
-            print_colored(f"Error listing VMs: {stderr}", Colors.RED)
-            return
-        
-        try:
-            vms = json.loads(stdout) if stdout else []
-        except json.JSONDecodeError:
-            print_colored("Error parsing VM list", Colors.RED)
+        if vms is None:
+            vms = _list_vms_with_power()
+        if vms is None:
             return
         
         if not vms:
@@ -591,11 +704,7 @@ def stop_vm(vm_name):
         # Filter only running VMs
         running_vms = []
         for vm in vms:
-            power_cmd = f"az vm get-instance-view --name {vm['name']} --resource-group {vm['resourceGroup']} --query \"instanceView.statuses[?starts_with(code, 'PowerState/')].displayStatus\" -o tsv"
-            power_stdout, _, power_returncode = run_az_command(power_cmd)
-            power_state = power_stdout if power_returncode == 0 else "Unknown"
-            
-            if "running" in power_state.lower():
+            if _state_kind(vm['powerState']) == 'running':
                 running_vms.append(vm)
         
         if not running_vms:
@@ -603,8 +712,8 @@ def stop_vm(vm_name):
             sys.exit(0)
         
         # Display numbered list of running VMs
-        for i, vm in enumerate(running_vms, 1):
-            print(f"  {i}. {vm['name']} ({vm['resourceGroup']}) - {vm['location']}")
+        sys.stdout.write(''.join(f"  {i}. {vm['name']} ({vm['resourceGroup']}) - {vm['location']}\n"
+                                 for i, vm in enumerate(running_vms, 1)))
         
         print()
         selection = input(f"Select VM to stop [1-{len(running_vms)}] or 0 to cancel: ").strip()
@@ -626,35 +735,19 @@ def stop_vm(vm_name):
             sys.exit(1)
     else:
         # Find VM and get resource group
-        stdout, stderr, returncode = run_az_command(f"az vm list --query \"[?name=='{vm_name}']\" -o json")
-        
-        if returncode != 0:
-            print_colored(f"Error finding VM: {stderr}", Colors.RED)
-            sys.exit(1)
-        
-        try:
-            vm_info = json.loads(stdout) if stdout else []
-        except json.JSONDecodeError:
-            print_colored("Error parsing VM information", Colors.RED)
-            sys.exit(1)
-        
-        if not vm_info:
-            print_colored(f"Error: VM '{vm_name}' not found", Colors.RED)
-            sys.exit(1)
-        
-        rg_name = vm_info[0]['resourceGroup']
+        rg_name = _find_vm_resource_group(vm_name)
     
     print_colored(f"Stopping and deallocating VM: {vm_name}", Colors.YELLOW)
-    _, _, returncode = run_az_command(f"az vm deallocate --name {vm_name} --resource-group {rg_name}", capture_output=False)
-    
-    if returncode == 0:
+    try:
+        get_client('compute').virtual_machines.begin_deallocate(rg_name, vm_name).result()
         print_colored("✓ VM stopped and deallocated successfully", Colors.GREEN)
-    else:
-        print_colored("✗ Failed to stop VM", Colors.RED)
+    except AzureError as e:
+        print_colored(f"✗ Failed to stop VM: {e}", Colors.RED)
         sys.exit(1)
 
 def main():
     """Main function"""
+    global _az_cache_enabled
     parser = argparse.ArgumentParser(
         description="Azure VM Manager - NimbusDFIR",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -665,6 +758,8 @@ Examples:
   python vm_manager.py delete myVM
   python vm_manager.py start myVM
   python vm_manager.py stop myVM
+  python vm_manager.py create --name myVM --resource-group rg-forensics --size 2 --yes
+  echo "$vms" | xargs -P 10 -I{} python vm_manager.py delete {} --yes --cleanup
         """
     )
     
@@ -680,6 +775,20 @@ Examples:
         help='VM name (required for delete, start, stop commands)'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-run the Azure CLI prerequisite checks and ignore cached az results'
+    )
+    
+    parser.add_argument('--name', help='VM name for create')
+    parser.add_argument('--resource-group', '--rg', dest='resource_group', help='Resource group for create')
+    parser.add_argument('--location', help='Location for create')
+    parser.add_argument('--size', help='VM size for create, as a menu number or a size name')
+    parser.add_argument('--image', help='Image for create, as a menu number or an image alias')
+    parser.add_argument('-y', '--yes', action='store_true', help='Skip confirmations and take defaults for anything not given')
+    parser.add_argument('--cleanup', action='store_true', help='With delete, also remove the VM\'s NICs, disks, IPs, NSGs and VNets')
+    
     if len(sys.argv) == 1:
         show_usage()
         sys.exit(1)
@@ -690,8 +799,22 @@ Examples:
         show_usage()
         return
     
+    for key in OPTIONS:
+        OPTIONS[key] = getattr(args, key)
+    
     # Check prerequisites
-    check_prerequisites()
+    _az_cache_enabled = not args.no_cache
+    # Let credential discovery overlap the az prerequisite checks for the SDK-backed commands
+    if args.command != 'create':
+        prewarm_credential()
+    check_prerequisites(use_cache=not args.no_cache)
+    
+    # The selection menus all start from the same listing; fetch it once here
+    vms = None
+    if args.command in ('delete', 'start', 'stop') and not args.vm_name:
+        vms = _list_vms_with_power()
+        if vms is None:
+            sys.exit(1)
     
     # Execute command
     if args.command == 'list':
@@ -699,11 +822,11 @@ Examples:
     elif args.command == 'create':
         create_vm()
     elif args.command == 'delete':
-        delete_vm(args.vm_name)
+        delete_vm(args.vm_name, vms)
     elif args.command == 'start':
-        start_vm(args.vm_name)
+        start_vm(args.vm_name, vms)
     elif args.command == 'stop':
-        stop_vm(args.vm_name)
+        stop_vm(args.vm_name, vms)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
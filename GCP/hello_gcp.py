@@ -6,10 +6,11 @@ def main():
     account_email = getattr(credentials, 'service_account_email', None) or getattr(credentials, 'client_email', None)
     print(f'GCP connection successful! Account: {account_email}')
     client = compute_v1.RegionsClient()
-    regions = client.list(project=project)
+    # One large page covers every region, so the listing is a single RPC
+    request = compute_v1.ListRegionsRequest(project=project, max_results=500)
+    names = [region.name for region in client.list(request=request)]
     print('Available regions:')
-    for region in regions:
-        print(region.name)
+    print('\n'.join(names))
 
 if __name__ == '__main__':
     main()